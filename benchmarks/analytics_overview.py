@@ -0,0 +1,111 @@
+"""Benchmark for GET /api/analytics/overview.
+
+Seeds a throwaway SQLite database with synthetic prospects, then times the
+overview handler and counts the SQL statements it issues per call. The
+previous per-value implementation is timed alongside for comparison.
+
+Usage:
+    python -m benchmarks.analytics_overview --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Prospects to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per variant")
+    return parser.parse_args()
+
+
+async def legacy_overview(db) -> dict:
+    """Reproduce the original one-count-per-value overview (13 queries)."""
+    from sqlalchemy import func, select
+    from prospectplusagent.models import ProspectStatus, ProspectPriority
+    from prospectplusagent.models.database import ProspectDB
+
+    query = select(func.count(ProspectDB.id))
+    result = {"total": await db.scalar(query)}
+    for status_value in ProspectStatus:
+        result[status_value.value] = await db.scalar(
+            query.where(ProspectDB.status == status_value.value)
+        )
+    for priority_value in ProspectPriority:
+        result[priority_value.value] = await db.scalar(
+            query.where(ProspectDB.priority == priority_value.value)
+        )
+    result["avg_score"] = await db.scalar(
+        query.where(ProspectDB.score.isnot(None)).with_only_columns(func.avg(ProspectDB.score))
+    )
+    return result
+
+
+async def measure(session_factory, counter: dict, call, repeat: int) -> dict:
+    """Time ``call`` and record the statements issued per invocation."""
+    timings = []
+    queries = 0
+    async with session_factory() as db:
+        for _ in range(repeat):
+            counter["queries"] = 0
+            started = time.perf_counter()
+            await call(db)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries = counter["queries"]
+    return {
+        "queries_per_call": queries,
+        "latency_ms_min": round(min(timings), 2),
+        "latency_ms_median": round(statistics.median(timings), 2),
+        "latency_ms_max": round(max(timings), 2),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a JSON report."""
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="ppa-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+
+    # Import after DATABASE_URL is set so the engines point at the scratch DB
+    from sqlalchemy import event
+    from prospectplusagent.core.database import engine, async_engine, AsyncSessionLocal
+    from prospectplusagent.api.analytics import get_analytics_overview
+    from benchmarks.seed import seed_prospects
+
+    started = time.perf_counter()
+    seed_prospects(engine, args.rows)
+    seed_seconds = time.perf_counter() - started
+
+    counter = {"queries": 0}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_query(*_):
+        counter["queries"] += 1
+
+    async def run() -> dict:
+        try:
+            return {
+                "grouped": await measure(
+                    AsyncSessionLocal,
+                    counter,
+                    lambda db: get_analytics_overview(start_date=None, end_date=None, db=db),
+                    args.repeat
+                ),
+                "legacy": await measure(AsyncSessionLocal, counter, legacy_overview, args.repeat),
+            }
+        finally:
+            await async_engine.dispose()
+
+    report = {"rows": args.rows, "seed_seconds": round(seed_seconds, 1), **asyncio.run(run())}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Local stand-in for an OpenAI-compatible API.
+
+Serves chat completions (plain and streamed) and embeddings with a
+configurable time to first token and token rate, so load tests exercise
+the agent paths without network access or API costs.
+
+Usage:
+    python -m benchmarks.fake_llm --port 9100 --latency 0.3 --tokens-per-second 50
+
+Point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:9100/v1`` and
+any non-empty ``OPENAI_API_KEY``.
+"""
+
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+WORDS = (
+    "prospect pipeline follow up budget pilot renewal demo pricing champion "
+    "security review quarter expansion priority engagement signal"
+).split()
+
+
+def _prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Estimate prompt tokens at four characters per token."""
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4 + 1
+
+
+def _completion_words(count: int) -> List[str]:
+    """Deterministic completion text, one word per token."""
+    return [WORDS[index % len(WORDS)] + " " for index in range(count)]
+
+
+def create_app(latency: float = 0.3, tokens_per_second: float = 50.0, completion_tokens: int = 40) -> FastAPI:
+    """Build the fake API.
+
+    ``latency`` is the time to the first token; the remaining tokens arrive
+    at ``tokens_per_second``. A request's ``max_tokens`` caps the
+    completion length.
+    """
+    app = FastAPI(title="Fake LLM")
+    interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "benchmarks"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-model")
+        count = min(completion_tokens, body.get("max_tokens") or completion_tokens)
+        words = _completion_words(count)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            async def events():
+                await asyncio.sleep(latency)
+                for index, word in enumerate(words):
+                    if index:
+                        await asyncio.sleep(interval)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency + interval * max(count - 1, 0))
+        prompt_tokens = _prompt_tokens(body.get("messages", []))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(words).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": count,
+                "total_tokens": prompt_tokens + count,
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = body.get("dimensions") or 1536
+        await asyncio.sleep(latency)
+        data = []
+        for index, text in enumerate(inputs):
+            seed = int.from_bytes(hashlib.blake2b(str(text).encode(), digest_size=8).digest(), "little")
+            vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            data.append({"object": "embedding", "index": index, "embedding": vector.tolist()})
+        tokens = sum(len(str(text)) for text in inputs) // 4 + 1
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=9100, help="Bind port")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds to the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Token rate after the first")
+    parser.add_argument("--completion-tokens", type=int, default=40, help="Tokens per completion")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Serve the fake API."""
+    import uvicorn
+
+    args = parse_args()
+    app = create_app(args.latency, args.tokens_per_second, args.completion_tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""Load test across every API router, compared against a stored baseline.
+
+Seeds a throwaway SQLite database, starts the fake LLM server and the app
+in subprocesses, then drives each scenario at a fixed concurrency for a
+fixed time. Throughput and latency percentiles are written as JSON and
+compared with a baseline; a regression beyond the tolerance exits
+non-zero, so the run can gate a deploy.
+
+Usage:
+    python -m benchmarks.load --rows 10000 --concurrency 16 --duration 5
+    python -m benchmarks.load --save-baseline
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "load.json"
+
+SEARCH_QUERIES = [
+    "approved budget for a pilot", "security review", "pricing", "renewal next quarter",
+    "legacy CRM migration", "demo request", "analytics interest", "regional expansion",
+]
+CHAT_QUERIES = [
+    "Which prospects approved a pilot budget?",
+    "Who asked for pricing recently?",
+    "Summarize prospects that need a security review",
+    "What should I do next with prospects evaluating competitors?",
+]
+
+Scenario = Callable[[httpx.AsyncClient, "LoadContext"], Awaitable[Optional[float]]]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Prospects to seed (10k to 1M)")
+    parser.add_argument("--interactions-per-prospect", type=int, default=2, help="Interactions to seed per prospect")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="App worker processes (prospectplus serve --workers)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Timed seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Untimed seconds per scenario")
+    parser.add_argument("--scenarios", default=None, help="Comma-separated scenario names or routers to run")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake LLM seconds to the first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0, help="Fake LLM token rate")
+    parser.add_argument("--llm-completion-tokens", type=int, default=40, help="Fake LLM tokens per completion")
+    parser.add_argument("--output", default=None, help="Write the report to this file as well as stdout")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+class LoadContext:
+    """Shared state for scenarios: auth token and known prospect IDs."""
+
+    def __init__(self, token: str, prospect_ids: List[str], seed: int = 7):
+        """Initialize the context."""
+        self.token = token
+        self.prospect_ids = prospect_ids
+        self.rng = random.Random(seed)
+
+    @property
+    def auth(self) -> Dict[str, str]:
+        """Authorization header for the benchmark user."""
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def prospect_id(self) -> str:
+        """Pick a random existing prospect."""
+        return self.rng.choice(self.prospect_ids)
+
+
+async def _check(response: httpx.Response) -> None:
+    """Raise on error responses so they are counted as failures."""
+    response.raise_for_status()
+
+
+async def auth_token(client, ctx):
+    """Log in with a password."""
+    await _check(await client.post("/api/auth/token", data={"username": "demo", "password": "demo123"}))
+
+
+async def auth_me(client, ctx):
+    """Resolve the current user from a token."""
+    await _check(await client.get("/api/auth/me", headers=ctx.auth))
+
+
+async def prospects_list(client, ctx):
+    """List a page of prospects."""
+    await _check(await client.get("/api/prospects/", params={"limit": 50}))
+
+
+async def prospects_get(client, ctx):
+    """Fetch one prospect."""
+    await _check(await client.get(f"/api/prospects/{ctx.prospect_id()}"))
+
+
+async def prospects_create(client, ctx):
+    """Create a prospect (also queues an analysis job)."""
+    suffix = uuid.uuid4().hex[:12]
+    await _check(await client.post("/api/prospects/", json={
+        "company_name": f"Load Test {suffix}",
+        "contact_name": "Load Tester",
+        "email": f"load-{suffix}@bench.example",
+        "industry": "Technology",
+        "notes": ctx.rng.choice(SEARCH_QUERIES),
+    }))
+
+
+async def prospects_update(client, ctx):
+    """Change a prospect's priority."""
+    await _check(await client.put(
+        f"/api/prospects/{ctx.prospect_id()}", json={"priority": ctx.rng.choice(["low", "medium", "high"])}
+    ))
+
+
+async def prospects_search(client, ctx):
+    """Run a semantic search."""
+    await _check(await client.get("/api/prospects/search", params={"q": ctx.rng.choice(SEARCH_QUERIES)}))
+
+
+async def prospects_text_search(client, ctx):
+    """Run a full-text search."""
+    await _check(await client.get("/api/prospects/text-search", params={"q": ctx.rng.choice(SEARCH_QUERIES)}))
+
+
+async def prospects_analyze(client, ctx):
+    """Analyze a prospect, bypassing the cache."""
+    await _check(await client.post(f"/api/prospects/{ctx.prospect_id()}/analyze", params={"refresh": "true"}))
+
+
+async def analytics_overview(client, ctx):
+    """Fetch the dashboard overview."""
+    await _check(await client.get("/api/analytics/overview"))
+
+
+async def analytics_trends(client, ctx):
+    """Fetch 90 days of trends."""
+    await _check(await client.get("/api/analytics/trends", params={"days": 90}))
+
+
+async def analytics_top_industries(client, ctx):
+    """Fetch the top industries."""
+    await _check(await client.get("/api/analytics/top-industries"))
+
+
+async def agent_status(client, ctx):
+    """Fetch the agent status."""
+    await _check(await client.get("/api/agent/status"))
+
+
+async def agent_chat(client, ctx):
+    """Ask the agent a question."""
+    await _check(await client.post("/api/agent/chat", json={"query": ctx.rng.choice(CHAT_QUERIES)}))
+
+
+async def agent_chat_stream(client, ctx) -> float:
+    """Stream a chat answer; returns the time to the first token event."""
+    started = time.perf_counter()
+    first_token = None
+    async with client.stream(
+        "POST", "/api/agent/chat", json={"query": ctx.rng.choice(CHAT_QUERIES), "stream": True}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_token is None and line.startswith("event: token"):
+                first_token = time.perf_counter() - started
+            if line.startswith("event: error"):
+                raise RuntimeError("stream reported an error")
+    return first_token if first_token is not None else time.perf_counter() - started
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "auth.token": auth_token,
+    "auth.me": auth_me,
+    "prospects.list": prospects_list,
+    "prospects.get": prospects_get,
+    "prospects.create": prospects_create,
+    "prospects.update": prospects_update,
+    "prospects.search": prospects_search,
+    "prospects.text_search": prospects_text_search,
+    "prospects.analyze": prospects_analyze,
+    "analytics.overview": analytics_overview,
+    "analytics.trends": analytics_trends,
+    "analytics.top_industries": analytics_top_industries,
+    "agent.status": agent_status,
+    "agent.chat": agent_chat,
+    "agent.chat_stream": agent_chat_stream,
+}
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(share * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: Scenario,
+    ctx: LoadContext,
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> Dict[str, Any]:
+    """Drive one scenario with ``concurrency`` clients and summarize it."""
+    latencies: List[float] = []
+    first_tokens: List[float] = []
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def worker(deadline: float, record: bool) -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    first_token = await scenario(client, ctx)
+                except Exception as e:
+                    if record:
+                        name = type(e).__name__
+                        if isinstance(e, httpx.HTTPStatusError):
+                            name = f"HTTP {e.response.status_code}"
+                        errors[name] = errors.get(name, 0) + 1
+                    continue
+                if record:
+                    latencies.append(time.perf_counter() - started)
+                    if first_token is not None:
+                        first_tokens.append(first_token)
+
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*[worker(deadline, False) for _ in range(concurrency)])
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[worker(deadline, True) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    summary: Dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            name: round(percentile(latencies, share) * 1000, 2)
+            for name, share in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        },
+    }
+    if errors:
+        summary["error_types"] = errors
+    if first_tokens:
+        first_tokens.sort()
+        summary["first_token_ms"] = {
+            "p50": round(percentile(first_tokens, 0.5) * 1000, 2),
+            "p90": round(percentile(first_tokens, 0.9) * 1000, 2),
+        }
+    return summary
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Compare throughput and p90 latency per scenario with a baseline."""
+    regressions: List[Dict[str, Any]] = []
+    changes: Dict[str, Dict[str, float]] = {}
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous["requests"]:
+            continue
+        throughput = current["throughput_rps"] / previous["throughput_rps"] - 1
+        p90 = current["latency_ms"]["p90"] / max(previous["latency_ms"]["p90"], 0.01) - 1
+        changes[name] = {"throughput": round(throughput, 3), "p90_latency": round(p90, 3)}
+        if throughput < -tolerance:
+            regressions.append({"scenario": name, "metric": "throughput_rps", "change": round(throughput, 3)})
+        if p90 > tolerance:
+            regressions.append({"scenario": name, "metric": "latency_ms.p90", "change": round(p90, 3)})
+        if current["errors"] > previous["errors"]:
+            regressions.append({"scenario": name, "metric": "errors", "change": current["errors"] - previous["errors"]})
+    return {"tolerance": tolerance, "changes": changes, "regressions": regressions}
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, process: subprocess.Popen, timeout: float = 120.0) -> None:
+    """Poll ``url`` until it answers or the process dies."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with code {process.returncode} before {url} came up")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def start_servers(args: argparse.Namespace, workdir: Path, database_url: str) -> Tuple[str, List[subprocess.Popen]]:
+    """Start the fake LLM and the app; return the app URL and the processes.
+
+    Both log to ``server.log`` in the work directory.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+    llm_port, app_port = _free_port(), _free_port()
+    processes: List[subprocess.Popen] = []
+
+    log = open(workdir / "server.log", "ab")
+    llm = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_llm", "--port", str(llm_port),
+        "--latency", str(args.llm_latency),
+        "--tokens-per-second", str(args.llm_tokens_per_second),
+        "--completion-tokens", str(args.llm_completion_tokens),
+    ], cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    processes.append(llm)
+    _wait_for(f"http://127.0.0.1:{llm_port}/v1/models", llm)
+
+    app_env = {
+        **env,
+        "DATABASE_URL": database_url,
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "LLM_MAX_RETRIES": "0",
+        "VECTOR_STORE_PATH": str(workdir / "vectors"),
+        "PROFILE_DIR": str(workdir / "profiles"),
+    }
+    if args.workers == 1:
+        command = [
+            sys.executable, "-m", "uvicorn", "prospectplusagent.main:app",
+            "--host", "127.0.0.1", "--port", str(app_port), "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "prospectplusagent.cli", "serve",
+            "--host", "127.0.0.1", "--port", str(app_port), "--workers", str(args.workers),
+        ]
+    app = subprocess.Popen(command, cwd=workdir, env=app_env, stdout=log, stderr=subprocess.STDOUT)
+    processes.append(app)
+    _wait_for(f"http://127.0.0.1:{app_port}/health", app)
+    return f"http://127.0.0.1:{app_port}", processes
+
+
+async def run_load(args: argparse.Namespace, base_url: str, scenarios: Dict[str, Scenario]) -> Dict[str, Any]:
+    """Prepare shared state and run every selected scenario in turn."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0) as client:
+        response = await client.post("/api/auth/token", data={"username": "demo", "password": "demo123"})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        prospects = (await client.get("/api/prospects/", params={"limit": 1000})).json()
+        # The first semantic search waits for the index to load; keep that out of the timings
+        await client.get("/api/prospects/search", params={"q": "warm up"})
+
+    ctx = LoadContext(token, [prospect["id"] for prospect in prospects])
+    results = {}
+    for name, scenario in scenarios.items():
+        results[name] = await run_scenario(base_url, scenario, ctx, args.concurrency, args.duration, args.warmup)
+        print(f"{name}: {results[name]['throughput_rps']} req/s, "
+              f"p90 {results[name]['latency_ms']['p90']} ms, {results[name]['errors']} errors",
+              file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    """Run the load test, print a JSON report and compare with the baseline."""
+    args = parse_args()
+    scenarios = SCENARIOS
+    if args.scenarios:
+        wanted = {name.strip() for name in args.scenarios.split(",")}
+        scenarios = {
+            name: scenario for name, scenario in SCENARIOS.items()
+            if name in wanted or name.split(".")[0] in wanted
+        }
+
+    workdir = Path(tempfile.mkdtemp(prefix="ppa-load-"))
+    database_url = f"sqlite:///{workdir / 'bench.db'}"
+    seeded = subprocess.run([
+        sys.executable, "-m", "benchmarks.seed", "--rows", str(args.rows),
+        "--interactions-per-prospect", str(args.interactions_per_prospect),
+        "--database-url", database_url,
+    ], cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+
+    base_url, processes = start_servers(args, workdir, database_url)
+    try:
+        results = asyncio.run(run_load(args, base_url, scenarios))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+    report: Dict[str, Any] = {
+        "config": {
+            "rows": args.rows,
+            "interactions_per_prospect": args.interactions_per_prospect,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "duration": args.duration,
+            "llm_latency": args.llm_latency,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "llm_completion_tokens": args.llm_completion_tokens,
+            "cpus": os.cpu_count(),
+            "python": sys.version.split()[0],
+        },
+        "seed": json.loads(seeded.stdout),
+        "server_log": str(workdir / "server.log"),
+        "scenarios": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    exit_code = 0
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        stored = {key: value for key, value in report.items() if key != "server_log"}
+        baseline_path.write_text(json.dumps(stored, indent=2) + "\n")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("config", {}).get("rows") != args.rows:
+            print("Baseline was recorded with a different row count; comparison may mislead", file=sys.stderr)
+        report["comparison"] = compare(report, baseline, args.tolerance)
+        if report["comparison"]["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Synthetic prospect data for benchmarks.
+
+Can also seed a database directly:
+
+    python -m benchmarks.seed --rows 100000 --database-url sqlite:///./bench.db
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from prospectplusagent.models import ProspectStatus, ProspectPriority
+from prospectplusagent.models.database import ProspectDB, InteractionDB
+
+INDUSTRIES = [
+    "Technology", "Healthcare", "Finance", "Retail", "Manufacturing",
+    "Education", "Logistics", "Energy", "Media", "Real Estate"
+]
+COMPANY_SIZES = ["1-10", "11-50", "51-200", "201-1000", "1000+"]
+NOTE_PHRASES = [
+    "approved budget for a pilot", "evaluating competitors", "asked for pricing",
+    "needs security review", "renewal due next quarter", "interested in analytics",
+    "procurement process started", "champion left the company", "requested a demo",
+    "expanding to new regions", "migrating off legacy CRM", "no budget until next year",
+]
+INTERACTION_TYPES = ["email", "call", "meeting", "note"]
+
+
+def generate_prospects(
+    rows: int,
+    seed: int = 42,
+    days: int = 365
+) -> Iterator[Dict[str, Any]]:
+    """Yield synthetic prospect rows with realistic field coverage."""
+    rng = random.Random(seed)
+    statuses = [s.value for s in ProspectStatus]
+    priorities = [p.value for p in ProspectPriority]
+    now = datetime.utcnow()
+
+    for index in range(rows):
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "company_name": f"Company {index}",
+            "contact_name": f"Contact {index}",
+            "email": f"contact{index}@company{index}.example",
+            "industry": rng.choice(INDUSTRIES) if rng.random() < 0.8 else None,
+            "company_size": rng.choice(COMPANY_SIZES) if rng.random() < 0.6 else None,
+            "website": f"https://company{index}.example" if rng.random() < 0.5 else None,
+            "status": rng.choice(statuses),
+            "priority": rng.choice(priorities),
+            "notes": ". ".join(rng.sample(NOTE_PHRASES, 2)) if rng.random() < 0.5 else None,
+            "tags": [],
+            "score": round(rng.random(), 3) if rng.random() < 0.7 else None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def seed_prospects(engine: Engine, rows: int, batch_size: int = 50_000, seed: int = 42) -> List[str]:
+    """Insert ``rows`` synthetic prospects in large transactions and return their IDs."""
+    ids: List[str] = []
+    batch: List[Dict[str, Any]] = []
+    with engine.begin() as conn:
+        for row in generate_prospects(rows, seed=seed):
+            ids.append(row["id"])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(ProspectDB.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(ProspectDB.__table__), batch)
+    return ids
+
+
+def generate_interactions(
+    prospect_ids: List[str],
+    per_prospect: int,
+    seed: int = 42,
+    days: int = 365
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``per_prospect`` synthetic interactions for each prospect."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for prospect_id in prospect_ids:
+        for _ in range(per_prospect):
+            yield {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "prospect_id": prospect_id,
+                "interaction_type": rng.choice(INTERACTION_TYPES),
+                "content": rng.choice(NOTE_PHRASES).capitalize(),
+                "interaction_metadata": {},
+                "created_at": now - timedelta(seconds=rng.randint(0, days * 86400)),
+            }
+
+
+def seed_interactions(
+    engine: Engine,
+    prospect_ids: List[str],
+    per_prospect: int,
+    batch_size: int = 50_000,
+    seed: int = 42
+) -> None:
+    """Insert synthetic interactions for the given prospects."""
+    batch: List[Dict[str, Any]] = []
+    with engine.begin() as conn:
+        for row in generate_interactions(prospect_ids, per_prospect, seed=seed):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(InteractionDB.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(InteractionDB.__table__), batch)
+
+
+def seed_database(rows: int, interactions_per_prospect: int = 0, seed: int = 42) -> Dict[str, Any]:
+    """Seed the configured database and return timings.
+
+    ``DATABASE_URL`` must be set before calling, since importing the
+    database module creates the engines.
+    """
+    from prospectplusagent.core.database import engine
+
+    started = time.perf_counter()
+    prospect_ids = seed_prospects(engine, rows, seed=seed)
+    prospect_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if interactions_per_prospect:
+        seed_interactions(engine, prospect_ids, interactions_per_prospect, seed=seed)
+    interaction_seconds = time.perf_counter() - started
+    engine.dispose()
+
+    return {
+        "rows": rows,
+        "interactions": rows * interactions_per_prospect,
+        "prospect_seconds": round(prospect_seconds, 1),
+        "interaction_seconds": round(interaction_seconds, 1),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic prospects")
+    parser.add_argument("--rows", type=int, default=10_000, help="Prospects to seed (10k to 1M)")
+    parser.add_argument("--interactions-per-prospect", type=int, default=2, help="Interactions per prospect")
+    parser.add_argument("--database-url", default=None, help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """Seed the database and print a JSON report."""
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    report = seed_database(args.rows, args.interactions_per_prospect, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
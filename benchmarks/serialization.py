@@ -0,0 +1,128 @@
+"""Benchmark for prospect response serialization.
+
+Loads pages of synthetic prospects from a throwaway SQLite database and
+times turning them into response bytes two ways:
+
+- ``response_model``: FastAPI's previous path of validating ``to_dict()``
+  rows against ``List[Prospect]``, dumping them back to JSON-ready data
+  and encoding with the standard library.
+- ``fast``: ``json_response`` rendering the ``to_dict()`` rows directly
+  with orjson.
+
+It also times ``GET /api/prospects/?limit=1000`` end to end, walking every
+page over ASGI.
+
+Usage:
+    python -m benchmarks.serialization --rows 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Prospects to seed")
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per variant")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark and print a JSON report."""
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="ppa-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+
+    # Import after DATABASE_URL is set so the engines point at the scratch DB
+    import httpx
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import select
+    from prospectplusagent.core.database import engine, async_engine, AsyncSessionLocal
+    from prospectplusagent.core.serialization import ORJSON_AVAILABLE, json_response
+    from prospectplusagent.main import app
+    from prospectplusagent.models import Prospect
+    from prospectplusagent.models.database import ProspectDB
+    from benchmarks.seed import seed_prospects
+
+    seed_prospects(engine, args.rows)
+    field = create_response_field(name="Response_list_prospects", type_=List[Prospect])
+
+    async def load_pages() -> list:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(ProspectDB).order_by(ProspectDB.id))
+            prospects = list(result.scalars())
+        return [
+            [prospect.to_dict() for prospect in prospects[start:start + args.page_size]]
+            for start in range(0, len(prospects), args.page_size)
+        ]
+
+    async def legacy(page: list) -> bytes:
+        content = await serialize_response(field=field, response_content=page)
+        return JSONResponse(content).body
+
+    async def fast(page: list) -> bytes:
+        return json_response(page).body
+
+    async def time_variant(render, pages: list) -> List[float]:
+        rates = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for page in pages:
+                await render(page)
+            rates.append(args.rows / (time.perf_counter() - started))
+        return rates
+
+    async def end_to_end() -> List[float]:
+        rates = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(args.repeat):
+                fetched = 0
+                cursor = None
+                started = time.perf_counter()
+                while True:
+                    params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+                    response = await client.get("/api/prospects/", params=params)
+                    fetched += len(response.json())
+                    cursor = response.headers.get("x-next-cursor")
+                    if not cursor:
+                        break
+                rates.append(fetched / (time.perf_counter() - started))
+        return rates
+
+    async def run() -> dict:
+        try:
+            pages = await load_pages()
+            # Both variants must produce the same document
+            assert json.loads(await legacy(pages[0])) == json.loads(await fast(pages[0]))
+            legacy_rates = await time_variant(legacy, pages)
+            fast_rates = await time_variant(fast, pages)
+            endpoint_rates = await end_to_end()
+        finally:
+            await async_engine.dispose()
+        return {
+            "serialize_rows_per_second": {
+                "response_model": round(statistics.median(legacy_rates)),
+                "fast": round(statistics.median(fast_rates)),
+                "speedup": round(statistics.median(fast_rates) / statistics.median(legacy_rates), 1),
+            },
+            "endpoint_rows_per_second": round(statistics.median(endpoint_rates)),
+        }
+
+    report = {"rows": args.rows, "page_size": args.page_size, "orjson": ORJSON_AVAILABLE, **asyncio.run(run())}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
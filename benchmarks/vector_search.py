@@ -0,0 +1,90 @@
+"""Benchmark for the semantic search vector index.
+
+Fills a ``VectorIndex`` with clustered synthetic vectors, builds the IVF
+lists, then reports query latency and recall@k against exact search.
+
+Usage:
+    python -m benchmarks.vector_search --vectors 1000000
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from prospectplusagent.core.vector_store import VectorIndex
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=1_000_000, help="Vectors to index")
+    parser.add_argument("--dim", type=int, default=256, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--nprobe", type=int, default=None, help="Lists scanned per query")
+    return parser.parse_args()
+
+
+def synthetic_vectors(rng: np.random.Generator, count: int, dim: int, topics: int = 2000) -> np.ndarray:
+    """Normalized vectors scattered around random topic directions."""
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100_000):
+        size = min(100_000, count - start)
+        chunk = centers[rng.integers(0, topics, size)]
+        chunk += 0.25 * rng.standard_normal((size, dim)).astype(np.float32)
+        vectors[start:start + size] = chunk
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def main() -> None:
+    """Run the benchmark and print a JSON report."""
+    args = parse_args()
+    rng = np.random.default_rng(7)
+    vectors = synthetic_vectors(rng, args.vectors, args.dim)
+    ids = [str(i) for i in range(args.vectors)]
+
+    index = VectorIndex(args.dim, nprobe=args.nprobe)
+    started = time.perf_counter()
+    for start in range(0, args.vectors, 100_000):
+        index.upsert(ids[start:start + 100_000], vectors[start:start + 100_000])
+    insert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.apply_lists(index.build_lists())
+    build_seconds = time.perf_counter() - started
+
+    queries = vectors[rng.integers(0, args.vectors, args.queries)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    timings = []
+    recalls = []
+    for query in queries:
+        started = time.perf_counter()
+        found = index.search(query, args.k)
+        timings.append((time.perf_counter() - started) * 1000)
+        exact = np.argpartition(-(vectors @ query), args.k)[:args.k]
+        recalls.append(len({int(item_id) for item_id, _ in found} & set(exact.tolist())) / args.k)
+
+    timings.sort()
+    report = {
+        "vectors": args.vectors,
+        "dim": args.dim,
+        "lists": len(index.lists),
+        "nprobe": index.nprobe,
+        "insert_seconds": round(insert_seconds, 1),
+        "build_seconds": round(build_seconds, 1),
+        "latency_ms_median": round(statistics.median(timings), 2),
+        "latency_ms_p99": round(timings[int(len(timings) * 0.99) - 1], 2),
+        f"recall_at_{args.k}": round(statistics.mean(recalls), 3),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
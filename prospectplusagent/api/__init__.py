@@ -1,5 +1,5 @@
 """API routes initialization."""
 
-from prospectplusagent.api import prospects, analytics, agent, auth
+from prospectplusagent.api import prospects, analytics, agent, auth, jobs, admin, interactions
 
-__all__ = ["prospects", "analytics", "agent", "auth"]
+__all__ = ["prospects", "analytics", "agent", "auth", "jobs", "admin", "interactions"]
@@ -0,0 +1,82 @@
+"""Administrative API endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from pathlib import Path
+
+from prospectplusagent.config import settings
+from prospectplusagent.models import User
+from prospectplusagent.core.database import get_async_db
+from prospectplusagent.core.scoring import rescore_prospects
+from prospectplusagent.core.engagement import compact_engagement, rebuild_engagement
+from prospectplusagent.api.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/rescore")
+async def rescore(
+    only_unscored: bool = False,
+    batch_size: Optional[int] = Query(None, ge=1, le=500000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recompute rule-based scores for every prospect in bulk."""
+    return await rescore_prospects(db, batch_size=batch_size, only_unscored=only_unscored)
+
+
+@router.post("/engagement/compact")
+async def compact(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Expire engagement window days now instead of waiting for the periodic job."""
+    return await compact_engagement(db)
+
+
+@router.post("/engagement/rebuild")
+async def rebuild(
+    batch_size: Optional[int] = Query(None, ge=1, le=500000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recompute engagement features from the interactions table (backfill)."""
+    return await rebuild_engagement(db, batch_size=batch_size)
+
+
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """List recorded request profiles, newest first."""
+    profile_dir = Path(settings.profile_dir)
+    if not profile_dir.is_dir():
+        return []
+    trees = sorted(profile_dir.glob("*.txt"), reverse=True)[:limit]
+    return [
+        {
+            "id": tree.stem,
+            "size": tree.stat().st_size,
+            "files": [tree.name, f"{tree.stem}.folded"]
+        }
+        for tree in trees
+    ]
+
+
+@router.get("/profiles/{filename}")
+async def get_profile(
+    filename: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Download a profile's call tree (.txt) or folded stacks (.folded)."""
+    profile_dir = Path(settings.profile_dir).resolve()
+    path = (profile_dir / filename).resolve()
+    if path.parent != profile_dir or path.suffix not in (".txt", ".folded") or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain")
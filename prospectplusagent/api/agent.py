@@ -1,17 +1,61 @@
 """Agent API endpoints."""
 
 from fastapi import APIRouter, HTTPException, status
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any, AsyncIterator
+import json
+import logging
 
 from prospectplusagent.models import AgentQuery, AgentResponse
 from prospectplusagent.core.agent import agent
+from prospectplusagent.core.cache import analysis_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _chat_events(query: AgentQuery) -> AsyncIterator[str]:
+    """Relay streamed chat tokens as server-sent events.
+    
+    When the client disconnects the response task is cancelled, which
+    closes the token stream and releases the upstream connection.
+    """
+    chat_context = await agent.retrieve_context(query.query, query.context)
+    tokens = agent.stream_chat(query=query.query, chat_context=chat_context)
+    try:
+        async for token in tokens:
+            yield _sse("token", {"token": token})
+        yield _sse("done", {
+            "confidence": 0.85 if agent.client else 0.5,
+            "sources": chat_context.sources
+        })
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e}")
+        yield _sse("error", {"detail": f"Error processing query: {str(e)}"})
+    finally:
+        await tokens.aclose()
+
+
 @router.post("/chat", response_model=AgentResponse)
 async def chat_with_agent(query: AgentQuery):
-    """Chat with the AI agent."""
+    """Chat with the AI agent.
+    
+    With ``stream=true`` the answer is sent as server-sent events: a
+    ``token`` event per chunk followed by ``done`` (or ``error``).
+    """
+    if query.stream:
+        return StreamingResponse(
+            _chat_events(query),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     try:
         response = await agent.chat(
             query=query.query,
@@ -37,5 +81,13 @@ async def get_agent_status():
             "insights_generation"
         ],
         "ai_enabled": agent.client is not None,
+        "llm": agent.llm_stats(),
+        "analysis_cache": analysis_cache.stats(),
         "version": "1.0.0"
     }
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get analysis cache hit/miss counters."""
+    return analysis_cache.stats()
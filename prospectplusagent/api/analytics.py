@@ -1,47 +1,153 @@
 """Analytics API endpoints."""
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import String
+from typing import Optional, Dict
 from datetime import datetime, timedelta
 
-from prospectplusagent.models import AnalyticsResponse
+from prospectplusagent.models import (
+    AnalyticsResponse,
+    ProspectStatus,
+    ProspectPriority,
+    TrendGranularity
+)
 from prospectplusagent.models.database import ProspectDB
-from prospectplusagent.core.database import get_db
+from prospectplusagent.core.database import get_read_db
 
 router = APIRouter()
 
+# Bucket label formats shared by the SQL expressions and the zero-fill below
+BUCKET_LABELS = {
+    TrendGranularity.HOUR: "%Y-%m-%dT%H:00:00",
+    TrendGranularity.DAY: "%Y-%m-%d",
+    TrendGranularity.WEEK: "%Y-%m-%d",
+    TrendGranularity.MONTH: "%Y-%m",
+}
+
+POSTGRES_BUCKET_LABELS = {
+    TrendGranularity.HOUR: 'YYYY-MM-DD"T"HH24:00:00',
+    TrendGranularity.DAY: "YYYY-MM-DD",
+    TrendGranularity.WEEK: "YYYY-MM-DD",
+    TrendGranularity.MONTH: "YYYY-MM",
+}
+
+
+class date_bucket(FunctionElement):
+    """Label of the time bucket (hour, day, ISO week or month) containing a timestamp."""
+    type = String()
+    inherit_cache = True
+    
+    def __init__(self, column, granularity: TrendGranularity):
+        self.granularity = granularity
+        super().__init__(column)
+
+
+@compiles(date_bucket)
+def _compile_date_bucket(element, compiler, **kw):
+    raise CompileError(f"date_bucket is not supported on {compiler.dialect.name}")
+
+
+@compiles(date_bucket, "sqlite")
+def _compile_date_bucket_sqlite(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.granularity == TrendGranularity.WEEK:
+        # Step forward to Sunday, then back to that week's Monday
+        return f"date({column}, 'weekday 0', '-6 days')"
+    return f"strftime('{BUCKET_LABELS[element.granularity]}', {column})"
+
+
+@compiles(date_bucket, "postgresql")
+def _compile_date_bucket_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return (
+        f"to_char(date_trunc('{element.granularity.value}', {column}), "
+        f"'{POSTGRES_BUCKET_LABELS[element.granularity]}')"
+    )
+
+
+def _bucket_start(moment: datetime, granularity: TrendGranularity) -> datetime:
+    """Truncate a timestamp to the start of its bucket."""
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == TrendGranularity.HOUR:
+        return moment
+    moment = moment.replace(hour=0)
+    if granularity == TrendGranularity.WEEK:
+        return moment - timedelta(days=moment.weekday())
+    if granularity == TrendGranularity.MONTH:
+        return moment.replace(day=1)
+    return moment
+
+
+def _next_bucket(moment: datetime, granularity: TrendGranularity) -> datetime:
+    """Return the start of the bucket following ``moment``."""
+    if granularity == TrendGranularity.HOUR:
+        return moment + timedelta(hours=1)
+    if granularity == TrendGranularity.WEEK:
+        return moment + timedelta(weeks=1)
+    if granularity == TrendGranularity.MONTH:
+        if moment.month == 12:
+            return moment.replace(year=moment.year + 1, month=1)
+        return moment.replace(month=moment.month + 1)
+    return moment + timedelta(days=1)
+
+
+def _empty_series(
+    start_date: datetime,
+    end_date: datetime,
+    granularity: TrendGranularity
+) -> Dict[str, int]:
+    """Build an ordered, zero-filled mapping of bucket labels."""
+    label = BUCKET_LABELS[granularity]
+    series = {}
+    bucket = _bucket_start(start_date, granularity)
+    while bucket <= end_date:
+        series[bucket.strftime(label)] = 0
+        bucket = _next_bucket(bucket, granularity)
+    return series
+
 
 @router.get("/overview", response_model=AnalyticsResponse)
 async def get_analytics_overview(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get analytics overview."""
-    query = db.query(ProspectDB)
+    """Get analytics overview.
+    
+    All counts and the average score come from a single grouped
+    aggregation over (status, priority).
+    """
+    query = select(
+        ProspectDB.status,
+        ProspectDB.priority,
+        func.count(),
+        func.sum(ProspectDB.score),
+        func.count(ProspectDB.score)
+    ).group_by(ProspectDB.status, ProspectDB.priority)
     
     # Apply date filters
     if start_date:
-        query = query.filter(ProspectDB.created_at >= start_date)
+        query = query.where(ProspectDB.created_at >= start_date)
     if end_date:
-        query = query.filter(ProspectDB.created_at <= end_date)
-    
-    # Total prospects
-    total = query.count()
+        query = query.where(ProspectDB.created_at <= end_date)
     
-    # By status
-    status_counts = {}
-    for status_value in ["new", "contacted", "qualified", "proposal", "negotiation", "closed_won", "closed_lost"]:
-        count = query.filter(ProspectDB.status == status_value).count()
-        status_counts[status_value] = count
+    status_counts = {status_value.value: 0 for status_value in ProspectStatus}
+    priority_counts = {priority_value.value: 0 for priority_value in ProspectPriority}
+    total = 0
+    score_sum = 0.0
+    scored = 0
     
-    # By priority
-    priority_counts = {}
-    for priority_value in ["low", "medium", "high", "critical"]:
-        count = query.filter(ProspectDB.priority == priority_value).count()
-        priority_counts[priority_value] = count
+    for status_value, priority_value, count, group_score_sum, group_scored in await db.execute(query):
+        total += count
+        status_counts[status_value] = status_counts.get(status_value, 0) + count
+        priority_counts[priority_value] = priority_counts.get(priority_value, 0) + count
+        score_sum += group_score_sum or 0.0
+        scored += group_scored
     
     # Conversion rate
     total_closed = status_counts.get("closed_won", 0) + status_counts.get("closed_lost", 0)
@@ -50,10 +156,7 @@ async def get_analytics_overview(
         conversion_rate = status_counts.get("closed_won", 0) / total_closed
     
     # Average score
-    avg_score_result = query.filter(ProspectDB.score.isnot(None)).with_entities(
-        func.avg(ProspectDB.score)
-    ).scalar()
-    avg_score = float(avg_score_result) if avg_score_result else None
+    avg_score = score_sum / scored if scored else None
     
     return {
         "total_prospects": total,
@@ -68,49 +171,59 @@ async def get_analytics_overview(
 @router.get("/trends")
 async def get_trends(
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    granularity: TrendGranularity = TrendGranularity.DAY,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get prospect trends over time."""
+    """Get prospect trends over time.
+    
+    Rows are bucketed and counted in the database, so memory use depends
+    only on the number of buckets, not on the number of prospects.
+    """
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get prospects created in the period
-    prospects = db.query(ProspectDB).filter(
-        ProspectDB.created_at >= start_date,
-        ProspectDB.created_at <= end_date
-    ).all()
+    bucket = date_bucket(ProspectDB.created_at, granularity).label("bucket")
+    result = await db.execute(
+        select(bucket, func.count()).where(
+            ProspectDB.created_at >= start_date,
+            ProspectDB.created_at <= end_date
+        ).group_by(bucket)
+    )
     
-    # Group by day
-    daily_counts = {}
-    for prospect in prospects:
-        date_key = prospect.created_at.date().isoformat()
-        daily_counts[date_key] = daily_counts.get(date_key, 0) + 1
+    counts = _empty_series(start_date, end_date, granularity)
+    for label, count in result:
+        counts[label] = count
     
-    return {
+    response = {
         "period": f"last_{days}_days",
+        "granularity": granularity.value,
         "start_date": start_date.isoformat(),
         "end_date": end_date.isoformat(),
-        "daily_counts": daily_counts,
-        "total": len(prospects)
+        "series": [{"bucket": label, "count": count} for label, count in counts.items()],
+        "total": sum(counts.values())
     }
+    if granularity == TrendGranularity.DAY:
+        # Kept for clients written against the original day-only response
+        response["daily_counts"] = counts
+    return response
 
 
 @router.get("/top-industries")
 async def get_top_industries(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get top industries by prospect count."""
-    results = db.query(
+    results = (await db.execute(select(
         ProspectDB.industry,
         func.count(ProspectDB.id).label("count")
-    ).filter(
+    ).where(
         ProspectDB.industry.isnot(None)
     ).group_by(
         ProspectDB.industry
     ).order_by(
         func.count(ProspectDB.id).desc()
-    ).limit(limit).all()
+    ).limit(limit))).all()
     
     return {
         "industries": [
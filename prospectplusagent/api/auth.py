@@ -7,23 +7,25 @@ from typing import Optional
 
 from prospectplusagent.models import Token, User, UserInDB
 from prospectplusagent.core.auth import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
     create_access_token,
-    verify_token
+    verify_token_unrevoked,
+    revoke_token,
+    token_cache
 )
 from prospectplusagent.config import settings
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-# Demo user (in production, use a database)
+# Demo user (in production, use a database). The hash of "demo123" is
+# precomputed so importing the app does not spend ~0.4s in bcrypt.
 fake_users_db = {
     "demo": {
         "username": "demo",
         "full_name": "Demo User",
         "email": "demo@prospectplus.com",
-        "hashed_password": get_password_hash("demo123"),
+        "hashed_password": "$2b$12$R5YJj1EAxdDiQnCEpM9Ho.s/iCok9bwbj5Dz2tHXUe1uEUwUcbHNe",
         "disabled": False
     }
 }
@@ -37,19 +39,36 @@ def get_user(username: str) -> Optional[UserInDB]:
     return None
 
 
-def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
-    """Authenticate a user."""
+async def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
+    """Authenticate a user without blocking the event loop on bcrypt."""
     user = get_user(username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
 
+async def is_authorized(token: str) -> bool:
+    """Check that a bearer token belongs to an active user and is not revoked by any process."""
+    try:
+        user = await get_current_user(token)
+    except HTTPException:
+        return False
+    return not user.disabled
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Get current user from token."""
-    payload = verify_token(token)
+    """Get current user from token.
+    
+    Verified tokens are cached with their user, so repeat requests skip
+    JWT decoding and the user lookup.
+    """
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    
+    payload = await verify_token_unrevoked(token)
     username: str = payload.get("sub")
     if username is None:
         raise HTTPException(
@@ -62,13 +81,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    token_cache.set(token, payload, user)
     return user
 
 
 @router.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login to get access token."""
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,3 +109,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the current access token."""
+    await get_current_user(token)
+    await revoke_token(token)
+    return None
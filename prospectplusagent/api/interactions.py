@@ -0,0 +1,62 @@
+"""Interaction ingestion API endpoints."""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Union
+from datetime import datetime, timezone
+import uuid
+
+from prospectplusagent.config import settings
+from prospectplusagent.models import InteractionCreate, InteractionIngestResult
+from prospectplusagent.core.interactions import BufferFull, interaction_buffer
+
+router = APIRouter()
+
+
+def _to_row(event: InteractionCreate, received_at: datetime) -> dict:
+    """Build an insert row, storing timestamps as naive UTC like the rest of the schema."""
+    created_at = event.created_at or received_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "id": str(uuid.uuid4()),
+        "prospect_id": event.prospect_id,
+        "interaction_type": event.interaction_type,
+        "content": event.content,
+        "interaction_metadata": event.metadata,
+        "created_at": created_at
+    }
+
+
+@router.post("/", response_model=InteractionIngestResult, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_interactions(events: Union[InteractionCreate, List[InteractionCreate]]):
+    """Accept one interaction or a batch for write-behind insertion.
+
+    Events are buffered in memory and written in coalesced transactions, so
+    they appear in timelines within ``INTERACTION_FLUSH_INTERVAL`` seconds.
+    Returns 503 with ``Retry-After`` when the buffer stays full.
+    """
+    if not isinstance(events, list):
+        events = [events]
+    if len(events) > settings.interaction_max_batch:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.interaction_max_batch} interactions per request"
+        )
+
+    received_at = datetime.utcnow()
+    rows = [_to_row(event, received_at) for event in events]
+    try:
+        await interaction_buffer.add(rows)
+    except BufferFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    return {"accepted": len(rows), "ids": [row["id"] for row in rows]}
+
+
+@router.get("/stats")
+async def get_interaction_stats():
+    """Get write-behind buffer counters for this process."""
+    return interaction_buffer.stats()
@@ -0,0 +1,61 @@
+"""Background job API endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from prospectplusagent.models import AnalysisJob, JobStatus
+from prospectplusagent.models.database import AnalysisJobDB
+from prospectplusagent.core.database import get_async_db
+from prospectplusagent.core.jobs import analysis_pool
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_job_stats(db: AsyncSession = Depends(get_async_db)):
+    """Get worker pool counters and job counts by status."""
+    result = await db.execute(
+        select(AnalysisJobDB.status, func.count()).group_by(AnalysisJobDB.status)
+    )
+    by_status = {job_status.value: 0 for job_status in JobStatus}
+    by_status.update(dict(result.all()))
+    return {
+        "pool": analysis_pool.stats(),
+        "by_status": by_status
+    }
+
+
+@router.get("/", response_model=List[AnalysisJob])
+async def list_jobs(
+    status: Optional[JobStatus] = None,
+    prospect_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List analysis jobs, newest first."""
+    query = select(AnalysisJobDB)
+    
+    if status:
+        query = query.where(AnalysisJobDB.status == status.value)
+    if prospect_id:
+        query = query.where(AnalysisJobDB.prospect_id == prospect_id)
+    
+    result = await db.execute(query.order_by(AnalysisJobDB.created_at.desc()).limit(limit))
+    return [job.to_dict() for job in result.scalars().all()]
+
+
+@router.get("/{job_id}", response_model=AnalysisJob)
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the status and result of an analysis job."""
+    job = await db.get(AnalysisJobDB, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job.to_dict()
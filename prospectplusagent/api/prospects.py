@@ -1,60 +1,123 @@
 """Prospects API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import delete, select, tuple_, type_coerce, String
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 from prospectplusagent.models import (
     Prospect,
     ProspectCreate,
     ProspectUpdate,
     ProspectStatus,
-    ProspectPriority
+    ProspectPriority,
+    ProspectSort,
+    SortOrder,
+    ImportFormat,
+    ImportResult,
+    BatchAnalysisRequest,
+    BatchAnalysisResult,
+    ProspectMatch,
+    Interaction,
+    EngagementFeatures,
+    EngagementWindow
 )
-from prospectplusagent.models.database import ProspectDB
-from prospectplusagent.core.database import get_db
+from prospectplusagent.models.database import (
+    ProspectDB,
+    AnalysisJobDB,
+    InteractionDB,
+    ProspectEngagementDB,
+    EngagementDailyDB,
+    prospect_score_key
+)
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import get_async_db, get_read_db
 from prospectplusagent.core.agent import agent
+from prospectplusagent.core.engagement import get_engagement
+from prospectplusagent.core.scoring import save_scores
+from prospectplusagent.core.jobs import analysis_pool
+from prospectplusagent.core.pagination import encode_cursor, decode_cursor
+from prospectplusagent.core.importer import ProspectImporter, detect_format, iter_records
+from prospectplusagent.core.embeddings import SEARCH_FIELDS
+from prospectplusagent.core.vector_store import prospect_index
+from prospectplusagent.core.fulltext import fulltext_select
+from prospectplusagent.core.serialization import json_response
 
 router = APIRouter()
 
 
+def _timestamp_key(column, dialect_name: str):
+    """Return a timestamp column as a keyset sort key."""
+    if dialect_name == "sqlite":
+        # SQLite stores timestamps as text in mixed precisions; comparing the
+        # stored text keeps cursor comparisons consistent with ORDER BY.
+        return type_coerce(column, String)
+    return column
+
+
+def _sort_key(sort: ProspectSort, dialect_name: str):
+    """Return the SQL expression used as the keyset sort key."""
+    if sort == ProspectSort.SCORE:
+        return prospect_score_key
+    return _timestamp_key(ProspectDB.created_at, dialect_name)
+
+
+def _parse_cursor(cursor: str, sort: ProspectSort, order: SortOrder, dialect_name: str):
+    """Decode a list cursor into the (key, id) position to resume after."""
+    try:
+        position = decode_cursor(cursor)
+        if position.get("sort") != sort.value or position.get("order") != order.value:
+            raise ValueError("Cursor does not match the requested sort")
+        key = position["key"]
+        if sort == ProspectSort.CREATED_AT and dialect_name != "sqlite":
+            key = datetime.fromisoformat(key)
+        return key, position["id"]
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 @router.post("/", response_model=Prospect, status_code=status.HTTP_201_CREATED)
 async def create_prospect(
     prospect: ProspectCreate,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new prospect."""
+    """Create a new prospect.
+    
+    Scoring runs in the background; the analysis job ID is returned in the
+    ``X-Analysis-Job`` header and can be polled at ``/api/jobs/{job_id}``.
+    """
     # Check if email already exists
-    existing = db.query(ProspectDB).filter(ProspectDB.email == prospect.email).first()
-    if existing:
+    existing = await db.execute(
+        select(ProspectDB.id).where(ProspectDB.email == prospect.email)
+    )
+    if existing.first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A prospect with this email already exists"
         )
     
-    # Create new prospect
+    # Create new prospect and its analysis job in one transaction
     db_prospect = ProspectDB(
         id=str(uuid.uuid4()),
         **prospect.model_dump()
     )
+    job = AnalysisJobDB(id=str(uuid.uuid4()), prospect_id=db_prospect.id)
     
-    db.add(db_prospect)
-    db.commit()
-    db.refresh(db_prospect)
+    db.add_all([db_prospect, job])
+    await db.commit()
     
-    # Analyze prospect with AI
-    try:
-        analysis = await agent.analyze_prospect(db_prospect.to_dict())
-        db_prospect.score = analysis.get("score")
-        db.commit()
-        db.refresh(db_prospect)
-    except Exception as e:
-        # Continue even if analysis fails
-        pass
+    analysis_pool.submit(job.id)
+    response.headers["X-Analysis-Job"] = job.id
     
-    return db_prospect.to_dict()
+    result = db_prospect.to_dict()
+    await prospect_index.upsert([result])
+    return result
 
 
 @router.get("/", response_model=List[Prospect])
@@ -64,45 +127,251 @@ async def list_prospects(
     status: Optional[ProspectStatus] = None,
     priority: Optional[ProspectPriority] = None,
     industry: Optional[str] = None,
-    db: Session = Depends(get_db)
+    min_interactions: Optional[int] = Query(None, ge=0),
+    engagement_window: EngagementWindow = EngagementWindow.DAYS_30,
+    touched_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    sort: ProspectSort = ProspectSort.CREATED_AT,
+    order: SortOrder = SortOrder.ASC,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List prospects with optional filtering."""
-    query = db.query(ProspectDB)
+    """List prospects with optional filtering.
+    
+    Results are ordered by ``(sort, id)``. When more rows follow, the
+    ``X-Next-Cursor`` response header carries an opaque cursor; pass it back
+    as ``cursor`` with the same filters to fetch the next page. ``skip``
+    cannot be combined with a cursor.
+    
+    ``min_interactions`` (over ``engagement_window``) and ``touched_since``
+    filter on the precomputed engagement features, joined by primary key.
+    """
+    if cursor and skip:
+        # ``status`` is the filter parameter here, not the fastapi module
+        raise HTTPException(
+            status_code=400,
+            detail="Use either skip or cursor, not both"
+        )
+    dialect_name = db.bind.dialect.name
+    key = _sort_key(sort, dialect_name)
+    query = select(ProspectDB)
     
     if status:
-        query = query.filter(ProspectDB.status == status.value)
+        query = query.where(ProspectDB.status == status.value)
     if priority:
-        query = query.filter(ProspectDB.priority == priority.value)
+        query = query.where(ProspectDB.priority == priority.value)
     if industry:
-        query = query.filter(ProspectDB.industry == industry)
+        query = query.where(ProspectDB.industry == industry)
+    if min_interactions or touched_since:
+        query = query.join(ProspectEngagementDB, ProspectEngagementDB.prospect_id == ProspectDB.id)
+        if min_interactions:
+            column = getattr(ProspectEngagementDB, f"interactions_{engagement_window.value}")
+            query = query.where(column >= min_interactions)
+        if touched_since:
+            if touched_since.tzinfo is not None:
+                touched_since = touched_since.astimezone(timezone.utc).replace(tzinfo=None)
+            query = query.where(ProspectEngagementDB.last_touch_at >= touched_since)
+    
+    if cursor:
+        after = _parse_cursor(cursor, sort, order, dialect_name)
+        # The redundant bound on the key alone lets SQLite seek expression indexes
+        if order == SortOrder.ASC:
+            query = query.where(key >= after[0], tuple_(key, ProspectDB.id) > after)
+        else:
+            query = query.where(key <= after[0], tuple_(key, ProspectDB.id) < after)
     
-    prospects = query.offset(skip).limit(limit).all()
-    return [p.to_dict() for p in prospects]
+    if order == SortOrder.ASC:
+        query = query.order_by(key.asc(), ProspectDB.id.asc())
+    else:
+        query = query.order_by(key.desc(), ProspectDB.id.desc())
+    
+    result = await db.execute(
+        query.add_columns(key.label("sort_key")).offset(skip).limit(limit + 1)
+    )
+    rows = result.all()
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_key = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor({
+            "sort": sort.value,
+            "order": order.value,
+            "key": last_key.isoformat() if isinstance(last_key, datetime) else last_key,
+            "id": last.id
+        })
+    
+    return json_response([prospect.to_dict() for prospect, _ in rows], headers=headers)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_prospects(
+    request: Request,
+    format: Optional[ImportFormat] = None,
+    batch_size: Optional[int] = Query(None, ge=1, le=50000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Bulk import prospects from a streamed CSV or NDJSON request body.
+    
+    The format is taken from ``format`` or inferred from the Content-Type.
+    Invalid and duplicate rows are reported without aborting the import.
+    """
+    import_format = format or detect_format(request.headers.get("content-type", ""))
+    importer = ProspectImporter(db, batch_size=batch_size)
+    return await importer.run(iter_records(request.stream(), import_format))
+
+
+@router.get("/search", response_model=List[ProspectMatch])
+async def search_prospects(
+    q: str = Query(..., min_length=1, max_length=1000),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Find prospects whose company, industry or notes are closest in meaning to ``q``."""
+    matches = await prospect_index.search(q, limit)
+    if not matches:
+        return []
+    
+    result = await db.execute(
+        select(ProspectDB).where(ProspectDB.id.in_([prospect_id for prospect_id, _ in matches]))
+    )
+    prospects = {prospect.id: prospect for prospect in result.scalars()}
+    return [
+        {"score": score, "prospect": prospects[prospect_id].to_dict()}
+        for prospect_id, score in matches
+        if prospect_id in prospects
+    ]
+
+
+@router.get("/text-search", response_model=List[ProspectMatch])
+async def text_search_prospects(
+    q: str = Query(..., min_length=1, max_length=1000),
+    limit: int = Query(20, ge=1, le=200),
+    status: Optional[ProspectStatus] = None,
+    priority: Optional[ProspectPriority] = None,
+    industry: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Full-text search over company names and notes, best matches first.
+    
+    Every word in ``q`` must match; words are stemmed, so "approved" also
+    matches "approval". Company name matches rank above notes matches.
+    """
+    query = fulltext_select(q, db.bind.dialect.name)
+    if query is None:
+        return []
+    
+    if status:
+        query = query.where(ProspectDB.status == status.value)
+    if priority:
+        query = query.where(ProspectDB.priority == priority.value)
+    if industry:
+        query = query.where(ProspectDB.industry == industry)
+    
+    result = await db.execute(query.limit(limit))
+    return [
+        {"score": rank, "prospect": prospect.to_dict()}
+        for prospect, rank in result.all()
+    ]
 
 
 @router.get("/{prospect_id}", response_model=Prospect)
 async def get_prospect(
     prospect_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific prospect by ID."""
-    prospect = db.query(ProspectDB).filter(ProspectDB.id == prospect_id).first()
+    prospect = await db.get(ProspectDB, prospect_id)
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prospect not found"
         )
-    return prospect.to_dict()
+    return json_response(prospect.to_dict())
+
+
+@router.get("/{prospect_id}/interactions", response_model=List[Interaction])
+async def list_prospect_interactions(
+    prospect_id: str,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    order: SortOrder = SortOrder.DESC,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List a prospect's interactions, newest first by default.
+    
+    Pages are keyset-paginated on ``(created_at, id)`` and served by the
+    ``(prospect_id, created_at, id)`` index; pass ``X-Next-Cursor`` back as
+    ``cursor`` for the next page. Ingested events appear once the
+    write-behind buffer flushes.
+    """
+    dialect_name = db.bind.dialect.name
+    key = _timestamp_key(InteractionDB.created_at, dialect_name)
+    query = select(InteractionDB).where(InteractionDB.prospect_id == prospect_id)
+    
+    if cursor:
+        after = _parse_cursor(cursor, ProspectSort.CREATED_AT, order, dialect_name)
+        if order == SortOrder.ASC:
+            query = query.where(key >= after[0], tuple_(key, InteractionDB.id) > after)
+        else:
+            query = query.where(key <= after[0], tuple_(key, InteractionDB.id) < after)
+    
+    if order == SortOrder.ASC:
+        query = query.order_by(key.asc(), InteractionDB.id.asc())
+    else:
+        query = query.order_by(key.desc(), InteractionDB.id.desc())
+    
+    result = await db.execute(query.add_columns(key.label("sort_key")).limit(limit + 1))
+    rows = result.all()
+    
+    # Only an empty first page pays for the existence check
+    if not rows and not cursor and await db.get(ProspectDB, prospect_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prospect not found"
+        )
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_key = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor({
+            "sort": ProspectSort.CREATED_AT.value,
+            "order": order.value,
+            "key": last_key.isoformat() if isinstance(last_key, datetime) else last_key,
+            "id": last.id
+        })
+    
+    return json_response([interaction.to_dict() for interaction, _ in rows], headers=headers)
+
+
+@router.get("/{prospect_id}/engagement", response_model=EngagementFeatures)
+async def get_prospect_engagement(
+    prospect_id: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a prospect's rolling engagement features.
+    
+    Counts cover whole UTC days up to ``as_of`` and are kept current as
+    interactions are ingested; expired days are subtracted by the periodic
+    compaction job.
+    """
+    engagement = await get_engagement(db, prospect_id)
+    if "as_of" not in engagement and await db.get(ProspectDB, prospect_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prospect not found"
+        )
+    return engagement
 
 
 @router.put("/{prospect_id}", response_model=Prospect)
 async def update_prospect(
     prospect_id: str,
     prospect_update: ProspectUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a prospect."""
-    prospect = db.query(ProspectDB).filter(ProspectDB.id == prospect_id).first()
+    prospect = await db.get(ProspectDB, prospect_id)
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,50 +384,104 @@ async def update_prospect(
         setattr(prospect, field, value)
     
     prospect.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(prospect)
+    await db.commit()
+    await db.refresh(prospect)
     
-    return prospect.to_dict()
+    result = prospect.to_dict()
+    if set(update_data) & set(SEARCH_FIELDS):
+        await prospect_index.upsert([result])
+    return result
 
 
 @router.delete("/{prospect_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_prospect(
     prospect_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete a prospect."""
-    prospect = db.query(ProspectDB).filter(ProspectDB.id == prospect_id).first()
+    """Delete a prospect along with its interactions and engagement features."""
+    prospect = await db.get(ProspectDB, prospect_id)
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prospect not found"
         )
     
-    db.delete(prospect)
-    db.commit()
+    for model in (InteractionDB, ProspectEngagementDB, EngagementDailyDB):
+        await db.execute(delete(model).where(model.prospect_id == prospect_id))
+    await db.delete(prospect)
+    await db.commit()
+    await prospect_index.remove(prospect_id)
     return None
 
 
 @router.post("/{prospect_id}/analyze")
 async def analyze_prospect_endpoint(
     prospect_id: str,
-    db: Session = Depends(get_db)
+    refresh: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Analyze a prospect using AI."""
-    prospect = db.query(ProspectDB).filter(ProspectDB.id == prospect_id).first()
+    """Analyze a prospect using AI.
+    
+    Unchanged prospects are served from the analysis cache unless
+    ``refresh`` is set.
+    """
+    prospect = await db.get(ProspectDB, prospect_id)
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prospect not found"
         )
     
-    analysis = await agent.analyze_prospect(prospect.to_dict())
+    # End the read transaction so the pooled connection is not held during the LLM call
+    await db.commit()
+    analysis = await agent.analyze_prospect(prospect.to_dict(), use_cache=not refresh)
     
     # Update score
-    prospect.score = analysis.get("score")
-    db.commit()
+    await save_scores(db, [(prospect_id, analysis.get("score"))])
+    await db.commit()
     
     return {
         "prospect_id": prospect_id,
         "analysis": analysis
     }
+
+
+@router.post("/analyze-batch", response_model=BatchAnalysisResult)
+async def analyze_prospects_batch(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Analyze many prospects, packing several into each model request.
+    
+    Unknown IDs are listed in ``not_found``. Unchanged prospects are served
+    from the analysis cache unless ``refresh`` is set.
+    """
+    prospect_ids = list(dict.fromkeys(request.prospect_ids))
+    if len(prospect_ids) > settings.analysis_batch_max_prospects:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.analysis_batch_max_prospects} prospects per request"
+        )
+    
+    result = await db.execute(select(ProspectDB).where(ProspectDB.id.in_(prospect_ids)))
+    found = {prospect.id: prospect.to_dict() for prospect in result.scalars()}
+    # End the read transaction so the pooled connection is not held during the LLM calls
+    await db.commit()
+    
+    prospects = [found[prospect_id] for prospect_id in prospect_ids if prospect_id in found]
+    analyses = await agent.analyze_batch(prospects, use_cache=not request.refresh)
+    
+    if prospects:
+        await save_scores(db, [
+            (prospect["id"], analysis.get("score"))
+            for prospect, analysis in zip(prospects, analyses)
+        ])
+        await db.commit()
+    
+    return {
+        "results": [
+            {"prospect_id": prospect["id"], "analysis": analysis}
+            for prospect, analysis in zip(prospects, analyses)
+        ],
+        "not_found": [prospect_id for prospect_id in prospect_ids if prospect_id not in found]
+    }
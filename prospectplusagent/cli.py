@@ -6,12 +6,14 @@ from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress
-import httpx
-from typing import Optional
+from typing import List, Optional, Tuple
+import json
+import subprocess
 import sys
 
-from prospectplusagent.config import settings
-
+# Only import what every command needs here; the HTTP client and the server
+# stack (settings, FastAPI, SQLAlchemy, openai) load inside the commands
+# that use them so short commands start fast.
 console = Console()
 
 
@@ -25,16 +27,25 @@ def cli():
 @cli.command()
 @click.option('--host', default='localhost', help='Server host')
 @click.option('--port', default=8080, help='Server port')
-def serve(host: str, port: int):
+@click.option('--workers', default=1, help='Worker processes; above 1 prefork with gunicorn (0 = one per CPU)')
+def serve(host: str, port: int, workers: int):
     """Start the ProspectPlusAgent server."""
+    from prospectplusagent.config import settings
+
     console.print(Panel.fit(
         f"[bold blue]Starting ProspectPlusAgent Server[/bold blue]\n"
         f"Host: {host}\n"
         f"Port: {port}\n"
+        f"Workers: {workers or 'one per CPU'}\n"
         f"Environment: {settings.environment}",
         border_style="blue"
     ))
     
+    if workers != 1:
+        from prospectplusagent.server import run_workers
+        run_workers(host, port, workers)
+        return
+    
     import uvicorn
     from prospectplusagent.main import app
     
@@ -50,6 +61,8 @@ def serve(host: str, port: int):
 @click.option('--base-url', default='http://localhost:8080', help='API base URL')
 def status(base_url: str):
     """Check server status."""
+    import httpx
+
     async def check_status():
         try:
             async with httpx.AsyncClient() as client:
@@ -74,49 +87,82 @@ def prospect():
     pass
 
 
+def _prospect_table(prospects, title: str, relevance=None) -> Table:
+    """Render prospects as a rich table, optionally with search relevance."""
+    table = Table(title=title)
+    table.add_column("Company", style="cyan")
+    table.add_column("Contact", style="green")
+    table.add_column("Email", style="blue")
+    table.add_column("Status", style="yellow")
+    table.add_column("Priority", style="magenta")
+    table.add_column("Score", style="red")
+    if relevance is not None:
+        table.add_column("Relevance", style="white")
+    
+    for index, p in enumerate(prospects):
+        score = f"{p['score']*100:.0f}%" if p.get('score') else "N/A"
+        row = [
+            p['company_name'],
+            p['contact_name'],
+            p['email'],
+            p['status'],
+            p['priority'],
+            score
+        ]
+        if relevance is not None:
+            row.append(f"{relevance[index]:.3g}")
+        table.add_row(*row)
+    return table
+
+
 @prospect.command()
 @click.option('--base-url', default='http://localhost:8080', help='API base URL')
-@click.option('--limit', default=20, help='Number of prospects to list')
+@click.option('--limit', default=20, help='Number of prospects to list (page size with --all)')
 @click.option('--status', help='Filter by status')
 @click.option('--priority', help='Filter by priority')
-def list(base_url: str, limit: int, status: Optional[str], priority: Optional[str]):
+@click.option('--industry', help='Filter by industry')
+@click.option('--sort', type=click.Choice(['created_at', 'score']), default='created_at',
+              help='Sort key')
+@click.option('--order', type=click.Choice(['asc', 'desc']), default='asc', help='Sort order')
+@click.option('--all', 'walk_all', is_flag=True, help='Follow cursors through every page')
+def list(base_url: str, limit: int, status: Optional[str], priority: Optional[str],
+         industry: Optional[str], sort: str, order: str, walk_all: bool):
     """List all prospects."""
+    import httpx
+
     async def list_prospects():
         try:
-            params = {'limit': limit}
+            params = {'limit': limit, 'sort': sort, 'order': order}
             if status:
                 params['status'] = status
             if priority:
                 params['priority'] = priority
+            if industry:
+                params['industry'] = industry
             
+            total = 0
+            page = 0
             async with httpx.AsyncClient() as client:
-                response = await client.get(f"{base_url}/api/prospects", params=params)
-                prospects = response.json()
-                
-                if not prospects:
-                    console.print("[yellow]No prospects found[/yellow]")
-                    return
-                
-                table = Table(title=f"Prospects ({len(prospects)} total)")
-                table.add_column("Company", style="cyan")
-                table.add_column("Contact", style="green")
-                table.add_column("Email", style="blue")
-                table.add_column("Status", style="yellow")
-                table.add_column("Priority", style="magenta")
-                table.add_column("Score", style="red")
-                
-                for p in prospects:
-                    score = f"{p['score']*100:.0f}%" if p.get('score') else "N/A"
-                    table.add_row(
-                        p['company_name'],
-                        p['contact_name'],
-                        p['email'],
-                        p['status'],
-                        p['priority'],
-                        score
-                    )
-                
-                console.print(table)
+                while True:
+                    response = await client.get(f"{base_url}/api/prospects/", params=params)
+                    prospects = response.json()
+                    cursor = response.headers.get('X-Next-Cursor')
+                    page += 1
+                    total += len(prospects)
+                    
+                    if not prospects:
+                        if total == 0:
+                            console.print("[yellow]No prospects found[/yellow]")
+                        break
+                    
+                    title = f"Prospects ({len(prospects)} total)"
+                    if walk_all:
+                        title = f"Prospects (page {page}, {total} so far)"
+                    console.print(_prospect_table(prospects, title))
+                    
+                    if not walk_all or not cursor:
+                        break
+                    params['cursor'] = cursor
         except Exception as e:
             console.print(f"[bold red]Error:[/bold red] {e}")
     
@@ -135,6 +181,8 @@ def list(base_url: str, limit: int, status: Optional[str], priority: Optional[st
 @click.option('--notes', help='Notes')
 def add(base_url: str, company: str, contact: str, email: str, **kwargs):
     """Add a new prospect."""
+    import httpx
+
     async def add_prospect():
         try:
             data = {
@@ -175,11 +223,131 @@ def add(base_url: str, company: str, contact: str, email: str, **kwargs):
     asyncio.run(add_prospect())
 
 
+@prospect.command(name='import')
+@click.option('--base-url', default='http://localhost:8080', help='API base URL')
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']),
+              help='Input format (inferred from the file extension by default)')
+@click.option('--batch-size', type=int, help='Rows per insert transaction')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+def import_prospects(base_url: str, file_format: Optional[str], batch_size: Optional[int], file: str):
+    """Bulk import prospects from a CSV or NDJSON FILE."""
+    import httpx
+
+    file_format = file_format or ('ndjson' if file.lower().endswith(('.ndjson', '.jsonl', '.json')) else 'csv')
+    content_type = 'application/x-ndjson' if file_format == 'ndjson' else 'text/csv'
+    
+    async def upload():
+        with open(file, 'rb') as handle:
+            while chunk := handle.read(64 * 1024):
+                yield chunk
+    
+    async def import_file():
+        try:
+            params = {'format': file_format}
+            if batch_size:
+                params['batch_size'] = batch_size
+            
+            with Progress() as progress:
+                progress.add_task(f"[cyan]Importing {file}...", total=None)
+                async with httpx.AsyncClient(timeout=None) as client:
+                    response = await client.post(
+                        f"{base_url}/api/prospects/import",
+                        params=params,
+                        content=upload(),
+                        headers={'Content-Type': content_type}
+                    )
+                progress.stop()
+            
+            if response.status_code != 200:
+                error = response.json()
+                console.print(f"[bold red]Error:[/bold red] {error.get('detail', 'Unknown error')}")
+                return
+            
+            result = response.json()
+            console.print(Panel.fit(
+                f"[bold green]✓ Import finished[/bold green]\n"
+                f"Rows: {result['total_rows']}\n"
+                f"Inserted: {result['inserted']}\n"
+                f"Duplicates: {result['duplicates']}\n"
+                f"Failed: {result['failed']}",
+                border_style="green" if not result['failed'] else "yellow"
+            ))
+            
+            if result['errors']:
+                table = Table(title=f"Rejected rows (first {len(result['errors'])})")
+                table.add_column("Row", style="cyan")
+                table.add_column("Email", style="blue")
+                table.add_column("Error", style="red")
+                for error in result['errors']:
+                    table.add_row(str(error['row']), error.get('email') or '', error['error'])
+                console.print(table)
+        except Exception as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+    
+    asyncio.run(import_file())
+
+
+@prospect.command()
+@click.option('--base-url', default='http://localhost:8080', help='API base URL')
+@click.option('--limit', default=20, help='Number of results')
+@click.option('--status', help='Filter by status')
+@click.option('--priority', help='Filter by priority')
+@click.option('--industry', help='Filter by industry')
+@click.option('--semantic', is_flag=True, help='Search by meaning instead of matching words')
+@click.argument('query')
+def search(base_url: str, limit: int, status: Optional[str], priority: Optional[str],
+           industry: Optional[str], semantic: bool, query: str):
+    """Search prospect company names and notes for QUERY."""
+    import httpx
+
+    async def search_prospects():
+        try:
+            params = {'q': query, 'limit': limit}
+            if semantic:
+                if status or priority or industry:
+                    console.print("[yellow]Filters are ignored with --semantic[/yellow]")
+                path = "/api/prospects/search"
+            else:
+                path = "/api/prospects/text-search"
+                if status:
+                    params['status'] = status
+                if priority:
+                    params['priority'] = priority
+                if industry:
+                    params['industry'] = industry
+
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{base_url}{path}", params=params)
+
+            if response.status_code != 200:
+                error = response.json()
+                console.print(f"[bold red]Error:[/bold red] {error.get('detail', 'Unknown error')}")
+                return
+
+            matches = response.json()
+            if not matches:
+                console.print("[yellow]No matching prospects[/yellow]")
+                return
+
+            console.print(_prospect_table(
+                [match['prospect'] for match in matches],
+                f"Search results for '{query}' ({len(matches)})",
+                relevance=[match['score'] for match in matches]
+            ))
+        except Exception as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+
+    asyncio.run(search_prospects())
+
+
 @cli.command()
 @click.option('--base-url', default='http://localhost:8080', help='API base URL')
+@click.option('--stream/--no-stream', default=True, help='Render tokens as they arrive')
 @click.argument('query')
-def chat(base_url: str, query: str):
+def chat(base_url: str, stream: bool, query: str):
     """Chat with the AI agent."""
+    import httpx
+
     async def send_query():
         try:
             console.print(f"\n[bold blue]You:[/bold blue] {query}\n")
@@ -204,13 +372,42 @@ def chat(base_url: str, query: str):
         except Exception as e:
             console.print(f"[bold red]Error:[/bold red] {e}")
     
-    asyncio.run(send_query())
+    async def stream_query():
+        try:
+            console.print(f"\n[bold blue]You:[/bold blue] {query}\n")
+            console.print("[bold green]Agent:[/bold green] ", end="")
+            
+            # No read timeout: tokens may pause while the model is thinking
+            async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=None)) as client:
+                async with client.stream(
+                    'POST',
+                    f"{base_url}/api/agent/chat",
+                    json={'query': query, 'stream': True}
+                ) as response:
+                    event = None
+                    async for line in response.aiter_lines():
+                        if line.startswith('event: '):
+                            event = line[len('event: '):]
+                        elif line.startswith('data: '):
+                            data = json.loads(line[len('data: '):])
+                            if event == 'token':
+                                console.print(data['token'], end="", markup=False, highlight=False)
+                            elif event == 'done':
+                                console.print(f"\n\nConfidence: {data['confidence']*100:.0f}%")
+                            elif event == 'error':
+                                console.print(f"\n[bold red]Error:[/bold red] {data['detail']}")
+        except Exception as e:
+            console.print(f"\n[bold red]Error:[/bold red] {e}")
+    
+    asyncio.run(stream_query() if stream else send_query())
 
 
 @cli.command()
 @click.option('--base-url', default='http://localhost:8080', help='API base URL')
 def analytics(base_url: str):
     """Show analytics overview."""
+    import httpx
+
     async def show_analytics():
         try:
             async with httpx.AsyncClient() as client:
@@ -283,5 +480,105 @@ def init():
     console.print("3. Visit http://localhost:8080 in your browser")
 
 
+@cli.command()
+@click.option('--only-unscored', is_flag=True, help='Only score prospects without a score')
+@click.option('--batch-size', type=int, default=None, help='Rows per vectorized batch')
+def rescore(only_unscored: bool, batch_size: Optional[int]):
+    """Recompute rule-based scores for every prospect directly in the database."""
+    from prospectplusagent.core.database import AsyncSessionLocal, async_engine
+    from prospectplusagent.core.scoring import rescore_prospects
+
+    async def run_rescore():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await rescore_prospects(
+                    db, batch_size=batch_size, only_unscored=only_unscored
+                )
+        finally:
+            await async_engine.dispose()
+
+    with console.status("[bold blue]Rescoring prospects...[/bold blue]"):
+        try:
+            result = asyncio.run(run_rescore())
+        except Exception as e:
+            console.print(f"[bold red]✗ Error rescoring prospects:[/bold red] {e}")
+            sys.exit(1)
+
+    console.print(
+        f"[bold green]✓ Rescored {result['scanned']} prospects[/bold green] "
+        f"({result['updated']} changed, {result['unchanged']} unchanged) "
+        f"in {result['seconds']:.2f}s"
+    )
+
+
+def _import_times(module: str) -> List[Tuple[str, int, int, int]]:
+    """Import MODULE in a fresh interpreter with ``-X importtime``.
+
+    Returns ``(name, depth, self_us, cumulative_us)`` rows in the order
+    Python reports them.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise click.ClickException(f"Could not import {module}: {lines[-1] if lines else result.returncode}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+@cli.command(name='startup-report')
+@click.option('--module', default='prospectplusagent.main', help='Module to import')
+@click.option('--budget', type=float, default=2.5, help='Fail if the import takes longer (seconds)')
+@click.option('--top', default=10, help='Rows per table')
+@click.option('--repeat', default=3, help='Imports to run; the fastest is reported')
+def startup_report(module: str, budget: float, top: int, repeat: int):
+    """Report what importing MODULE costs and check it against a budget."""
+    runs = []
+    with console.status(f"[bold blue]Importing {module}...[/bold blue]"):
+        for _ in range(max(repeat, 1)):
+            rows = _import_times(module)
+            total = next(cumulative for name, depth, _, cumulative in rows if name == module and depth == 0)
+            runs.append((total, rows))
+    total, rows = min(runs, key=lambda run: run[0])
+
+    # Self times add up without double counting, so group those by package
+    packages = {}
+    for name, _, self_us, _ in rows:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    package_table = Table(title="Import time by package")
+    package_table.add_column("Package", style="cyan")
+    package_table.add_column("Self (ms)", justify="right", style="green")
+    for root, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        package_table.add_row(root, f"{self_us / 1000:.1f}")
+
+    module_table = Table(title="Slowest modules (self time)")
+    module_table.add_column("Module", style="cyan")
+    module_table.add_column("Self (ms)", justify="right", style="green")
+    module_table.add_column("Cumulative (ms)", justify="right")
+    for name, _, self_us, cumulative in sorted(rows, key=lambda row: -row[2])[:top]:
+        module_table.add_row(name, f"{self_us / 1000:.1f}", f"{cumulative / 1000:.1f}")
+
+    console.print(package_table)
+    console.print(module_table)
+
+    seconds = total / 1_000_000
+    if seconds > budget:
+        console.print(f"[bold red]✗ Importing {module} took {seconds:.2f}s (budget {budget:.2f}s)[/bold red]")
+        sys.exit(1)
+    console.print(f"[bold green]✓ Importing {module} took {seconds:.2f}s (budget {budget:.2f}s)[/bold green]")
+
+
 if __name__ == '__main__':
     cli()
@@ -22,11 +22,66 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./prospectplus.db"
+    database_async_url: str = ""
+    database_read_url: str = ""
+    read_your_writes_window: float = 5.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+    db_pool_timeout: float = 30.0
+    db_pool_pre_ping: bool = True
+    
+    # SQLite (applied to every new connection to a file database)
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_cache_size: int = -64000
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout: int = 5000
+    
+    # Analysis Cache
+    analysis_cache_enabled: bool = True
+    analysis_cache_size: int = 10000
+    analysis_cache_ttl: int = 2592000
+    
+    # Background Analysis
+    analysis_workers: int = 4
+    analysis_queue_size: int = 1000
+    analysis_poll_interval: float = 5.0
+    analysis_max_attempts: int = 3
+    analysis_stale_after: int = 300
+    
+    # Batch Analysis
+    analysis_batch_size: int = 16
+    analysis_batch_tokens: int = 6000
+    analysis_batch_attempts: int = 3
+    analysis_batch_max_prospects: int = 1000
+    
+    # Interaction Ingestion
+    interaction_buffer_size: int = 50000
+    interaction_flush_rows: int = 2000
+    interaction_flush_interval: float = 0.1
+    interaction_enqueue_timeout: float = 1.0
+    interaction_max_batch: int = 1000
+    interaction_max_flush_attempts: int = 3
+    
+    # Engagement Features
+    engagement_compaction_interval: float = 3600.0
+    engagement_compaction_batch: int = 5000
+    
+    # Bulk Import
+    import_batch_size: int = 5000
+    import_max_reported_errors: int = 1000
+    
+    # Bulk Rescoring
+    rescore_batch_size: int = 50000
     
     # Security
     secret_key: str = "change-this-in-production-to-a-secure-random-key"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    password_hash_workers: int = 2
+    token_cache_size: int = 10000
+    token_cache_ttl: float = 60.0
     
     # CORS
     allowed_origins: List[str] = ["*"]
@@ -36,9 +91,50 @@ class Settings(BaseSettings):
     temperature: float = 0.7
     max_tokens: int = 2000
     
+    # LLM Client
+    openai_base_url: str = ""
+    llm_max_concurrency: int = 16
+    llm_max_connections: int = 20
+    llm_timeout: float = 60.0
+    llm_max_retries: int = 2
+    anthropic_base_url: str = ""
+    anthropic_model: str = "claude-3-sonnet-20240229"
+    anthropic_max_concurrency: int = 8
+    
+    # LLM Routing
+    llm_providers: List[str] = ["openai", "anthropic"]
+    llm_backoff_base: float = 0.5
+    llm_backoff_max: float = 8.0
+    llm_breaker_failures: int = 5
+    llm_breaker_cooldown: float = 30.0
+    llm_hedge_delay: float = 0.0
+    
+    # Chat Context
+    chat_context_tokens: int = 1500
+    chat_context_candidates: int = 20
+    chat_interactions_per_prospect: int = 3
+    
+    # Metrics
+    metrics_enabled: bool = True
+    
+    # Profiling
+    profiling_enabled: bool = True
+    profile_sample_rate: float = 0.0
+    profile_interval: float = 0.005
+    profile_dir: str = "./logs/profiles"
+    profile_max_count: int = 100
+    
     # Vector Store
     vector_store_path: str = "./data/chroma"
     
+    # Semantic Search
+    embedding_backend: str = "local"
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dim: int = 256
+    search_nprobe: int = 16
+    search_ivf_min_vectors: int = 20000
+    search_sync_interval: float = 5.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
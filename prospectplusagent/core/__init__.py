@@ -1,20 +1,26 @@
 """Core services initialization."""
 
-from prospectplusagent.core.database import get_db, init_db
+from prospectplusagent.core.database import get_db, get_async_db, get_read_db, init_db
 from prospectplusagent.core.agent import agent
 from prospectplusagent.core.auth import (
     verify_password,
+    verify_password_async,
     get_password_hash,
+    get_password_hash_async,
     create_access_token,
     verify_token
 )
 
 __all__ = [
     "get_db",
+    "get_async_db",
+    "get_read_db",
     "init_db",
     "agent",
     "verify_password",
+    "verify_password_async",
     "get_password_hash",
+    "get_password_hash_async",
     "create_access_token",
     "verify_token"
 ]
@@ -1,102 +1,400 @@
 """AI Agent service for prospect analysis and interaction."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+import asyncio
+import json
 import logging
 from datetime import datetime
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
 from prospectplusagent.config import settings
+from prospectplusagent.core.providers import LLMRouter, build_router
+from prospectplusagent.core.cache import analysis_cache, cache_key
+from prospectplusagent.core.scoring import rule_based_score
+from prospectplusagent.core.engagement import load_engagement, load_engagements
+from prospectplusagent.core.retrieval import (
+    ChatContext,
+    context_retriever,
+    context_budget,
+    context_window,
+    estimate_tokens
+)
 
 logger = logging.getLogger(__name__)
 
+CHAT_SYSTEM_PROMPT = (
+    "You are an AI assistant specialized in prospect and lead management. "
+    "Help users analyze prospects, suggest next steps, and provide insights. "
+    "Base answers on the relevant records when they are provided, and cite "
+    "record IDs in square brackets."
+)
+
+BATCH_ANALYSIS_PROMPT = """Analyze each prospect below and provide:
+1. "score": a number from 0-1 indicating quality
+2. "insights": key insights
+3. "recommendations": recommendations for engagement
+4. "next_steps": suggested next steps
+5. "confidence": a number from 0-1
+
+Respond with a JSON object of the form
+{"results": [{"id": "<id>", "score": 0.0, "insights": [], "recommendations": [], "next_steps": [], "confidence": 0.0}]}
+with one entry per prospect, using the id in brackets before each prospect.
+
+Prospects:
+"""
+
+# Completion tokens reserved for each prospect's entry in a batch response
+ANALYSIS_RESULT_TOKENS = 200
+
+# Bump whenever an analysis prompt or parsing changes to invalidate cached
+# results; single and batch analyses share cache entries
+ANALYSIS_PROMPT_VERSION = "1"
+
 
 class ProspectAgent:
     """AI Agent for prospect analysis and management."""
     
     def __init__(self):
         """Initialize the agent."""
-        self.client = None
-        if OPENAI_AVAILABLE and settings.openai_api_key:
-            try:
-                self.client = OpenAI(api_key=settings.openai_api_key)
-                logger.info("OpenAI client initialized")
-            except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI client: {e}")
+        self._client: Optional[LLMRouter] = None
+        self._client_initialized = False
+
+    @property
+    def client(self) -> Optional[LLMRouter]:
+        """LLM router over the configured providers, built on first use so
+        importing the app stays cheap."""
+        if not self._client_initialized:
+            self._client_initialized = True
+            self._client = build_router()
+        return self._client
+
+    @client.setter
+    def client(self, client: Optional[LLMRouter]) -> None:
+        """Replace the LLM client (a router or a single provider client)."""
+        self._client = client
+        self._client_initialized = True
+    
+    def llm_stats(self) -> Dict[str, Any]:
+        """Router stats, or nothing before the router is built."""
+        if not self._client_initialized or not isinstance(self._client, LLMRouter):
+            return {}
+        return self._client.stats()
     
     async def analyze_prospect(
         self,
-        prospect_data: Dict[str, Any]
+        prospect_data: Dict[str, Any],
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        """Analyze a prospect and provide insights."""
+        """Analyze a prospect and provide insights.
+        
+        AI results are cached on a hash of the prompt context, model and
+        prompt version; pass ``use_cache=False`` to force a fresh analysis.
+        Engagement features are looked up by ID unless already included.
+        """
+        prospect_data = await self._with_engagement(prospect_data)
         try:
             # Build context from prospect data
             context = self._build_prospect_context(prospect_data)
             
+            # Only AI results are cached; the rule-based fallback is cheap
+            caching = self.client is not None and settings.analysis_cache_enabled
+            key = cache_key(context, settings.default_model, ANALYSIS_PROMPT_VERSION)
+            
             # Generate analysis
             if self.client:
+                if caching and use_cache:
+                    cached = await analysis_cache.get(key)
+                    if cached is not None:
+                        return cached
                 response = await self._generate_openai_analysis(context)
             else:
                 response = self._generate_fallback_analysis(prospect_data)
             
-            return {
+            result = {
                 "score": response.get("score", 0.5),
                 "insights": response.get("insights", []),
                 "recommendations": response.get("recommendations", []),
                 "next_steps": response.get("next_steps", []),
                 "confidence": response.get("confidence", 0.7)
             }
+            if caching:
+                await analysis_cache.set(
+                    key, result, settings.default_model, ANALYSIS_PROMPT_VERSION
+                )
+            return result
         except Exception as e:
             logger.error(f"Error analyzing prospect: {e}")
             return self._generate_fallback_analysis(prospect_data)
     
+    async def analyze_batch(
+        self,
+        prospects: List[Dict[str, Any]],
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Analyze several prospects with as few model requests as possible.
+        
+        Prospect contexts are packed into JSON-mode requests of at most
+        ``analysis_batch_size`` prospects and ``analysis_batch_tokens``
+        prompt tokens, sent concurrently. Prospects missing from a response
+        or with an unusable entry are re-packed and retried, up to
+        ``analysis_batch_attempts`` rounds; any still left get the
+        rule-based analysis. Results are in input order and share the
+        cache with ``analyze_prospect``.
+        """
+        prospects = await self._with_engagements(prospects)
+        if not self.client:
+            return [self._generate_fallback_analysis(p) for p in prospects]
+        
+        model = settings.default_model
+        caching = settings.analysis_cache_enabled
+        contexts = [self._build_prospect_context(p) for p in prospects]
+        keys = [cache_key(context, model, ANALYSIS_PROMPT_VERSION) for context in contexts]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prospects)
+        
+        pending = list(range(len(prospects)))
+        if caching and use_cache:
+            for index in pending:
+                results[index] = await analysis_cache.get(keys[index])
+            pending = [index for index in pending if results[index] is None]
+        
+        requests = 0
+        for attempt in range(settings.analysis_batch_attempts):
+            if not pending:
+                break
+            batches = self._pack_analysis_batches(pending, contexts, model)
+            requests += len(batches)
+            responses = await asyncio.gather(
+                *(self._request_analysis_batch(batch, contexts, model) for batch in batches)
+            )
+            for analyses in responses:
+                for index, analysis in analyses.items():
+                    results[index] = analysis
+                    if caching:
+                        await analysis_cache.set(keys[index], analysis, model, ANALYSIS_PROMPT_VERSION)
+            pending = [index for index in pending if results[index] is None]
+            if pending:
+                logger.warning(f"Batch analysis round {attempt + 1} left {len(pending)} prospects unanalyzed")
+        
+        for index in pending:
+            results[index] = self._generate_fallback_analysis(prospects[index])
+        logger.info(f"Analyzed {len(prospects)} prospects in {requests} requests ({len(pending)} fell back)")
+        return results
+    
     async def chat(
         self,
         query: str,
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Process a chat query about prospects."""
+        """Process a chat query about prospects, grounded in retrieved data."""
+        chat_context = await self.retrieve_context(query, context)
         try:
             if self.client:
-                messages = [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an AI assistant specialized in prospect and lead management. "
-                            "Help users analyze prospects, suggest next steps, and provide insights."
-                        )
-                    },
-                    {"role": "user", "content": query}
-                ]
-                
-                if context:
-                    messages.insert(1, {
-                        "role": "system",
-                        "content": f"Context: {context}"
-                    })
-                
-                response = self.client.chat.completions.create(
-                    model=settings.default_model,
-                    messages=messages,
-                    temperature=settings.temperature,
-                    max_tokens=settings.max_tokens
+                content = await self.client.complete(
+                    self._build_chat_messages(query, chat_context)
                 )
                 
                 return {
-                    "response": response.choices[0].message.content,
+                    "response": content,
                     "confidence": 0.85,
-                    "sources": []
+                    "sources": chat_context.sources
                 }
             else:
-                return self._generate_fallback_chat_response(query)
+                return self._generate_fallback_chat_response(query, chat_context)
                 
         except Exception as e:
             logger.error(f"Error processing chat query: {e}")
-            return self._generate_fallback_chat_response(query)
+            return self._generate_fallback_chat_response(query, chat_context)
+    
+    async def stream_chat(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        chat_context: Optional[ChatContext] = None
+    ) -> AsyncIterator[str]:
+        """Stream a chat answer token by token.
+        
+        Pass a ``chat_context`` from ``retrieve_context`` to reuse it (for
+        example to report its sources). Falls back to the limited-mode
+        response if the model fails before producing any output; later
+        failures are raised to the caller.
+        """
+        if chat_context is None:
+            chat_context = await self.retrieve_context(query, context)
+        if not self.client:
+            yield self._generate_fallback_chat_response(query, chat_context)["response"]
+            return
+        
+        started = False
+        try:
+            async for token in self.client.stream(self._build_chat_messages(query, chat_context)):
+                started = True
+                yield token
+        except Exception as e:
+            logger.error(f"Error streaming chat query: {e}")
+            if started:
+                raise
+            yield self._generate_fallback_chat_response(query, chat_context)["response"]
+    
+    async def retrieve_context(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> ChatContext:
+        """Retrieve prospects and interactions for a query within the model's token budget."""
+        prompt_tokens = estimate_tokens(CHAT_SYSTEM_PROMPT) + estimate_tokens(query)
+        budget = context_budget(settings.default_model, prompt_tokens)
+        try:
+            return await context_retriever.build(query, budget, extra=context)
+        except Exception as e:
+            logger.error(f"Error retrieving chat context: {e}")
+            return ChatContext()
+    
+    def _build_chat_messages(
+        self,
+        query: str,
+        chat_context: Optional[ChatContext] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the chat prompt messages."""
+        messages = [
+            {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ]
+        
+        if chat_context and chat_context.text:
+            messages.insert(1, {
+                "role": "system",
+                "content": f"Relevant records:\n{chat_context.text}"
+            })
+        return messages
+    
+    async def _with_engagement(self, prospect_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the prospect's engagement features (one primary-key read)."""
+        if "engagement" in prospect_data or not prospect_data.get("id"):
+            return prospect_data
+        try:
+            engagement = await load_engagement(prospect_data["id"])
+        except Exception as e:
+            logger.warning(f"Failed to load engagement features: {e}")
+            return prospect_data
+        return {**prospect_data, "engagement": engagement}
+    
+    async def _with_engagements(self, prospects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach engagement features to many prospects in one pass."""
+        missing = [p["id"] for p in prospects if "engagement" not in p and p.get("id")]
+        if not missing:
+            return prospects
+        try:
+            engagements = await load_engagements(missing)
+        except Exception as e:
+            logger.warning(f"Failed to load engagement features: {e}")
+            return prospects
+        return [
+            {**p, "engagement": engagements[p["id"]]} if p.get("id") in engagements and "engagement" not in p else p
+            for p in prospects
+        ]
+    
+    def _pack_analysis_batches(
+        self,
+        indexes: List[int],
+        contexts: List[str],
+        model: str
+    ) -> List[List[int]]:
+        """Greedily group prospects into requests within the size and token limits.
+        
+        A prospect too large for the budget still goes out, in a request of
+        its own.
+        """
+        size = max(1, settings.analysis_batch_size)
+        window_budget = context_window(model) - size * ANALYSIS_RESULT_TOKENS
+        budget = min(settings.analysis_batch_tokens, window_budget) - estimate_tokens(BATCH_ANALYSIS_PROMPT)
+        
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        used = 0
+        for index in indexes:
+            # Plus the "[n] " label and newline
+            tokens = estimate_tokens(contexts[index]) + 3
+            if batch and (len(batch) >= size or used + tokens > budget):
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append(index)
+            used += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _request_analysis_batch(
+        self,
+        batch: List[int],
+        contexts: List[str],
+        model: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """Analyze one packed batch; return the usable results by prospect index.
+        
+        Prospects are labelled with short positional IDs rather than their
+        UUIDs to save tokens. A failed request yields no results, so all of
+        its prospects are retried.
+        """
+        refs = {str(position): index for position, index in enumerate(batch, start=1)}
+        listing = "\n".join(f"[{ref}] {contexts[index]}" for ref, index in refs.items())
+        try:
+            content = await self.client.complete(
+                [
+                    {
+                        "role": "system",
+                        "content": "You are a prospect analysis expert. Reply with JSON only."
+                    },
+                    {"role": "user", "content": BATCH_ANALYSIS_PROMPT + listing}
+                ],
+                model=model,
+                temperature=0.5,
+                max_tokens=len(batch) * ANALYSIS_RESULT_TOKENS,
+                response_format={"type": "json_object"}
+            )
+        except Exception as e:
+            logger.error(f"Batch analysis request for {len(batch)} prospects failed: {e}")
+            return {}
+        return self._parse_analysis_batch(content, refs)
+    
+    def _parse_analysis_batch(
+        self,
+        content: Optional[str],
+        refs: Dict[str, int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Pull per-prospect analyses out of a batch response.
+        
+        Tolerates text around the JSON object; entries with an unknown ID
+        or without a numeric score are skipped.
+        """
+        content = content or ""
+        start, end = content.find("{"), content.rfind("}")
+        try:
+            data = json.loads(content[start:end + 1]) if 0 <= start < end else {}
+        except ValueError:
+            logger.warning("Batch analysis response is not valid JSON")
+            return {}
+        entries = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return {}
+        
+        parsed: Dict[int, Dict[str, Any]] = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index = refs.get(str(entry.get("id")).strip("[] "))
+            score = entry.get("score")
+            if index is None or isinstance(score, bool) or not isinstance(score, (int, float)):
+                continue
+            confidence = entry.get("confidence")
+            if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+                confidence = 0.7
+            parsed[index] = {
+                "score": min(max(float(score), 0.0), 1.0),
+                "insights": _string_list(entry.get("insights")),
+                "recommendations": _string_list(entry.get("recommendations")),
+                "next_steps": _string_list(entry.get("next_steps")),
+                "confidence": min(max(float(confidence), 0.0), 1.0)
+            }
+        return parsed
     
     def _build_prospect_context(self, prospect_data: Dict[str, Any]) -> str:
         """Build context string from prospect data."""
@@ -109,6 +407,12 @@ class ProspectAgent:
         ]
         if prospect_data.get('notes'):
             parts.append(f"Notes: {prospect_data['notes']}")
+        engagement = prospect_data.get('engagement') or {}
+        if engagement.get('total_interactions'):
+            parts.append(
+                f"Engagement: {engagement['interactions_7d']} interactions in 7 days, "
+                f"{engagement['interactions_30d']} in 30, {engagement['interactions_90d']} in 90"
+            )
         return " | ".join(parts)
     
     async def _generate_openai_analysis(
@@ -127,9 +431,8 @@ Prospect: {context}
 
 Provide a structured response."""
 
-            response = self.client.chat.completions.create(
-                model=settings.default_model,
-                messages=[
+            content = await self.client.complete(
+                [
                     {
                         "role": "system",
                         "content": "You are a prospect analysis expert."
@@ -140,8 +443,6 @@ Provide a structured response."""
                 max_tokens=1000
             )
             
-            content = response.choices[0].message.content
-            
             # Parse response (simplified)
             return {
                 "score": 0.75,
@@ -159,21 +460,15 @@ Provide a structured response."""
         prospect_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate basic analysis without AI."""
-        # Simple rule-based scoring
-        score = 0.5
+        # Simple rule-based scoring, shared with bulk rescoring
+        score = rule_based_score(prospect_data)
         insights = []
         recommendations = []
         
-        # Adjust score based on available data
         if prospect_data.get('industry'):
-            score += 0.1
             insights.append(f"Industry: {prospect_data['industry']}")
         
-        if prospect_data.get('company_size'):
-            score += 0.1
-        
         if prospect_data.get('website'):
-            score += 0.1
             insights.append("Has company website")
         
         # Priority-based recommendations
@@ -184,28 +479,52 @@ Provide a structured response."""
             recommendations.append("Schedule follow-up within 1 week")
         
         return {
-            "score": min(score, 1.0),
+            "score": score,
             "insights": insights or ["New prospect - needs initial qualification"],
             "recommendations": recommendations,
             "next_steps": ["Initial outreach", "Gather qualification data"],
             "confidence": 0.6
         }
     
+    async def aclose(self) -> None:
+        """Release the LLM client's pooled connections."""
+        if self._client:
+            await self._client.aclose()
+    
     def _generate_fallback_chat_response(
         self,
-        query: str
+        query: str,
+        chat_context: Optional[ChatContext] = None
     ) -> Dict[str, Any]:
         """Generate fallback response when AI is unavailable."""
+        response = (
+            "I'm currently running in limited mode. "
+            "To enable full AI capabilities, please configure an OpenAI or Anthropic API key. "
+            f"Your query was: {query}"
+        )
+        sources = []
+        if chat_context and chat_context.prospects:
+            shown = chat_context.prospects[:5]
+            matches = ", ".join(
+                f"{p['company_name']} ({p['status']}, {p['priority']} priority)" for p in shown
+            )
+            response += f"\n\nProspects related to your query: {matches}"
+            sources = [f"prospect:{p['id']}" for p in shown]
         return {
-            "response": (
-                "I'm currently running in limited mode. "
-                "To enable full AI capabilities, please configure your OpenAI API key. "
-                f"Your query was: {query}"
-            ),
+            "response": response,
             "confidence": 0.5,
-            "sources": []
+            "sources": sources
         }
 
 
+def _string_list(value: Any) -> List[str]:
+    """Coerce a model-supplied field into a list of strings."""
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item) for item in value if item is not None]
+
+
 # Global agent instance
 agent = ProspectAgent()
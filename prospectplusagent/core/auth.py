@@ -1,15 +1,41 @@
 """Authentication utilities."""
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from sqlalchemy import delete
 
 from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.models.database import RevokedTokenDB
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a few threads keep logins off the event loop
+_password_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    """Create the password hashing pool on first use."""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="password-hash"
+        )
+    return _password_executor
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -21,6 +47,20 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bounded hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_executor(), get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -28,7 +68,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -44,3 +84,114 @@ def verify_token(token: str) -> dict:
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def token_id(token: str, payload: Dict[str, Any]) -> str:
+    """Return the ID revocations are keyed on: ``jti``, or a hash of older tokens."""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """LRU cache of verified tokens, keyed on the raw token string.
+
+    An entry lives until the token's ``exp`` but no longer than ``ttl``
+    seconds, so revocations made by other processes (recorded in
+    ``revoked_tokens``) take effect within ``ttl``. Revocations in this
+    process take effect immediately.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        """Initialize the cache."""
+        self.max_size = max_size or settings.token_cache_size
+        self.ttl = settings.token_cache_ttl if ttl is None else ttl
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the value cached for a still-valid, unrevoked token."""
+        entry = self._entries.get(token)
+        if entry is not None:
+            expires, entry_id, value = entry
+            if expires > time.monotonic() and entry_id not in self._revoked:
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return value
+            del self._entries[token]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, payload: Dict[str, Any], value: Any) -> None:
+        """Cache ``value`` for a verified token until it expires."""
+        lifetime = self.ttl
+        if "exp" in payload:
+            lifetime = min(lifetime, payload["exp"] - time.time())
+        if lifetime <= 0:
+            return
+        self._entries[token] = (time.monotonic() + lifetime, token_id(token, payload), value)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revoke(self, revoked_id: str, expires_at: float) -> None:
+        """Reject a token ID in this process until ``expires_at`` (a Unix time)."""
+        now = time.time()
+        self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+        self._revoked[revoked_id] = expires_at
+
+    def is_revoked(self, revoked_id: str) -> bool:
+        """Check this process's revocations."""
+        return self._revoked.get(revoked_id, 0) > time.time()
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# Global token cache instance
+token_cache = TokenCache()
+
+
+async def verify_token_unrevoked(token: str) -> dict:
+    """Verify a token and check it has not been revoked by any process."""
+    payload = verify_token(token)
+    revoked_id = token_id(token, payload)
+    revoked = token_cache.is_revoked(revoked_id)
+    if not revoked:
+        async with AsyncSessionLocal() as db:
+            revoked = await db.get(RevokedTokenDB, revoked_id) is not None
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+async def revoke_token(token: str) -> None:
+    """Revoke a token everywhere until it would have expired."""
+    payload = verify_token(token)
+    revoked_id = token_id(token, payload)
+    expires_at = payload.get("exp", time.time() + settings.access_token_expire_minutes * 60)
+    token_cache.revoke(revoked_id, expires_at)
+    async with AsyncSessionLocal() as db:
+        await db.merge(RevokedTokenDB(
+            token_id=revoked_id,
+            expires_at=datetime.utcfromtimestamp(expires_at)
+        ))
+        # Expired revocations no longer matter; prune them as we go
+        await db.execute(delete(RevokedTokenDB).where(RevokedTokenDB.expires_at < datetime.utcnow()))
+        await db.commit()
@@ -0,0 +1,111 @@
+"""Content-addressed cache for prospect analysis results."""
+
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import time
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.models.database import AnalysisCacheDB
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(context: str, model: str, prompt_version: str) -> str:
+    """Hash the analysis inputs into a cache key."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, context):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier analysis cache: an in-process LRU in front of a database table.
+
+    Entries are keyed on a hash of the prompt context, model and prompt
+    version, so any change to the inputs is a miss. Both tiers expire
+    entries after ``ttl`` seconds; the table tier survives restarts.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[int] = None):
+        """Initialize the cache."""
+        self.max_size = max_size or settings.analysis_cache_size
+        self.ttl = ttl or settings.analysis_cache_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, checking memory first, then the table."""
+        entry = self._entries.get(key)
+        if entry:
+            expires, result = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return result
+            del self._entries[key]
+
+        try:
+            async with AsyncSessionLocal() as db:
+                row = await db.get(AnalysisCacheDB, key)
+        except Exception as e:
+            logger.warning(f"Analysis cache lookup failed: {e}")
+            row = None
+
+        if row and row.expires_at > datetime.utcnow():
+            remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+            self._remember(key, row.result, remaining)
+            self.persistent_hits += 1
+            return row.result
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any], model: str, prompt_version: str) -> None:
+        """Store a result in both tiers."""
+        self._remember(key, result, self.ttl)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.merge(AnalysisCacheDB(
+                    key=key,
+                    model=model,
+                    prompt_version=prompt_version,
+                    result=result,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self.ttl)
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "enabled": settings.analysis_cache_enabled,
+            "memory_entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.persistent_hits) / lookups if lookups else 0.0
+        }
+
+    def _remember(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        """Insert into the LRU tier, evicting the oldest entry when full."""
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+# Global cache instance
+analysis_cache = AnalysisCache()
@@ -1,40 +1,222 @@
 """Database service for managing database connections."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from typing import Generator
+from sqlalchemy.pool import StaticPool, QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from fastapi import Request
+from typing import Generator, AsyncGenerator, Dict, Any, Optional
 import logging
+import os
+import threading
+import time
 
 from prospectplusagent.config import settings
 from prospectplusagent.models.database import Base
+from prospectplusagent.core.fulltext import install_fulltext
+from prospectplusagent.core.metrics import instrument_engine
 
 logger = logging.getLogger(__name__)
 
+# Async drivers used for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str, override: Optional[str] = None) -> str:
+    """Translate a sync database URL into its async driver equivalent.
+
+    ``override`` (``settings.database_async_url`` for the primary) wins
+    when set.
+    """
+    if override:
+        return override
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme or scheme not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """Check whether a URL points at an in-memory SQLite database."""
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def _pool_options() -> Dict[str, Any]:
+    """Pool settings shared by both engines."""
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Build pool options for the sync engine."""
+    if not url.startswith("sqlite"):
+        return _pool_options()
+    options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if _is_memory_sqlite(url):
+        # Every connection to :memory: is a separate database; share one
+        options["poolclass"] = StaticPool
+    else:
+        options.update(_pool_options(), poolclass=QueuePool)
+    return options
+
+
+def _async_engine_options(url: str) -> Dict[str, Any]:
+    """Build pool options for the async engine."""
+    if _is_memory_sqlite(url):
+        return {"poolclass": StaticPool}
+    options = _pool_options()
+    if url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool; pool explicitly so the settings apply
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Pragmas applied to every new connection to a SQLite file."""
+    return {
+        # First, so the others wait out a concurrent writer instead of failing
+        "busy_timeout": settings.sqlite_busy_timeout,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Configure a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
 # Create engine
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool
-    )
-else:
-    engine = create_engine(settings.database_url)
-
-# Create session factory
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+
+# Create async engine
+async_database_url = get_async_database_url(settings.database_url, settings.database_async_url)
+async_engine = create_async_engine(
+    async_database_url,
+    **_async_engine_options(async_database_url)
+)
+
+# Optional read replica; reads go to the primary when it is not configured
+read_database_url = get_async_database_url(settings.database_read_url) if settings.database_read_url else None
+read_engine = create_async_engine(
+    read_database_url,
+    **_async_engine_options(read_database_url)
+) if read_database_url else None
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if read_engine is not None:
+    instrument_engine(read_engine.sync_engine)
+
+_engines_by_url = [(settings.database_url, engine), (async_database_url, async_engine.sync_engine)]
+if read_engine is not None:
+    _engines_by_url.append((read_database_url, read_engine.sync_engine))
+for _url, _engine in _engines_by_url:
+    if _url.startswith("sqlite") and not _is_memory_sqlite(_url):
+        event.listen(_engine, "connect", _apply_sqlite_pragmas)
+
+_db_ready = False
+_db_init_lock = threading.RLock()
+_db_init_thread = None
+
+
+class ReadOnlySession(Session):
+    """Session that refuses to write, used for replica and read-path sessions."""
+
+    def flush(self, objects=None) -> None:
+        """Raise if there is anything to write."""
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Read-only session cannot write; use get_async_db")
+        super().flush(objects)
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+AsyncPrimaryReadSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False
+) if read_engine is not None else AsyncPrimaryReadSessionLocal
+
+# Cookie marking a client that wrote recently; holds the Unix time it lapses
+READ_PRIMARY_COOKIE = "ppa_read_primary_until"
+# Header forcing a read from the primary
+READ_PRIMARY_HEADER = "x-read-primary"
 
 
 def init_db() -> None:
     """Initialize database tables."""
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            install_fulltext(connection)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
 
+def ensure_db() -> None:
+    """Run ``init_db()`` once per process, on first use.
+
+    Called when a connection is first used rather than on import, so
+    processes that never touch the database (most CLI commands, cold starts
+    serving cached routes) skip the DDL round trips.
+    """
+    global _db_ready, _db_init_thread
+    if _db_ready:
+        return
+    with _db_init_lock:
+        # init_db() opens connections itself; let those through
+        if _db_ready or _db_init_thread is threading.current_thread():
+            return
+        _db_init_thread = threading.current_thread()
+        try:
+            init_db()
+            _db_ready = True
+        finally:
+            _db_init_thread = None
+
+
+def _ensure_db_on_connect(connection) -> None:
+    """Create the schema before the first connection is used."""
+    ensure_db()
+
+
+# "engine_connect" fires after pool checkout, so init_db() can check out a
+# connection of its own (a "connect" hook would deadlock on StaticPool)
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "engine_connect", _ensure_db_on_connect)
+
+
 def get_db() -> Generator[Session, None, None]:
     """Get database session."""
     db = SessionLocal()
@@ -44,5 +226,97 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-# Initialize database on import
-init_db()
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Check whether a read must see this client's own recent writes.
+
+    Clients opt in per request with ``X-Read-Primary: 1``; clients that
+    keep cookies are routed to the primary for ``read_your_writes_window``
+    seconds after any write (see ``ReadYourWritesMiddleware``).
+    """
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only async session, served by the replica when configured."""
+    factory = AsyncPrimaryReadSessionLocal if reads_from_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """Mark clients that just wrote so their next reads skip the replica.
+
+    Successful non-GET responses set a cookie lasting
+    ``read_your_writes_window`` seconds, long enough for replication to
+    catch up. Only installed when a replica is configured.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app, window: Optional[float] = None):
+        """Initialize the middleware."""
+        self.app = app
+        self.window = settings.read_your_writes_window if window is None else window
+
+    async def __call__(self, scope, receive, send):
+        """Add the cookie to successful writes."""
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={time.time() + self.window:.3f}; "
+                    f"Max-Age={max(int(self.window), 1)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Return async connection pool usage."""
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow()
+    }
+
+
+def _reset_pools_after_fork() -> None:
+    """Drop pooled connections inherited from the parent process.
+
+    A forked worker must open its own connections; ``close=False`` leaves
+    the parent's sockets and file handles alone.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    if read_engine is not None:
+        read_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+async def close_db() -> None:
+    """Dispose of pooled database connections."""
+    await async_engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+    engine.dispose()
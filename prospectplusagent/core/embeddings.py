@@ -0,0 +1,126 @@
+"""Text embedding backends for semantic prospect search."""
+
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import math
+import re
+import zlib
+
+import numpy as np
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.llm import LLMClient, OPENAI_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Prospect fields that make up the searchable text
+SEARCH_FIELDS = ["company_name", "industry", "notes"]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def prospect_text(prospect_data: Dict[str, Any]) -> str:
+    """Build the text that represents a prospect in the vector index."""
+    return " \n".join(
+        str(prospect_data[field]) for field in SEARCH_FIELDS if prospect_data.get(field)
+    )
+
+
+class Embedder:
+    """Base class for embedding backends.
+
+    ``name`` and ``dim`` are stored with the index, so switching backends
+    triggers a rebuild instead of mixing incompatible vectors.
+    """
+
+    name = "base"
+
+    def __init__(self, dim: int):
+        """Initialize the embedder."""
+        self.dim = dim
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Return one L2-normalized float32 row per text."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class HashingEmbedder(Embedder):
+    """Offline embedder using signed feature hashing.
+
+    Words and their character trigrams are hashed into ``dim`` buckets, so
+    related spellings ("fintech", "finance") share features without any
+    model download or network call.
+    """
+
+    name = "local"
+
+    def embed_sync(self, texts: List[str]) -> np.ndarray:
+        """Embed texts on the calling thread."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for word in TOKEN_PATTERN.findall(text.lower()):
+                padded = f"<{word}>"
+                features = [word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+                for feature in features:
+                    digest = zlib.crc32(feature.encode())
+                    bucket = digest % self.dim
+                    sign = 1.0 if digest & 0x80000000 else -1.0
+                    counts[bucket] = counts.get(bucket, 0.0) + sign
+            for bucket, count in counts.items():
+                if count:
+                    # Sublinear term frequency keeps repeated words from dominating
+                    vectors[row, bucket] = math.copysign(1.0 + math.log(abs(count)), count)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Return one L2-normalized float32 row per text.
+
+        Large batches are hashed on a worker thread to keep the event loop
+        responsive while the index is being built.
+        """
+        if len(texts) > 64:
+            return await asyncio.to_thread(self.embed_sync, texts)
+        return self.embed_sync(texts)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embedder backed by the OpenAI embeddings API."""
+
+    name = "openai"
+
+    def __init__(self, client: LLMClient, model: str, dim: int):
+        """Initialize the embedder."""
+        super().__init__(dim)
+        self.client = client
+        self.model = model
+        self.name = f"openai:{model}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Return one L2-normalized float32 row per text."""
+        rows = await self.client.embed([text or " " for text in texts], self.model, self.dim)
+        vectors = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    async def aclose(self) -> None:
+        """Close the client's pooled connections."""
+        await self.client.aclose()
+
+
+def create_embedder(client: Optional[LLMClient] = None) -> Embedder:
+    """Create the embedder selected by ``settings.embedding_backend``."""
+    if settings.embedding_backend == "openai":
+        if client is None and OPENAI_AVAILABLE and settings.openai_api_key:
+            client = LLMClient(settings.openai_api_key, base_url=settings.openai_base_url)
+        if client is not None:
+            return OpenAIEmbedder(client, settings.embedding_model, settings.embedding_dim)
+        logger.warning("OpenAI embeddings unavailable, using the local embedder")
+    elif settings.embedding_backend != "local":
+        logger.warning(f"Unknown embedding backend '{settings.embedding_backend}', using local")
+    return HashingEmbedder(settings.embedding_dim)
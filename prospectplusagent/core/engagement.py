@@ -0,0 +1,357 @@
+"""Per-prospect engagement features, maintained as interactions arrive."""
+
+from typing import Dict, Any, Iterable, List, Optional
+from collections import Counter
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, case, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.models.database import EngagementDailyDB, InteractionDB, ProspectDB, ProspectEngagementDB
+
+logger = logging.getLogger(__name__)
+
+# Feature column -> window length in UTC days
+WINDOWS = {
+    "interactions_7d": 7,
+    "interactions_30d": 30,
+    "interactions_90d": 90,
+}
+LONGEST_WINDOW = max(WINDOWS.values())
+
+EPOCH = date(1970, 1, 1)
+
+# Prospect IDs per IN list, well under every backend's parameter limit
+ID_CHUNK_SIZE = 500
+
+features = ProspectEngagementDB.__table__
+daily = EngagementDailyDB.__table__
+prospects = ProspectDB.__table__
+
+
+def epoch_day(moment: datetime) -> int:
+    """Return the UTC day of a naive-UTC timestamp as days since the epoch."""
+    return (moment.date() - EPOCH).days
+
+
+def day_date(day: int) -> date:
+    """Inverse of ``epoch_day``."""
+    return EPOCH + timedelta(days=day)
+
+
+def _chunks(items: List[Any], size: int = ID_CHUNK_SIZE) -> Iterable[List[Any]]:
+    """Split a list into chunks of at most ``size``."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def record_engagement(db: AsyncSession, rows: List[Dict[str, Any]], today: Optional[int] = None) -> None:
+    """Fold newly inserted interactions into the engagement features.
+
+    Runs in the caller's transaction, so features commit together with the
+    interactions they count. Work is proportional to the batch: counts
+    are aggregated per (prospect, day) and applied as increments; nothing
+    is recounted from the interactions table. Each window counts days
+    after ``window_end - length``, which keeps increments correct for
+    rows that compaction has not moved forward yet.
+    """
+    if not rows:
+        return
+    today = epoch_day(datetime.utcnow()) if today is None else today
+    per_day: Counter = Counter()
+    last_touch: Dict[str, datetime] = {}
+    for row in rows:
+        prospect_id, created_at = row["prospect_id"], row["created_at"]
+        per_day[(prospect_id, epoch_day(created_at))] += 1
+        if prospect_id not in last_touch or created_at > last_touch[prospect_id]:
+            last_touch[prospect_id] = created_at
+
+    existing_days = set()
+    for chunk in _chunks(list(per_day)):
+        # Exact (prospect, day) pairs; separate IN lists would probe their cross product
+        result = await db.execute(
+            select(daily.c.prospect_id, daily.c.day).where(tuple_(daily.c.prospect_id, daily.c.day).in_(chunk))
+        )
+        existing_days.update((prospect_id, day) for prospect_id, day in result.all())
+    existing_features = set()
+    for chunk in _chunks(list(last_touch)):
+        result = await db.execute(select(features.c.prospect_id).where(features.c.prospect_id.in_(chunk)))
+        existing_features.update(result.scalars())
+
+    await _add_daily_counts(db, per_day, existing_days)
+    await _add_feature_counts(db, per_day, last_touch, existing_features, today)
+
+    # Engagement is not an edit: keep updated_at so search indexes skip the row
+    await db.execute(
+        update(prospects)
+        .where(
+            prospects.c.id == bindparam("b_id"),
+            or_(prospects.c.last_contact.is_(None), prospects.c.last_contact < bindparam("b_touch"))
+        )
+        .values(last_contact=bindparam("b_touch"), updated_at=prospects.c.updated_at),
+        [{"b_id": prospect_id, "b_touch": touched} for prospect_id, touched in last_touch.items()]
+    )
+
+
+async def _add_daily_counts(
+    db: AsyncSession,
+    per_day: Counter,
+    existing: set
+) -> None:
+    """Add per-day counts to the daily buckets."""
+    new = [
+        {"prospect_id": prospect_id, "day": day, "interactions": count}
+        for (prospect_id, day), count in per_day.items() if (prospect_id, day) not in existing
+    ]
+    if new:
+        await db.execute(insert(daily), new)
+    changed = [
+        {"b_id": prospect_id, "b_day": day, "b_count": count}
+        for (prospect_id, day), count in per_day.items() if (prospect_id, day) in existing
+    ]
+    if changed:
+        await db.execute(
+            update(daily)
+            .where(daily.c.prospect_id == bindparam("b_id"), daily.c.day == bindparam("b_day"))
+            .values(interactions=daily.c.interactions + bindparam("b_count")),
+            changed
+        )
+
+
+async def _add_feature_counts(
+    db: AsyncSession,
+    per_day: Counter,
+    last_touch: Dict[str, datetime],
+    existing: set,
+    today: int
+) -> None:
+    """Add per-day counts to each prospect's windows."""
+    new: Dict[str, Dict[str, Any]] = {}
+    changed = []
+    for (prospect_id, day), count in per_day.items():
+        if prospect_id in existing:
+            changed.append({"b_id": prospect_id, "b_day": day, "b_count": count})
+            continue
+        row = new.setdefault(prospect_id, {
+            "prospect_id": prospect_id,
+            **{column: 0 for column in WINDOWS},
+            "total_interactions": 0,
+            "last_touch_at": last_touch[prospect_id],
+            "window_end": today
+        })
+        for column, length in WINDOWS.items():
+            row[column] += count if day > today - length else 0
+        row["total_interactions"] += count
+
+    if new:
+        await db.execute(insert(features), list(new.values()))
+    if changed:
+        day = bindparam("b_day")
+        count = bindparam("b_count")
+        await db.execute(
+            update(features)
+            .where(features.c.prospect_id == bindparam("b_id"))
+            .values(
+                **{
+                    column: features.c[column] + case((day > features.c.window_end - length, count), else_=0)
+                    for column, length in WINDOWS.items()
+                },
+                total_interactions=features.c.total_interactions + count
+            ),
+            changed
+        )
+        await db.execute(
+            update(features)
+            .where(
+                features.c.prospect_id == bindparam("b_id"),
+                or_(features.c.last_touch_at.is_(None), features.c.last_touch_at < bindparam("b_touch"))
+            )
+            .values(last_touch_at=bindparam("b_touch")),
+            [
+                {"b_id": prospect_id, "b_touch": touched}
+                for prospect_id, touched in last_touch.items() if prospect_id in existing
+            ]
+        )
+
+
+async def compact_engagement(
+    db: AsyncSession,
+    today: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """Expire days that have left the windows and prune old daily buckets.
+
+    Each prospect's windows move from its ``window_end`` to ``today``,
+    subtracting only the daily buckets that dropped out, in batches of
+    short transactions. The update is guarded on ``window_end`` so
+    concurrent runs in several workers never subtract twice.
+    """
+    started = time.perf_counter()
+    today = epoch_day(datetime.utcnow()) if today is None else today
+    batch_size = batch_size or settings.engagement_compaction_batch
+
+    def expired(length: int):
+        return select(func.coalesce(func.sum(daily.c.interactions), 0)).where(
+            daily.c.prospect_id == features.c.prospect_id,
+            daily.c.day > features.c.window_end - length,
+            daily.c.day <= today - length
+        ).scalar_subquery()
+
+    compacted = 0
+    while True:
+        result = await db.execute(
+            select(features.c.prospect_id).where(features.c.window_end < today).limit(batch_size)
+        )
+        prospect_ids = result.scalars().all()
+        if not prospect_ids:
+            break
+        for chunk in _chunks(prospect_ids):
+            result = await db.execute(
+                update(features)
+                .where(features.c.prospect_id.in_(chunk), features.c.window_end < today)
+                .values(
+                    **{column: features.c[column] - expired(length) for column, length in WINDOWS.items()},
+                    window_end=today
+                )
+            )
+            compacted += result.rowcount
+        await db.commit()
+
+    # Every row now ends on today, so these buckets are outside all windows
+    result = await db.execute(delete(daily).where(daily.c.day <= today - LONGEST_WINDOW))
+    await db.commit()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Compacted engagement for {compacted} prospects, pruned {result.rowcount} buckets in {elapsed:.2f}s")
+    return {
+        "day": day_date(today).isoformat(),
+        "compacted": compacted,
+        "pruned": result.rowcount,
+        "seconds": round(elapsed, 3)
+    }
+
+
+async def rebuild_engagement(db: AsyncSession, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute all features from the interactions table.
+
+    A one-off backfill for interactions stored before the features existed
+    or written around the ingestion API (such as by the seeder). Run it
+    while ingestion is paused; it streams the table in primary-key order.
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.engagement_compaction_batch
+    await db.execute(delete(features))
+    await db.execute(delete(daily))
+    await db.commit()
+
+    query = select(InteractionDB.id, InteractionDB.prospect_id, InteractionDB.created_at).order_by(InteractionDB.id)
+    scanned = 0
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else query.where(InteractionDB.id > last_id)
+        rows = (await db.execute(batch_query.limit(batch_size))).all()
+        if not rows:
+            break
+        await record_engagement(db, [
+            {"prospect_id": prospect_id, "created_at": created_at}
+            for _, prospect_id, created_at in rows if created_at is not None
+        ])
+        await db.commit()
+        scanned += len(rows)
+        last_id = rows[-1][0]
+
+    # Rows start on today's window, so nothing needs compacting yet
+    elapsed = time.perf_counter() - started
+    logger.info(f"Rebuilt engagement features from {scanned} interactions in {elapsed:.2f}s")
+    return {"scanned": scanned, "seconds": round(elapsed, 3)}
+
+
+def features_dict(prospect_id: str, row: Optional[ProspectEngagementDB]) -> Dict[str, Any]:
+    """Shape a feature row (or its absence) as an ``EngagementFeatures`` dict."""
+    if row is None:
+        return {"prospect_id": prospect_id, **{column: 0 for column in WINDOWS}, "total_interactions": 0}
+    data = row.to_dict()
+    data["as_of"] = day_date(data.pop("window_end"))
+    return data
+
+
+async def get_engagement(db: AsyncSession, prospect_id: str) -> Dict[str, Any]:
+    """Read a prospect's features with a single primary-key lookup."""
+    return features_dict(prospect_id, await db.get(ProspectEngagementDB, prospect_id))
+
+
+async def load_engagement(prospect_id: str) -> Dict[str, Any]:
+    """``get_engagement`` in a session of its own."""
+    async with AsyncSessionLocal() as db:
+        return await get_engagement(db, prospect_id)
+
+
+async def load_engagements(prospect_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Features for several prospects, read in chunked ``IN`` queries."""
+    ids = list(dict.fromkeys(prospect_ids))
+    rows: Dict[str, ProspectEngagementDB] = {}
+    async with AsyncSessionLocal() as db:
+        for chunk in _chunks(ids):
+            result = await db.execute(
+                select(ProspectEngagementDB).where(ProspectEngagementDB.prospect_id.in_(chunk))
+            )
+            rows.update((row.prospect_id, row) for row in result.scalars())
+    return {prospect_id: features_dict(prospect_id, rows.get(prospect_id)) for prospect_id in ids}
+
+
+class EngagementCompactor:
+    """Run ``compact_engagement`` periodically in the background.
+
+    Windows are whole UTC days, so a run only has work to do after
+    midnight; the others find nothing to expire and return quickly.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        """Initialize the compactor."""
+        self.interval = interval or settings.engagement_compaction_interval
+        self.runs = 0
+        self.compacted = 0
+        self.last_run_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the periodic job."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._compactor())
+
+    async def stop(self) -> None:
+        """Stop the periodic job."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return compaction counters."""
+        return {
+            "runs": self.runs,
+            "compacted": self.compacted,
+            "last_run_seconds": self.last_run_seconds
+        }
+
+    async def _compactor(self) -> None:
+        """Compact on startup and then every ``interval`` seconds."""
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await compact_engagement(db)
+                self.runs += 1
+                self.compacted += result["compacted"]
+                self.last_run_seconds = result["seconds"]
+            except Exception as e:
+                logger.error(f"Engagement compaction failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Global compactor instance
+engagement_compactor = EngagementCompactor()
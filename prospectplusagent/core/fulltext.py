@@ -0,0 +1,143 @@
+"""Full-text search over prospect company names and notes.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers;
+Postgres uses a generated ``tsvector`` column with a GIN index. Both are
+maintained by the database itself, so every write path stays in sync.
+"""
+
+from typing import Optional
+import logging
+import re
+
+from sqlalchemy import Float, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import Select
+
+from prospectplusagent.models.database import ProspectDB
+
+logger = logging.getLogger(__name__)
+
+# Company name matches count this many times more than notes matches
+COMPANY_NAME_WEIGHT = 10.0
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prospects_fts USING fts5(
+        company_name, notes,
+        content='prospects', content_rowid='rowid',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prospects_fts_insert AFTER INSERT ON prospects BEGIN
+        INSERT INTO prospects_fts(rowid, company_name, notes)
+        VALUES (new.rowid, new.company_name, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prospects_fts_delete AFTER DELETE ON prospects BEGIN
+        INSERT INTO prospects_fts(prospects_fts, rowid, company_name, notes)
+        VALUES ('delete', old.rowid, old.company_name, old.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prospects_fts_update AFTER UPDATE OF company_name, notes ON prospects BEGIN
+        INSERT INTO prospects_fts(prospects_fts, rowid, company_name, notes)
+        VALUES ('delete', old.rowid, old.company_name, old.notes);
+        INSERT INTO prospects_fts(rowid, company_name, notes)
+        VALUES (new.rowid, new.company_name, new.notes);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE prospects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(company_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(notes, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_prospects_search_vector ON prospects USING GIN (search_vector)",
+]
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Lightweight handle on the SQLite FTS5 table, which is not an ORM model
+prospects_fts = table("prospects_fts", column("rowid"))
+
+
+def install_fulltext(connection: Connection) -> None:
+    """Create the full-text index for the connection's dialect if missing.
+
+    On SQLite an existing table is backfilled the first time the index is
+    created.
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'prospects_fts'")
+        ).first()
+        try:
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+        except OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, full-text search disabled: {e}")
+            return
+        if not exists:
+            connection.execute(text("INSERT INTO prospects_fts(prospects_fts) VALUES ('rebuild')"))
+    elif dialect_name == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    else:
+        logger.warning(f"Full-text search is not supported on {dialect_name}")
+
+
+def _fts5_query(query: str, match_any: bool = False) -> Optional[str]:
+    """Turn free text into an FTS5 query matching all (or any) of its words."""
+    words = WORD_PATTERN.findall(query)
+    if not words:
+        return None
+    return (" OR " if match_any else " ").join(f'"{word}"' for word in words)
+
+
+def fulltext_select(query: str, dialect_name: str, match_any: bool = False) -> Optional[Select]:
+    """Select matching prospects and a relevance column, best matches first.
+
+    By default every word must match; ``match_any`` ranks prospects matching
+    any word instead. Returns None when the query has nothing searchable.
+    Callers can add further filters and a limit to the returned statement.
+    """
+    if dialect_name == "sqlite":
+        match = _fts5_query(query, match_any)
+        if match is None:
+            return None
+        # bm25() is lower for better matches
+        rank = (-func.bm25(literal_column("prospects_fts"), COMPANY_NAME_WEIGHT, 1.0)).label("rank")
+        return (
+            select(ProspectDB, rank)
+            .join_from(
+                ProspectDB,
+                prospects_fts,
+                prospects_fts.c.rowid == literal_column("prospects.rowid")
+            )
+            .where(literal_column("prospects_fts").op("MATCH")(match))
+            .order_by(rank.desc())
+        )
+    if dialect_name == "postgresql":
+        words = WORD_PATTERN.findall(query)
+        if not words:
+            return None
+        if match_any:
+            tsquery = func.to_tsquery("english", " | ".join(words))
+        else:
+            tsquery = func.websearch_to_tsquery("english", query)
+        vector = literal_column("prospects.search_vector")
+        rank = func.ts_rank_cd(vector, tsquery, type_=Float).label("rank")
+        return (
+            select(ProspectDB, rank)
+            .where(vector.op("@@")(tsquery))
+            .order_by(rank.desc())
+        )
+    raise ValueError(f"Full-text search is not supported on {dialect_name}")
@@ -0,0 +1,274 @@
+"""Bulk prospect import with chunked validation and batched inserts."""
+
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import csv
+import json
+import logging
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.vector_store import prospect_index
+from prospectplusagent.models import (
+    ProspectCreate,
+    ImportFormat,
+    ImportResult,
+    ImportRowError
+)
+from prospectplusagent.models.database import ProspectDB
+
+logger = logging.getLogger(__name__)
+
+# Columns written by COPY; timestamps fall back to their server defaults
+COPY_COLUMNS = [
+    "id",
+    "company_name",
+    "contact_name",
+    "email",
+    "phone",
+    "industry",
+    "company_size",
+    "website",
+    "status",
+    "priority",
+    "notes",
+    "tags",
+]
+
+# (row number, parsed record, parse error)
+RawRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+# SQLSTATE of a unique violation, as raised by asyncpg during COPY
+UNIQUE_VIOLATION = "23505"
+
+
+def detect_format(content_type: str = "", filename: str = "") -> ImportFormat:
+    """Infer the import format from a content type or file name."""
+    content_type = content_type.lower()
+    if "json" in content_type or filename.lower().endswith((".ndjson", ".jsonl", ".json")):
+        return ImportFormat.NDJSON
+    return ImportFormat.CSV
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig" if first else "utf-8").rstrip("\r")
+            first = False
+    if buffer:
+        yield buffer.decode("utf-8-sig" if first else "utf-8").rstrip("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat
+) -> AsyncIterator[RawRecord]:
+    """Parse a CSV or NDJSON byte stream into raw records."""
+    lines = iter_lines(chunks)
+    if import_format == ImportFormat.NDJSON:
+        async for record in _ndjson_records(lines):
+            yield record
+    else:
+        async for record in _csv_records(lines):
+            yield record
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    """Parse one JSON object per line."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, record, None
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    """Parse CSV rows keyed by the header line."""
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    row = 0
+    async for line in lines:
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            # A quoted field continues on the next line
+            continue
+        pending = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        record: Dict[str, Any] = {
+            name: value for name, value in zip(header, values) if value != ""
+        }
+        if "tags" in record:
+            record["tags"] = [tag.strip() for tag in record["tags"].split(";") if tag.strip()]
+        yield row, record, None
+
+
+def is_conflict(error: Exception) -> bool:
+    """Whether an insert failed on a unique constraint.
+
+    COPY runs on the raw asyncpg connection, so its errors are asyncpg's
+    own rather than SQLAlchemy's ``IntegrityError``.
+    """
+    return isinstance(error, IntegrityError) or getattr(error, "sqlstate", None) == UNIQUE_VIOLATION
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic validation error into one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class ProspectImporter:
+    """Validate, deduplicate and insert streamed prospect records in batches.
+
+    Each batch is validated in memory, checked against existing emails with
+    one ``IN`` query and written in a single transaction (``COPY`` on
+    Postgres). Bad rows are reported without aborting the batch.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
+        """Initialize the importer."""
+        self.db = db
+        self.batch_size = batch_size or settings.import_batch_size
+        self.result = ImportResult()
+        self._use_copy = db.bind.dialect.name == "postgresql"
+
+    async def run(self, records: AsyncIterator[RawRecord]) -> ImportResult:
+        """Consume all records and return the import summary."""
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for row, record, error in records:
+            self.result.total_rows += 1
+            if error:
+                self._reject(row, None, error)
+                continue
+            batch.append((row, record))
+            if len(batch) >= self.batch_size:
+                await self._process(batch)
+                batch = []
+        if batch:
+            await self._process(batch)
+        return self.result
+
+    async def _process(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Validate a chunk of raw records and insert the new ones."""
+        self.result.batches += 1
+        rows: Dict[str, Tuple[int, ProspectCreate]] = {}
+        for row, record in batch:
+            try:
+                prospect = ProspectCreate.model_validate(record)
+            except ValidationError as e:
+                self._reject(row, record.get("email"), _format_validation_error(e))
+                continue
+            if prospect.email in rows:
+                self.result.duplicates += 1
+                continue
+            rows[prospect.email] = (row, prospect)
+
+        if not rows:
+            return
+
+        try:
+            inserted, duplicates = await self._insert_new(rows, self._use_copy)
+        except Exception as e:
+            await self.db.rollback()
+            if not is_conflict(e):
+                raise
+            # A concurrent writer claimed some emails after the dedupe query;
+            # retry with a plain INSERT so any error is SQLAlchemy's
+            try:
+                inserted, duplicates = await self._insert_new(rows, False)
+            except IntegrityError as e:
+                await self.db.rollback()
+                logger.error(f"Bulk import batch failed: {e}")
+                for email, (row, _) in rows.items():
+                    self._reject(row, email, "Batch insert failed due to a conflicting write")
+                return
+
+        self.result.inserted += inserted
+        self.result.duplicates += duplicates
+
+    async def _insert_new(
+        self,
+        rows: Dict[str, Tuple[int, ProspectCreate]],
+        use_copy: bool
+    ) -> Tuple[int, int]:
+        """Insert rows whose emails are not already stored; return (inserted, skipped)."""
+        existing = await self.db.execute(
+            select(ProspectDB.email).where(ProspectDB.email.in_(list(rows)))
+        )
+        existing_emails = set(existing.scalars())
+        values = [
+            {"id": str(uuid.uuid4()), **prospect.model_dump(mode="json")}
+            for email, (_, prospect) in rows.items()
+            if email not in existing_emails
+        ]
+
+        if values:
+            if use_copy:
+                await self._copy(values)
+            else:
+                await self.db.execute(insert(ProspectDB), values)
+            # Index with the stored timestamps so the search sync sees these
+            # versions as already indexed
+            stored = await self.db.execute(
+                select(ProspectDB.id, ProspectDB.created_at, ProspectDB.updated_at)
+                .where(ProspectDB.id.in_([value["id"] for value in values]))
+            )
+            timestamps = {prospect_id: (created_at, updated_at) for prospect_id, created_at, updated_at in stored}
+            for value in values:
+                value["created_at"], value["updated_at"] = timestamps[value["id"]]
+        await self.db.commit()
+        if values:
+            await prospect_index.upsert(values)
+        return len(values), len(rows) - len(values)
+
+    async def _copy(self, values: List[Dict[str, Any]]) -> None:
+        """Write rows with Postgres COPY on the session's own connection."""
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            ProspectDB.__tablename__,
+            records=[
+                tuple(
+                    json.dumps(value["tags"]) if column == "tags" else value.get(column)
+                    for column in COPY_COLUMNS
+                )
+                for value in values
+            ],
+            columns=COPY_COLUMNS
+        )
+
+    def _reject(self, row: int, email: Optional[str], error: str) -> None:
+        """Record a failed row, keeping the error list bounded."""
+        self.result.failed += 1
+        if len(self.result.errors) < settings.import_max_reported_errors:
+            self.result.errors.append(ImportRowError(row=row, email=email, error=error))
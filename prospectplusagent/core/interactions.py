@@ -0,0 +1,255 @@
+"""Write-behind buffer for interaction ingestion."""
+
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import time
+
+from sqlalchemy import insert, select
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.core.engagement import ID_CHUNK_SIZE, record_engagement
+from prospectplusagent.models.database import InteractionDB, ProspectDB
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    """Raised when the buffer has no room within the enqueue timeout."""
+
+
+class InteractionBuffer:
+    """Coalesce interaction inserts into few, large transactions.
+
+    Requests append rows to an in-process buffer and return; a background
+    task writes everything pending in one multi-row INSERT every
+    ``flush_interval`` seconds, or sooner once ``flush_rows`` rows are
+    waiting. Rows count against ``max_size`` until committed, so a slow
+    database pushes back on producers: ``add`` waits up to
+    ``enqueue_timeout`` for room and then raises ``BufferFull``.
+
+    Rows for prospects that do not exist are dropped when written and
+    counted in ``unknown``.
+
+    ``stop`` flushes whatever is left. When the buffer is not running (no
+    startup event, or another event loop) rows are written directly.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        flush_rows: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        enqueue_timeout: Optional[float] = None
+    ):
+        """Initialize the buffer."""
+        self.max_size = max_size or settings.interaction_buffer_size
+        self.flush_rows = flush_rows or settings.interaction_flush_rows
+        self.flush_interval = flush_interval or settings.interaction_flush_interval
+        self.enqueue_timeout = settings.interaction_enqueue_timeout if enqueue_timeout is None else enqueue_timeout
+        self.flushed = 0
+        self.flushes = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.unknown = 0
+        self.last_flush_seconds = 0.0
+        self._pending: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._failures = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def started(self) -> bool:
+        """Whether the flusher is running."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start the background flusher."""
+        if self.started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._flusher())
+        logger.info(f"Interaction buffer started (flush every {self.flush_interval}s or {self.flush_rows} rows)")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still buffered."""
+        if not self.started:
+            return
+        # The flusher exits after any flush it is in the middle of; waiting
+        # for it must not hold the flush lock, which that flush needs
+        self._stopping.set()
+        self._wake.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # Drain what is left; a database that stays down gets a few attempts
+        for _ in range(settings.interaction_max_flush_attempts):
+            await self.flush()
+            if not self._pending:
+                break
+            await asyncio.sleep(self.flush_interval)
+        if self._pending:
+            logger.error(f"Dropping {len(self._pending)} interactions that could not be written on shutdown")
+            self.dropped += len(self._pending)
+            self._pending = []
+        logger.info(f"Interaction buffer stopped after writing {self.flushed} rows")
+
+    @property
+    def free(self) -> int:
+        """Rows that can be added without waiting."""
+        return self.max_size - len(self._pending) - self._in_flight
+
+    async def add(self, rows: List[Dict[str, Any]]) -> None:
+        """Buffer rows for insertion, waiting for room if the buffer is full."""
+        if not rows:
+            return
+        if not self.started or asyncio.get_running_loop() is not self._loop:
+            await self._write(rows)
+            self.flushed += len(rows)
+            return
+
+        deadline = time.monotonic() + self.enqueue_timeout
+        while len(rows) > self.free:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or len(rows) > self.max_size:
+                self.rejected += len(rows)
+                raise BufferFull(f"Interaction buffer is full ({self.max_size} rows)")
+            self._space.clear()
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        self._pending.extend(rows)
+        if len(self._pending) >= self.flush_rows:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write everything pending in one transaction; return the rows written.
+
+        On failure the rows go back to the front of the buffer. Once a batch
+        has failed ``interaction_max_flush_attempts`` times in a row it is
+        split to find the rows at fault, and only those are dropped. If
+        every row fails the database is the problem, not the data, so the
+        batch stays buffered.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            self._in_flight = len(batch)
+            started = time.perf_counter()
+            try:
+                try:
+                    await self._write(batch)
+                    failed: List[Dict[str, Any]] = []
+                except Exception as e:
+                    self._failures += 1
+                    if self._failures < settings.interaction_max_flush_attempts:
+                        logger.warning(f"Interaction flush of {len(batch)} rows failed, will retry: {e}")
+                        self._pending[:0] = batch
+                        return 0
+                    failed = await self._write_isolating(batch)
+                    if len(failed) == len(batch):
+                        logger.error(f"Interaction flush of {len(batch)} rows failed {self._failures} times: {e}")
+                        self._pending[:0] = batch
+                        return 0
+                    logger.error(f"Dropping {len(failed)} of {len(batch)} interactions that failed to insert: {e}")
+                    self.dropped += len(failed)
+            finally:
+                self._in_flight = 0
+                self._space.set()
+            self._failures = 0
+            written = len(batch) - len(failed)
+            self.last_flush_seconds = time.perf_counter() - started
+            self.flushed += written
+            self.flushes += 1
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer counters."""
+        return {
+            "started": self.started,
+            "max_size": self.max_size,
+            "pending": len(self._pending),
+            "in_flight": self._in_flight,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "unknown": self.unknown,
+            "last_flush_seconds": self.last_flush_seconds
+        }
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows and update engagement features in a single transaction.
+
+        Rows whose prospect does not exist are skipped, so they create no
+        timeline or engagement rows for an unknown ID.
+        """
+        async with AsyncSessionLocal() as db:
+            requested = sorted({row["prospect_id"] for row in rows})
+            known = set()
+            for start in range(0, len(requested), ID_CHUNK_SIZE):
+                chunk = requested[start:start + ID_CHUNK_SIZE]
+                result = await db.execute(select(ProspectDB.id).where(ProspectDB.id.in_(chunk)))
+                known.update(result.scalars())
+            valid = [row for row in rows if row["prospect_id"] in known]
+            if valid:
+                await db.execute(insert(InteractionDB.__table__), valid)
+                await record_engagement(db, valid)
+                await db.commit()
+        skipped = len(rows) - len(valid)
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} interactions for {len(set(requested) - known)} unknown prospects"
+            )
+            self.unknown += skipped
+
+    async def _write_isolating(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write rows, halving any chunk that fails; return the rows that still fail."""
+        try:
+            await self._write(rows)
+            return []
+        except Exception as e:
+            if len(rows) == 1:
+                logger.debug(f"Interaction {rows[0].get('id')} failed to insert: {e}")
+                return rows
+        middle = len(rows) // 2
+        return await self._write_isolating(rows[:middle]) + await self._write_isolating(rows[middle:])
+
+    async def _flusher(self) -> None:
+        """Flush on the interval, or early when enough rows are waiting."""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Interaction flusher failed: {e}")
+            if self._failures:
+                # Back off instead of hammering a failing database
+                backoff = self.flush_interval * min(self._failures, 10)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+
+
+# Global interaction buffer instance
+interaction_buffer = InteractionBuffer()
@@ -0,0 +1,216 @@
+"""Background worker pool for prospect analysis jobs."""
+
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.agent import agent
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.core.scoring import save_scores
+from prospectplusagent.models import JobStatus
+from prospectplusagent.models.database import AnalysisJobDB, ProspectDB
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorkerPool:
+    """Score prospects in the background from a durable job table.
+
+    Jobs live in ``analysis_jobs``; the bounded in-process queue only carries
+    job IDs. Workers claim a job with a conditional UPDATE, so several
+    processes can share the table, and a periodic sweep queues pending jobs
+    that did not fit in the queue or were left behind by a restart.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        """Initialize the pool."""
+        self.workers = workers or settings.analysis_workers
+        self.queue_size = queue_size or settings.analysis_queue_size
+        self.processed = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+        self._running: Set[str] = set()
+
+    @property
+    def started(self) -> bool:
+        """Whether the workers are running."""
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Start the workers and the recovery sweep."""
+        if self.started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+        logger.info(f"Analysis worker pool started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop the workers and hand interrupted jobs back to the table."""
+        if not self.started:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+
+        if self._running:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(AnalysisJobDB)
+                    .where(
+                        AnalysisJobDB.id.in_(list(self._running)),
+                        AnalysisJobDB.status == JobStatus.RUNNING.value
+                    )
+                    .values(status=JobStatus.PENDING.value)
+                )
+                await db.commit()
+            self._running.clear()
+        logger.info("Analysis worker pool stopped")
+
+    def submit(self, job_id: str) -> bool:
+        """Queue a committed job.
+
+        Returns False when the job was left in the table for the sweep,
+        either because the pool is not running here or the queue is full.
+        """
+        if not self.started or asyncio.get_running_loop() is not self._loop:
+            return False
+        if job_id in self._queued:
+            return True
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            return False
+        self._queued.add(job_id)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and worker counters."""
+        return {
+            "started": self.started,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "processed": self.processed,
+            "failed": self.failed
+        }
+
+    async def sweep(self) -> int:
+        """Recover stale jobs and queue as many pending jobs as fit."""
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.analysis_stale_after)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(AnalysisJobDB)
+                .where(
+                    AnalysisJobDB.status == JobStatus.RUNNING.value,
+                    AnalysisJobDB.updated_at < stale_before,
+                    AnalysisJobDB.id.notin_(list(self._running))
+                )
+                .values(status=JobStatus.PENDING.value)
+            )
+            await db.commit()
+
+            free = self._queue.maxsize - self._queue.qsize()
+            if free <= 0:
+                return 0
+            result = await db.execute(
+                select(AnalysisJobDB.id)
+                .where(AnalysisJobDB.status == JobStatus.PENDING.value)
+                .order_by(AnalysisJobDB.created_at)
+                .limit(free + len(self._queued))
+            )
+            job_ids = result.scalars().all()
+
+        queued = 0
+        for job_id in job_ids:
+            if job_id not in self._queued and self.submit(job_id):
+                queued += 1
+        return queued
+
+    async def _sweeper(self) -> None:
+        """Run the sweep on a fixed interval."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Analysis job sweep failed: {e}")
+            await asyncio.sleep(settings.analysis_poll_interval)
+
+    async def _worker(self) -> None:
+        """Process queued jobs until cancelled."""
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        """Claim a job, score its prospect and store the result."""
+        async with AsyncSessionLocal() as db:
+            claimed = await db.execute(
+                update(AnalysisJobDB)
+                .where(
+                    AnalysisJobDB.id == job_id,
+                    AnalysisJobDB.status == JobStatus.PENDING.value
+                )
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    attempts=AnalysisJobDB.attempts + 1
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                # Already taken by another worker or process
+                return
+            self._running.add(job_id)
+
+            try:
+                job = await db.get(AnalysisJobDB, job_id)
+                prospect = await db.get(ProspectDB, job.prospect_id)
+                if prospect is None:
+                    job.status = JobStatus.FAILED.value
+                    job.error = "Prospect not found"
+                    self.failed += 1
+                else:
+                    # Release the connection while the model runs
+                    await db.commit()
+                    analysis = await agent.analyze_prospect(prospect.to_dict())
+                    await save_scores(db, [(prospect.id, analysis.get("score"))])
+                    job.result = analysis
+                    job.error = None
+                    job.status = JobStatus.COMPLETED.value
+                    self.processed += 1
+                job.completed_at = datetime.utcnow()
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                job = await db.get(AnalysisJobDB, job_id)
+                job.error = str(e)
+                if job.attempts >= settings.analysis_max_attempts:
+                    job.status = JobStatus.FAILED.value
+                    self.failed += 1
+                else:
+                    job.status = JobStatus.PENDING.value
+                await db.commit()
+                logger.error(f"Analysis job {job_id} failed: {e}")
+            self._running.discard(job_id)
+
+
+# Global worker pool instance
+analysis_pool = AnalysisWorkerPool()
@@ -0,0 +1,405 @@
+"""Async LLM clients with pooled connections and bounded concurrency."""
+
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, AsyncIterator, Iterator
+from contextlib import contextmanager
+import asyncio
+import importlib.util
+import logging
+import time
+
+# The SDKs and httpx take ~0.5s to import, so they load with the first client
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+
+if TYPE_CHECKING:
+    import httpx
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.metrics import (
+    llm_errors,
+    llm_request_duration,
+    llm_requests_in_progress,
+    llm_time_to_first_token,
+    llm_tokens
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ChatProvider:
+    """Base for the chat completion client of one LLM provider.
+
+    All requests go through one pooled ``httpx.AsyncClient`` and a semaphore
+    that caps the number of in-flight requests per process. Latency, token
+    usage and errors are recorded in the ``llm_*`` metrics.
+    """
+
+    # Provider name, used in logs and router stats
+    name = ""
+    # Prefixes of the model names this provider serves
+    model_prefixes: tuple = ()
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        http_client: Optional["httpx.AsyncClient"] = None
+    ):
+        """Set up the connection pool and concurrency limit."""
+        import httpx
+
+        self.model = model
+        self.timeout = timeout or settings.llm_timeout
+        self.max_concurrency = max_concurrency
+        connections = max_connections or settings.llm_max_connections
+
+        self._http_client = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=connections,
+                max_keepalive_connections=connections
+            ),
+            timeout=httpx.Timeout(self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def serves(self, model: Optional[str]) -> bool:
+        """Whether ``model`` names one of this provider's models."""
+        return bool(model) and model.startswith(self.model_prefixes)
+
+    @contextmanager
+    def _observe(self, operation: str, model: str) -> Iterator[None]:
+        """Record latency, concurrency and errors for one request."""
+        in_progress = llm_requests_in_progress.labels(operation)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            llm_errors.labels(operation, model, type(e).__name__).inc()
+            raise
+        finally:
+            llm_request_duration.labels(operation, model).observe(time.perf_counter() - started)
+            in_progress.dec()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self._http_client.aclose()
+
+
+class LLMClient(ChatProvider):
+    """Non-blocking OpenAI client shared by agent calls and embeddings."""
+
+    name = "openai"
+    model_prefixes = ("gpt-", "o1", "text-")
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        max_retries: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        """Initialize the client.
+
+        ``max_retries`` is the SDK's own retry count; clients built for
+        ``LLMRouter`` pass 0 and leave retrying to the router.
+        """
+        if not OPENAI_AVAILABLE:
+            raise RuntimeError("openai package is not installed")
+        from openai import AsyncOpenAI
+
+        super().__init__(
+            model or settings.default_model,
+            max_concurrency or settings.llm_max_concurrency,
+            timeout,
+            max_connections,
+            http_client
+        )
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or None,
+            http_client=self._http_client,
+            max_retries=settings.llm_max_retries if max_retries is None else max_retries
+        )
+
+    async def complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Run a chat completion and return the message content.
+
+        The timeout covers both waiting for a concurrency slot and the
+        request itself; ``asyncio.TimeoutError`` is raised when it expires.
+        Pass ``response_format={"type": "json_object"}`` for JSON output.
+        """
+        model = model or self.model
+        with self._observe("complete", model):
+            return await asyncio.wait_for(
+                self._complete(messages, model, temperature, max_tokens, response_format),
+                timeout=timeout or self.timeout
+            )
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Acquire a concurrency slot and issue the request."""
+        extra = {"response_format": response_format} if response_format else {}
+        async with self._semaphore:
+            response = await self._client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=settings.temperature if temperature is None else temperature,
+                max_tokens=max_tokens or settings.max_tokens,
+                **extra
+            )
+        if response.usage:
+            llm_tokens.labels("complete", model, "prompt").inc(response.usage.prompt_tokens)
+            llm_tokens.labels("complete", model, "completion").inc(response.usage.completion_tokens)
+        return response.choices[0].message.content or ""
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Stream completion tokens as they arrive.
+
+        The timeout bounds the wait for every chunk, including the first.
+        The concurrency slot is held until the stream ends, and the upstream
+        response is closed if the consumer stops early or is cancelled.
+        Streams carry no usage data, so each content chunk is counted as
+        one completion token.
+        """
+        timeout = timeout or self.timeout
+        model = model or self.model
+        with self._observe("stream", model):
+            started = time.perf_counter()
+            chunk_count = 0
+            async with self._semaphore:
+                stream = await asyncio.wait_for(
+                    self._client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=settings.temperature if temperature is None else temperature,
+                        max_tokens=max_tokens or settings.max_tokens,
+                        stream=True
+                    ),
+                    timeout=timeout
+                )
+                try:
+                    chunks = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                        except StopAsyncIteration:
+                            break
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            if not chunk_count:
+                                llm_time_to_first_token.labels(model).observe(time.perf_counter() - started)
+                            chunk_count += 1
+                            yield chunk.choices[0].delta.content
+                finally:
+                    llm_tokens.labels("stream", model, "completion").inc(chunk_count)
+                    await stream.close()
+
+    async def embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        """Embed a batch of texts, sharing the completion concurrency limit."""
+        with self._observe("embed", model):
+            return await asyncio.wait_for(
+                self._embed(texts, model, dimensions),
+                timeout=timeout or self.timeout
+            )
+
+    async def _embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int]
+    ) -> List[List[float]]:
+        """Acquire a concurrency slot and issue the embedding request."""
+        extra = {"dimensions": dimensions} if dimensions else {}
+        async with self._semaphore:
+            response = await self._client.embeddings.create(
+                model=model,
+                input=texts,
+                **extra
+            )
+        if response.usage:
+            llm_tokens.labels("embed", model, "prompt").inc(response.usage.prompt_tokens)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class AnthropicClient(ChatProvider):
+    """Non-blocking Anthropic client with the chat interface of ``LLMClient``.
+
+    OpenAI-style messages are translated for the Messages API: system
+    messages become the system prompt and consecutive turns of the same
+    role are merged. There is no JSON mode, so ``response_format`` asks
+    for JSON in the system prompt instead.
+    """
+
+    name = "anthropic"
+    model_prefixes = ("claude",)
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        max_retries: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        """Initialize the client."""
+        if not ANTHROPIC_AVAILABLE:
+            raise RuntimeError("anthropic package is not installed")
+        from anthropic import AsyncAnthropic
+
+        super().__init__(
+            model or settings.anthropic_model,
+            max_concurrency or settings.anthropic_max_concurrency,
+            timeout,
+            max_connections,
+            http_client
+        )
+        self._client = AsyncAnthropic(
+            api_key=api_key,
+            base_url=base_url or None,
+            http_client=self._http_client,
+            max_retries=settings.llm_max_retries if max_retries is None else max_retries
+        )
+
+    async def complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Run a chat completion and return the text of the reply."""
+        model = model or self.model
+        with self._observe("complete", model):
+            return await asyncio.wait_for(
+                self._complete(messages, model, temperature, max_tokens, response_format),
+                timeout=timeout or self.timeout
+            )
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Acquire a concurrency slot and issue the request."""
+        async with self._semaphore:
+            response = await self._client.messages.create(
+                model=model,
+                **self._request(messages, temperature, max_tokens, response_format)
+            )
+        llm_tokens.labels("complete", model, "prompt").inc(response.usage.input_tokens)
+        llm_tokens.labels("complete", model, "completion").inc(response.usage.output_tokens)
+        return "".join(block.text for block in response.content if block.type == "text")
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Stream reply text as it arrives, like ``LLMClient.stream``."""
+        timeout = timeout or self.timeout
+        model = model or self.model
+        with self._observe("stream", model):
+            started = time.perf_counter()
+            chunk_count = 0
+            async with self._semaphore:
+                stream = await asyncio.wait_for(
+                    self._client.messages.create(
+                        model=model,
+                        stream=True,
+                        **self._request(messages, temperature, max_tokens)
+                    ),
+                    timeout=timeout
+                )
+                try:
+                    events = stream.__aiter__()
+                    while True:
+                        try:
+                            event = await asyncio.wait_for(events.__anext__(), timeout=timeout)
+                        except StopAsyncIteration:
+                            break
+                        if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                            if not chunk_count:
+                                llm_time_to_first_token.labels(model).observe(time.perf_counter() - started)
+                            chunk_count += 1
+                            yield event.delta.text
+                finally:
+                    llm_tokens.labels("stream", model, "completion").inc(chunk_count)
+                    await stream.close()
+
+    def _request(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Translate OpenAI-style arguments into Messages API arguments."""
+        system = [message["content"] for message in messages if message["role"] == "system"]
+        if response_format and response_format.get("type") == "json_object":
+            system.append("Respond with a single JSON object and nothing else.")
+        turns: List[Dict[str, Any]] = []
+        for message in messages:
+            if message["role"] == "system":
+                continue
+            role = "assistant" if message["role"] == "assistant" else "user"
+            if turns and turns[-1]["role"] == role:
+                turns[-1]["content"] += "\n\n" + message["content"]
+            else:
+                turns.append({"role": role, "content": message["content"]})
+        if not turns or turns[0]["role"] != "user":
+            turns.insert(0, {"role": "user", "content": "Go ahead."})
+
+        temperature = settings.temperature if temperature is None else temperature
+        request = {
+            "messages": turns,
+            # Anthropic takes 0-1 where OpenAI takes 0-2
+            "temperature": min(temperature, 1.0),
+            "max_tokens": max_tokens or settings.max_tokens
+        }
+        if system:
+            request["system"] = "\n\n".join(system)
+        return request
@@ -0,0 +1,266 @@
+"""Prometheus metrics for HTTP requests, database queries and LLM calls."""
+
+from typing import Any, Callable, Dict, Iterable, Optional
+import asyncio
+import logging
+import os
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# LLM calls are far slower than requests or queries; use wider buckets
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+# Seconds between component stats snapshots in multiprocess mode
+STATS_PUBLISH_INTERVAL = 5.0
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, including streamed response bodies",
+    ["method", "route"]
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+
+db_queries = Counter(
+    "db_queries_total",
+    "Database statements executed",
+    ["operation"]
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency",
+    ["operation"]
+)
+db_query_errors = Counter(
+    "db_query_errors_total",
+    "Database statements that raised",
+    ["operation"]
+)
+
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "LLM request latency, including the wait for a concurrency slot",
+    ["operation", "model"],
+    buckets=LLM_BUCKETS
+)
+llm_time_to_first_token = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until the first streamed token arrives",
+    ["model"],
+    buckets=LLM_BUCKETS
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "LLM tokens consumed, by kind (prompt or completion)",
+    ["operation", "model", "kind"]
+)
+llm_errors = Counter(
+    "llm_errors_total",
+    "LLM requests that failed, by exception type",
+    ["operation", "model", "error"]
+)
+llm_requests_in_progress = Gauge(
+    "llm_requests_in_progress",
+    "LLM requests waiting for or holding a concurrency slot",
+    ["operation"],
+    multiprocess_mode="livesum"
+)
+
+
+def multiprocess_enabled() -> bool:
+    """Whether metrics are shared between worker processes.
+
+    Set by ``prospectplus serve --workers``, which points
+    ``PROMETHEUS_MULTIPROC_DIR`` at a directory where every worker writes
+    its samples.
+    """
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Return the path template of the route serving ``scope``.
+
+    Labels use templates such as ``/api/prospects/{prospect_id}`` so that
+    every prospect ID does not become its own time series.
+    """
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and concurrency.
+
+    Latency runs until the response is fully sent, so streamed responses
+    are timed end to end.
+    """
+
+    def __init__(self, app, excluded_paths: Iterable[str] = ("/metrics",)):
+        """Initialize the middleware."""
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        """Serve the request and record its metrics."""
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.labels(method, route).observe(time.perf_counter() - started)
+            http_requests.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+
+
+def _operation(statement: str) -> str:
+    """Classify a SQL statement by its leading keyword."""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in DB_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record query counts, latency and errors for a sync engine.
+
+    For an async engine pass its ``sync_engine``.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        operation = _operation(statement)
+        db_queries.labels(operation).inc()
+        if started is not None:
+            db_query_duration.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        statement = exception_context.statement or ""
+        operation = _operation(statement)
+        db_queries.labels(operation).inc()
+        db_query_errors.labels(operation).inc()
+
+
+class StatsCollector:
+    """Expose components' ``stats()`` dictionaries as gauges at scrape time.
+
+    Each numeric (or boolean) value becomes ``<component>_<key>``; other
+    values are skipped. Reading stats lazily keeps the hot paths free of
+    metric updates.
+
+    In multiprocess mode a scrape only reaches one worker, so each worker
+    instead publishes its stats every ``STATS_PUBLISH_INTERVAL`` seconds
+    to gauges labeled with its PID.
+    """
+
+    def __init__(self, components: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None):
+        """Initialize the collector."""
+        self.components = dict(components or {})
+        self._gauges: Dict[str, Gauge] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Export another component's stats."""
+        self.components[name] = stats
+
+    def _values(self):
+        """Yield (metric name, description, value) for every numeric stat."""
+        for name, stats in self.components.items():
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning(f"Failed to collect {name} stats: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                yield f"{name}_{key}", f"{name} {key.replace('_', ' ')}", value
+
+    def collect(self):
+        """Yield one gauge per numeric stat."""
+        if multiprocess_enabled():
+            return
+        for metric, description, value in self._values():
+            yield GaugeMetricFamily(metric, description, value=value)
+
+    def publish(self) -> None:
+        """Write this process's stats to the shared multiprocess gauges."""
+        for metric, description, value in self._values():
+            gauge = self._gauges.get(metric)
+            if gauge is None:
+                gauge = self._gauges[metric] = Gauge(metric, description, registry=None, multiprocess_mode="liveall")
+            gauge.set(value)
+
+    async def start(self) -> None:
+        """Publish stats periodically when running with several workers."""
+        if multiprocess_enabled() and self._task is None:
+            self._task = asyncio.create_task(self._publisher())
+
+    async def stop(self) -> None:
+        """Stop publishing."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _publisher(self) -> None:
+        """Publish on an interval."""
+        while True:
+            self.publish()
+            await asyncio.sleep(STATS_PUBLISH_INTERVAL)
+
+
+def render_metrics() -> bytes:
+    """Render a scrape, merged across all workers in multiprocess mode."""
+    if not multiprocess_enabled():
+        return generate_latest()
+    stats_collector.publish()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+# Global collector for component stats, registered with the default registry
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
@@ -0,0 +1,27 @@
+"""Opaque cursors for keyset pagination."""
+
+from typing import Dict, Any
+import base64
+import binascii
+import json
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    raw = json.dumps(position, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a token produced by ``encode_cursor``.
+
+    Raises ValueError when the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
@@ -0,0 +1,231 @@
+"""Opt-in sampling profiler for individual requests.
+
+A profiled request runs with a background thread that samples every
+thread's Python stack at a fixed interval. The samples are written as
+folded stacks (the input format of flamegraph.pl and speedscope) and as
+an indented call tree. Requests that are not profiled pay only for a
+header lookup.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+import asyncio
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_FLAG = "profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Leaf frames of threads parked on a lock or queue; they are idle, not busy
+IDLE_LEAVES = {("threading.py", "wait"), ("queue.py", "get")}
+
+# Call tree nodes below this share of samples are omitted
+MIN_TREE_SHARE = 0.005
+
+
+def _frame_label(frame) -> str:
+    """Label a frame as ``function (package/module.py:line)``."""
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads from a background thread."""
+
+    def __init__(self, interval: float = 0.005):
+        """Initialize the profiler."""
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        """Take samples until stopped."""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[tuple(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def folded(self) -> str:
+        """Render samples as folded stacks, one ``frame;frame;... count`` per line."""
+        return "".join(
+            f"{';'.join(frame.replace(';', ':') for frame in stack)} {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+    def call_tree(self) -> str:
+        """Render samples as an indented call tree with sample shares."""
+        total = sum(self.samples.values())
+        lines = [
+            f"{self.sample_count} samples every {self.interval * 1000:g} ms over "
+            f"{self.duration * 1000:.1f} ms; shares are of {total} thread samples\n"
+        ]
+        if not total:
+            return "".join(lines)
+        tree: Dict[str, list] = {}
+        for stack, count in self.samples.items():
+            children = tree
+            for frame in stack:
+                node = children.setdefault(frame, [0, {}])
+                node[0] += count
+                children = node[1]
+
+        def render(children: Dict[str, list], depth: int) -> None:
+            for frame, (count, grandchildren) in sorted(children.items(), key=lambda item: -item[1][0]):
+                if count / total < MIN_TREE_SHARE:
+                    continue
+                lines.append(f"{'  ' * depth}{count / total:6.1%}  {frame}\n")
+                render(grandchildren, depth + 1)
+
+        render(tree, 0)
+        return "".join(lines)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests.
+
+    A request is profiled when it carries an ``X-Profile: 1`` header or a
+    ``profile=1`` query flag and ``authorize`` accepts its bearer token, or
+    when it is picked at random with probability ``sample_rate``. Only one
+    request is profiled at a time because sampling covers the whole
+    process. The response carries the profile ID in ``X-Profile-Id``.
+
+    Only the newest ``max_profiles`` profiles are kept in ``output_dir``;
+    older ones are pruned as new ones are written.
+    """
+
+    def __init__(
+        self,
+        app,
+        output_dir: str,
+        authorize: Callable[[str], Awaitable[bool]],
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        max_profiles: int = 100
+    ):
+        """Initialize the middleware."""
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.authorize = authorize
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        """Serve the request, profiling it if selected."""
+        if scope["type"] != "http" or self._busy or not await self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile_id = self._profile_id(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            try:
+                await asyncio.to_thread(self._write, profile_id, profiler)
+            except Exception as e:
+                logger.warning(f"Failed to write profile {profile_id}: {e}")
+            finally:
+                self._busy = False
+
+    async def _selected(self, scope) -> bool:
+        """Decide whether to profile a request."""
+        if self._requested(scope):
+            return await self._authorized(scope)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _requested(self, scope) -> bool:
+        """Check for the profile header or query flag."""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return value.strip().lower() in (b"1", b"true", b"yes")
+        query = scope.get("query_string", b"")
+        if PROFILE_QUERY_FLAG.encode() not in query:
+            return False
+        values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY_FLAG, [])
+        return any(value.lower() in ("1", "true", "yes") for value in values)
+
+    async def _authorized(self, scope) -> bool:
+        """Check the request's bearer token."""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return await self.authorize(token)
+                    except Exception:
+                        return False
+        return False
+
+    def _profile_id(self, scope) -> str:
+        """Build a sortable, file-name-safe profile ID for a request."""
+        slug = "".join(c if c.isalnum() else "-" for c in scope["path"].strip("/"))[:60] or "root"
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        return f"{timestamp}-{scope['method'].lower()}-{slug}-{uuid.uuid4().hex[:8]}"
+
+    def _write(self, profile_id: str, profiler: SamplingProfiler) -> None:
+        """Write the folded stacks and call tree for a profile."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / f"{profile_id}.folded").write_text(profiler.folded())
+        (self.output_dir / f"{profile_id}.txt").write_text(profiler.call_tree())
+        logger.info(f"Wrote profile {profile_id} ({profiler.sample_count} samples)")
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond ``max_profiles``; IDs sort by time."""
+        profile_ids = sorted({path.stem for path in self.output_dir.glob("*.txt")}, reverse=True)
+        for profile_id in profile_ids[self.max_profiles:]:
+            for suffix in (".folded", ".txt"):
+                (self.output_dir / f"{profile_id}{suffix}").unlink(missing_ok=True)
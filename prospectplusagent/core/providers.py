@@ -0,0 +1,417 @@
+"""Routing of LLM calls across providers, with retries, circuit breaking and hedging."""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
+import logging
+import random
+import time
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.llm import (
+    ANTHROPIC_AVAILABLE,
+    OPENAI_AVAILABLE,
+    AnthropicClient,
+    ChatProvider,
+    LLMClient
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses caused by the request itself; neither a retry nor another provider helps
+REQUEST_ERROR_STATUSES = {400, 404, 413, 422}
+# Statuses worth retrying on the same provider after a pause
+TRANSIENT_STATUSES = {408, 409, 429}
+
+
+class CircuitOpen(Exception):
+    """Raised when a provider's circuit breaker rejects a call."""
+
+
+class ProvidersUnavailable(Exception):
+    """Raised when no provider could serve a request."""
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status of an SDK error, if it has one."""
+    return getattr(error, "status_code", None)
+
+
+def is_request_error(error: BaseException) -> bool:
+    """Whether the error is the request's fault rather than the provider's."""
+    return error_status(error) in REQUEST_ERROR_STATUSES
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether retrying the same provider may succeed.
+
+    Timeouts and connection errors carry no status and count as transient;
+    auth failures do not, so they fail over straight away.
+    """
+    if isinstance(error, CircuitOpen):
+        return False
+    status = error_status(error)
+    return status is None or status in TRANSIENT_STATUSES or status >= 500
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the ``Retry-After`` header of an error response."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Fail fast while a provider keeps failing.
+
+    After ``failures`` consecutive failures the breaker opens and rejects
+    calls for ``cooldown`` seconds. Then a single trial call is let
+    through (half-open); its success closes the breaker and its failure
+    opens it again.
+    """
+
+    def __init__(self, failures: Optional[int] = None, cooldown: Optional[float] = None):
+        """Initialize the breaker."""
+        self.failures = failures or settings.llm_breaker_failures
+        self.cooldown = settings.llm_breaker_cooldown if cooldown is None else cooldown
+        self.consecutive_failures = 0
+        self.opens = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; takes the trial slot when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def release(self) -> None:
+        """Give back a slot whose call ended without a verdict (cancelled or bad request)."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold or on a failed trial."""
+        self.consecutive_failures += 1
+        if self._trial or (self._opened_at is None and self.consecutive_failures >= self.failures):
+            self._opened_at = time.monotonic()
+            self.opens += 1
+        self._trial = False
+
+
+class ProviderRoute:
+    """A provider with its breaker and counters."""
+
+    def __init__(self, provider: ChatProvider, breaker: CircuitBreaker):
+        """Initialize the route."""
+        self.provider = provider
+        self.breaker = breaker
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.rejected = 0
+
+
+class LLMRouter:
+    """Send chat calls to the first healthy provider, in order of preference.
+
+    Each provider keeps its own concurrency limit (its client's semaphore)
+    and circuit breaker. Transient failures (rate limits, timeouts,
+    connection errors, 5xx) are retried on the same provider up to
+    ``llm_max_retries`` times with full-jitter exponential backoff, never
+    shorter than a ``Retry-After`` the provider sent. Every failed attempt
+    counts against the breaker; once a provider is exhausted or its
+    breaker opens, the call moves on to the next provider. Request errors
+    such as 400 are raised at once.
+
+    With ``hedge_delay`` set, a completion that has not finished after that
+    many seconds is also sent down the remaining providers, and whichever
+    answers first wins. Streams fail over until their first token but are
+    neither retried nor hedged.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[ChatProvider],
+        retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+        breaker_failures: Optional[int] = None,
+        breaker_cooldown: Optional[float] = None
+    ):
+        """Initialize the router; ``providers`` are in order of preference."""
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.retries = settings.llm_max_retries if retries is None else retries
+        self.backoff_base = settings.llm_backoff_base if backoff_base is None else backoff_base
+        self.backoff_max = settings.llm_backoff_max if backoff_max is None else backoff_max
+        self.hedge_delay = settings.llm_hedge_delay if hedge_delay is None else hedge_delay
+        self.routes = [
+            ProviderRoute(provider, CircuitBreaker(breaker_failures, breaker_cooldown))
+            for provider in providers
+        ]
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def providers(self) -> List[ChatProvider]:
+        """Providers in order of preference."""
+        return [route.provider for route in self.routes]
+
+    @property
+    def model(self) -> str:
+        """Default model of the preferred provider."""
+        return self.routes[0].provider.model
+
+    async def complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Run a chat completion on the first provider able to answer.
+
+        ``model`` is used by the provider that serves it; the others use
+        their own default model. Raises ``ProvidersUnavailable`` when every
+        provider fails or is failing fast.
+        """
+        async def call(provider: ChatProvider) -> str:
+            return await provider.complete(
+                messages,
+                model=self._model_for(provider, model),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout,
+                response_format=response_format
+            )
+
+        if self.hedge_delay > 0 and len(self.routes) > 1:
+            return await self._hedged(call)
+        return await self._failover(self.routes, call)
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Stream from the first provider that produces a token."""
+        error: Optional[BaseException] = None
+        for route in self.routes:
+            if not route.breaker.allow():
+                route.rejected += 1
+                continue
+            route.requests += 1
+            started = False
+            try:
+                async for token in route.provider.stream(
+                    messages,
+                    model=self._model_for(route.provider, model),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout
+                ):
+                    if not started:
+                        started = True
+                        route.breaker.record_success()
+                    yield token
+            except (asyncio.CancelledError, GeneratorExit):
+                if not started:
+                    route.breaker.release()
+                raise
+            except Exception as e:
+                if is_request_error(e):
+                    route.breaker.release()
+                    raise
+                route.errors += 1
+                route.breaker.record_failure()
+                if started:
+                    raise
+                logger.warning(f"LLM provider {route.provider.name} failed to stream: {e}")
+                error = e
+                continue
+            if not started:
+                route.breaker.record_success()
+            return
+        raise ProvidersUnavailable(f"No LLM provider available: {error or 'all circuits open'}") from error
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-provider breaker state and counters."""
+        stats: Dict[str, Any] = {
+            "providers": len(self.routes),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins
+        }
+        for route in self.routes:
+            name = route.provider.name
+            stats.update({
+                f"{name}_open": route.breaker.state != "closed",
+                f"{name}_opens": route.breaker.opens,
+                f"{name}_requests": route.requests,
+                f"{name}_errors": route.errors,
+                f"{name}_rate_limited": route.rate_limited,
+                f"{name}_rejected": route.rejected
+            })
+        return stats
+
+    async def aclose(self) -> None:
+        """Close every provider's pooled connections."""
+        for route in self.routes:
+            await route.provider.aclose()
+
+    def _model_for(self, provider: ChatProvider, model: Optional[str]) -> str:
+        """The requested model if ``provider`` serves it, else the provider's default."""
+        return model if provider.serves(model) else provider.model
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential delay, at least any ``Retry-After`` sent."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        requested = retry_after(error)
+        if requested is not None:
+            delay = max(delay, min(requested, self.backoff_max))
+        return delay
+
+    async def _attempts(
+        self,
+        route: ProviderRoute,
+        call: Callable[[ChatProvider], Awaitable[str]]
+    ) -> str:
+        """Call one provider, retrying transient errors while its breaker allows."""
+        attempt = 0
+        while True:
+            if not route.breaker.allow():
+                route.rejected += 1
+                raise CircuitOpen(f"{route.provider.name} circuit is open")
+            route.requests += 1
+            try:
+                result = await call(route.provider)
+            except asyncio.CancelledError:
+                route.breaker.release()
+                raise
+            except Exception as e:
+                if is_request_error(e):
+                    route.breaker.release()
+                    raise
+                route.errors += 1
+                if error_status(e) == 429:
+                    route.rate_limited += 1
+                route.breaker.record_failure()
+                if attempt >= self.retries or not is_transient(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"LLM provider {route.provider.name} failed, retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            route.breaker.record_success()
+            return result
+
+    async def _failover(
+        self,
+        routes: List[ProviderRoute],
+        call: Callable[[ChatProvider], Awaitable[str]]
+    ) -> str:
+        """Try each provider in turn."""
+        error: Optional[BaseException] = None
+        for route in routes:
+            try:
+                return await self._attempts(route, call)
+            except Exception as e:
+                if is_request_error(e):
+                    raise
+                if not isinstance(e, CircuitOpen):
+                    logger.warning(f"LLM provider {route.provider.name} is unavailable: {e}")
+                error = e
+        raise ProvidersUnavailable(f"No LLM provider available: {error}") from error
+
+    async def _hedged(self, call: Callable[[ChatProvider], Awaitable[str]]) -> str:
+        """Race the remaining providers against a primary that is slow to answer."""
+        primary = asyncio.create_task(self._failover(self.routes[:1], call))
+        backup: Optional[asyncio.Task] = None
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if backup else self.hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup and primary in pending:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                    if is_request_error(error):
+                        raise error
+                if backup is None:
+                    # Either the primary is slow (hedge) or it failed (plain failover)
+                    if not done:
+                        self.hedged += 1
+                    backup = asyncio.create_task(self._failover(self.routes[1:], call))
+                    pending.add(backup)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def build_router() -> Optional[LLMRouter]:
+    """Build a router over the providers with API keys, in ``llm_providers`` order.
+
+    Clients are built without SDK retries; the router does the retrying.
+    Returns ``None`` when no provider is configured.
+    """
+    providers: List[ChatProvider] = []
+    for name in settings.llm_providers:
+        try:
+            if name == "openai":
+                if OPENAI_AVAILABLE and settings.openai_api_key:
+                    providers.append(LLMClient(
+                        api_key=settings.openai_api_key,
+                        base_url=settings.openai_base_url,
+                        max_retries=0
+                    ))
+            elif name == "anthropic":
+                if ANTHROPIC_AVAILABLE and settings.anthropic_api_key:
+                    providers.append(AnthropicClient(
+                        api_key=settings.anthropic_api_key,
+                        base_url=settings.anthropic_base_url,
+                        max_retries=0
+                    ))
+            else:
+                logger.warning(f"Unknown LLM provider {name!r}")
+        except Exception as e:
+            logger.warning(f"Failed to initialize {name} client: {e}")
+    if not providers:
+        return None
+    logger.info(f"LLM router initialized with {', '.join(p.name for p in providers)}")
+    return LLMRouter(providers)
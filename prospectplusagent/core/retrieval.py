@@ -0,0 +1,227 @@
+"""Retrieval of prospect data for grounding agent chat answers."""
+
+from typing import Dict, Any, List, Optional
+import json
+import logging
+
+from sqlalchemy import func, select
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal
+from prospectplusagent.core.fulltext import WORD_PATTERN, fulltext_select
+from prospectplusagent.core.vector_store import prospect_index
+from prospectplusagent.models.database import InteractionDB, ProspectDB
+
+logger = logging.getLogger(__name__)
+
+# Context window sizes by model name prefix; the longest matching prefix wins
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4o": 128000,
+    "claude-3": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Reciprocal rank fusion constant; damps the influence of top ranks
+RRF_K = 60
+
+# Words too common to help keyword retrieval
+STOPWORDS = {
+    "a", "about", "all", "an", "and", "any", "are", "by", "can", "do", "does",
+    "for", "from", "have", "how", "i", "in", "is", "it", "me", "my", "of",
+    "on", "or", "our", "should", "show", "that", "the", "their", "them",
+    "there", "these", "this", "to", "we", "what", "which", "who", "with", "you",
+}
+
+NOTES_PREVIEW_CHARS = 300
+INTERACTION_PREVIEW_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def context_window(model: str) -> int:
+    """Context window size of ``model``, by longest matching name prefix."""
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+def context_budget(model: str, prompt_tokens: int) -> int:
+    """Tokens available for retrieved context with ``model``.
+
+    Capped by ``chat_context_tokens`` and by what is left of the model's
+    context window after the prompt and the reserved completion tokens.
+    """
+    window = context_window(model)
+    return max(0, min(settings.chat_context_tokens, window - settings.max_tokens - prompt_tokens))
+
+
+class ChatContext:
+    """Retrieved, budgeted context for one chat query."""
+
+    def __init__(self, text: str = "", sources: Optional[List[str]] = None,
+                 prospects: Optional[List[Dict[str, Any]]] = None, tokens: int = 0):
+        """Initialize the context."""
+        self.text = text
+        self.sources = sources or []
+        self.prospects = prospects or []
+        self.tokens = tokens
+
+
+class ContextRetriever:
+    """Find the prospects and interactions most relevant to a chat query.
+
+    Candidates come from the semantic index (when loaded) and from keyword
+    full-text search, merged with reciprocal rank fusion. They are packed
+    best-first into the token budget, each prospect followed by its most
+    recent interactions.
+    """
+
+    def __init__(self, candidates: Optional[int] = None, interactions_per_prospect: Optional[int] = None):
+        """Initialize the retriever."""
+        self.candidates = candidates or settings.chat_context_candidates
+        self.interactions_per_prospect = (
+            interactions_per_prospect or settings.chat_interactions_per_prospect
+        )
+
+    async def build(self, query: str, budget: int, extra: Optional[Dict[str, Any]] = None) -> ChatContext:
+        """Retrieve and pack context for ``query`` into ``budget`` tokens.
+
+        ``extra`` is caller-supplied context; it is included first and
+        truncated to at most a quarter of the budget.
+        """
+        lines: List[str] = []
+        used = 0
+        if extra:
+            extra_text = f"Caller context: {json.dumps(extra, default=str)}"
+            limit = budget // 4
+            if estimate_tokens(extra_text) > limit:
+                extra_text = extra_text[:limit * 4]
+            lines.append(extra_text)
+            used += estimate_tokens(extra_text)
+
+        if budget - used <= 0:
+            return ChatContext("\n".join(lines), tokens=used)
+
+        async with AsyncSessionLocal() as db:
+            ranked = await self._rank(db, query)
+            if not ranked:
+                return ChatContext("\n".join(lines), tokens=used)
+
+            result = await db.execute(select(ProspectDB).where(ProspectDB.id.in_(ranked)))
+            prospects = {prospect.id: prospect.to_dict() for prospect in result.scalars()}
+            interactions = await self._recent_interactions(db, [pid for pid in ranked if pid in prospects])
+
+        sources: List[str] = []
+        packed: List[Dict[str, Any]] = []
+        for prospect_id in ranked:
+            prospect = prospects.get(prospect_id)
+            if prospect is None:
+                continue
+            line = self._render_prospect(prospect)
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                continue
+            lines.append(line)
+            used += cost
+            sources.append(f"prospect:{prospect_id}")
+            packed.append(prospect)
+
+            for interaction in interactions.get(prospect_id, []):
+                line = self._render_interaction(interaction)
+                cost = estimate_tokens(line) + 1
+                if used + cost > budget:
+                    break
+                lines.append(line)
+                used += cost
+                sources.append(f"interaction:{interaction.id}")
+
+        return ChatContext("\n".join(lines), sources, packed, used)
+
+    async def _rank(self, db, query: str) -> List[str]:
+        """Return candidate prospect IDs, most relevant first."""
+        rankings: List[List[str]] = []
+
+        # Only use the semantic index once loaded; chat must not wait for a rebuild
+        if prospect_index.ready:
+            try:
+                matches = await prospect_index.search(query, self.candidates)
+                rankings.append([prospect_id for prospect_id, _ in matches])
+            except Exception as e:
+                logger.warning(f"Semantic retrieval failed: {e}")
+
+        keywords = " ".join(
+            word for word in WORD_PATTERN.findall(query.lower()) if word not in STOPWORDS
+        )
+        statement = fulltext_select(keywords, db.bind.dialect.name, match_any=True) if keywords else None
+        if statement is not None:
+            try:
+                result = await db.execute(
+                    statement.with_only_columns(ProspectDB.id).limit(self.candidates)
+                )
+                rankings.append(list(result.scalars()))
+            except Exception as e:
+                logger.warning(f"Keyword retrieval failed: {e}")
+
+        scores: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, prospect_id in enumerate(ranking):
+                scores[prospect_id] = scores.get(prospect_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(scores, key=scores.get, reverse=True)[:self.candidates]
+
+    async def _recent_interactions(self, db, prospect_ids: List[str]) -> Dict[str, List[InteractionDB]]:
+        """Load the latest interactions for each prospect in one query."""
+        if not prospect_ids or self.interactions_per_prospect <= 0:
+            return {}
+        position = func.row_number().over(
+            partition_by=InteractionDB.prospect_id,
+            order_by=InteractionDB.created_at.desc()
+        ).label("position")
+        recent = (
+            select(InteractionDB, position)
+            .where(InteractionDB.prospect_id.in_(prospect_ids))
+            .subquery()
+        )
+        result = await db.execute(
+            select(InteractionDB)
+            .join(recent, InteractionDB.id == recent.c.id)
+            .where(recent.c.position <= self.interactions_per_prospect)
+            .order_by(InteractionDB.created_at.desc())
+        )
+        grouped: Dict[str, List[InteractionDB]] = {}
+        for interaction in result.scalars():
+            grouped.setdefault(interaction.prospect_id, []).append(interaction)
+        return grouped
+
+    def _render_prospect(self, prospect: Dict[str, Any]) -> str:
+        """Render one prospect as a compact context line."""
+        parts = [
+            f"[prospect:{prospect['id']}] {prospect['company_name']}",
+            f"contact {prospect['contact_name']}",
+            f"status {prospect['status']}",
+            f"priority {prospect['priority']}",
+        ]
+        if prospect.get("industry"):
+            parts.append(f"industry {prospect['industry']}")
+        if prospect.get("score") is not None:
+            parts.append(f"score {prospect['score']:.2f}")
+        if prospect.get("notes"):
+            parts.append(f"notes: {prospect['notes'][:NOTES_PREVIEW_CHARS]}")
+        return " | ".join(parts)
+
+    def _render_interaction(self, interaction: InteractionDB) -> str:
+        """Render one interaction as an indented context line."""
+        when = interaction.created_at.strftime("%Y-%m-%d") if interaction.created_at else "unknown date"
+        content = (interaction.content or "")[:INTERACTION_PREVIEW_CHARS]
+        return f"  - [interaction:{interaction.id}] {when} {interaction.interaction_type}: {content}"
+
+
+# Global retriever instance
+context_retriever = ContextRetriever()
@@ -0,0 +1,169 @@
+"""Rule-based prospect scoring, per prospect and vectorized over the table."""
+
+from typing import Dict, Any, Iterable, Optional, Tuple
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import and_, bindparam, case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from prospectplusagent.config import settings
+from prospectplusagent.models.database import ProspectDB, ProspectEngagementDB
+
+logger = logging.getLogger(__name__)
+
+# Score every prospect starts from
+BASE_SCORE = 0.5
+
+# Score added when a field is filled in
+FIELD_WEIGHTS = {
+    "industry": 0.1,
+    "company_size": 0.1,
+    "website": 0.1,
+}
+
+# Score added for recent engagement, in full at this many interactions in 30 days
+ENGAGEMENT_WEIGHT = 0.1
+ENGAGEMENT_SATURATION = 10
+
+MAX_SCORE = 1.0
+
+# Above this many distinct scores per batch, write row by row instead of grouping
+MAX_GROUPED_UPDATES = 64
+
+# Keep IN lists under SQLite's bound parameter limit
+MAX_IN_PARAMS = 10000
+
+
+def rule_based_score(prospect_data: Dict[str, Any]) -> float:
+    """Score a single prospect from the fields it has filled in.
+
+    Engagement features, when passed under ``engagement``, add up to
+    ``ENGAGEMENT_WEIGHT`` for recent interactions.
+    """
+    score = BASE_SCORE
+    for field, weight in FIELD_WEIGHTS.items():
+        score += weight * bool(prospect_data.get(field))
+    recent = (prospect_data.get("engagement") or {}).get("interactions_30d", 0)
+    score += ENGAGEMENT_WEIGHT * min(recent, ENGAGEMENT_SATURATION) / ENGAGEMENT_SATURATION
+    return min(score, MAX_SCORE)
+
+
+def score_arrays(flags: Dict[str, np.ndarray], recent: Optional[np.ndarray] = None) -> np.ndarray:
+    """Score many prospects at once from per-field presence arrays.
+
+    ``recent`` holds 30-day interaction counts. Applies the same
+    operations in the same order as ``rule_based_score``, so both paths
+    produce identical floats.
+    """
+    length = len(next(iter(flags.values())))
+    scores = np.full(length, BASE_SCORE)
+    for field, weight in FIELD_WEIGHTS.items():
+        scores += weight * flags[field]
+    if recent is None:
+        recent = np.zeros(length)
+    scores += ENGAGEMENT_WEIGHT * np.minimum(recent, ENGAGEMENT_SATURATION) / ENGAGEMENT_SATURATION
+    return np.minimum(scores, MAX_SCORE)
+
+
+def _filled(column):
+    """SQL flag that is 1 when a text column is non-empty."""
+    return case((and_(column.isnot(None), column != ""), 1), else_=0)
+
+
+async def rescore_prospects(
+    db: AsyncSession,
+    batch_size: Optional[int] = None,
+    only_unscored: bool = False
+) -> Dict[str, Any]:
+    """Recompute rule-based scores for the whole table in vectorized batches.
+
+    Batches are read in primary-key order with only the presence flags the
+    rules need, scored with NumPy, and written back with one grouped UPDATE
+    per distinct score. Rows whose score is unchanged are not written.
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.rescore_batch_size
+    columns = [_filled(getattr(ProspectDB, field)) for field in FIELD_WEIGHTS]
+    recent = func.coalesce(ProspectEngagementDB.interactions_30d, 0)
+    query = (
+        select(ProspectDB.id, ProspectDB.score, recent, *columns)
+        .outerjoin(ProspectEngagementDB, ProspectEngagementDB.prospect_id == ProspectDB.id)
+        .order_by(ProspectDB.id)
+    )
+    if only_unscored:
+        query = query.where(ProspectDB.score.is_(None))
+
+    scanned = 0
+    updated = 0
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else query.where(ProspectDB.id > last_id)
+        rows = (await db.execute(batch_query.limit(batch_size))).all()
+        if not rows:
+            break
+
+        ids = np.array([row[0] for row in rows], dtype=object)
+        current = np.array([np.nan if row[1] is None else row[1] for row in rows], dtype=float)
+        flags = {
+            field: np.fromiter((row[3 + index] for row in rows), dtype=np.int8, count=len(rows))
+            for index, field in enumerate(FIELD_WEIGHTS)
+        }
+        scores = score_arrays(flags, np.fromiter((row[2] for row in rows), dtype=float, count=len(rows)))
+
+        changed = ~np.isclose(scores, current)
+        if changed.any():
+            await _write_scores(db, ids[changed], scores[changed])
+            await db.commit()
+
+        scanned += len(rows)
+        updated += int(changed.sum())
+        last_id = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Rescored {scanned} prospects ({updated} changed) in {elapsed:.2f}s")
+    return {
+        "scanned": scanned,
+        "updated": updated,
+        "unchanged": scanned - updated,
+        "seconds": round(elapsed, 3)
+    }
+
+
+async def _write_scores(db: AsyncSession, ids: np.ndarray, scores: np.ndarray) -> None:
+    """Write a batch of scores, grouping rows that share a score."""
+    values, groups = np.unique(scores, return_inverse=True)
+    if len(values) <= MAX_GROUPED_UPDATES:
+        for index, value in enumerate(values):
+            group = ids[groups == index].tolist()
+            for start in range(0, len(group), MAX_IN_PARAMS):
+                await db.execute(
+                    update(ProspectDB)
+                    .where(ProspectDB.id.in_(group[start:start + MAX_IN_PARAMS]))
+                    .values(score=float(value), updated_at=ProspectDB.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+    else:
+        await save_scores(db, zip(ids.tolist(), scores.tolist()))
+
+
+async def save_scores(db: AsyncSession, scores: Iterable[Tuple[str, Optional[float]]]) -> None:
+    """Write (prospect ID, score) pairs, keeping each row's ``updated_at``.
+
+    A new score is not an edit of the prospect; search indexes re-embed
+    rows whose ``updated_at`` moves, so score writes leave it alone, as
+    engagement writes do.
+    """
+    params = [{"b_id": prospect_id, "b_score": score} for prospect_id, score in scores]
+    if not params:
+        return
+    prospects = ProspectDB.__table__
+    await db.execute(
+        update(prospects)
+        .where(prospects.c.id == bindparam("b_id"))
+        .values(score=bindparam("b_score"), updated_at=prospects.c.updated_at),
+        params
+    )
@@ -0,0 +1,61 @@
+"""Fast JSON responses."""
+
+from typing import Any, Dict, Optional
+from datetime import date, datetime, timedelta
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Match pydantic's JSON output: UTC as "Z" and non-string keys allowed
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Encode the types orjson handles natively for the stdlib fallback."""
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timedelta(0) else text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed.
+
+    Used as the application's default response class. It also accepts
+    datetimes, so handlers can return database rows without a pydantic
+    round trip.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize ``content`` to JSON bytes."""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content, option=ORJSON_OPTIONS)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=_default
+        ).encode("utf-8")
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> FastJSONResponse:
+    """Serialize trusted content directly, bypassing ``response_model``.
+
+    FastAPI validates a handler's return value against its response model
+    and then encodes it again. Rows built by ``to_dict()`` already match
+    their model, so list and detail handlers return this instead; the
+    route keeps ``response_model`` for the OpenAPI schema.
+    """
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,616 @@
+"""Vector index for semantic prospect search."""
+
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import String, func, select, tuple_, type_coerce
+
+from prospectplusagent.config import settings
+from prospectplusagent.core.database import AsyncSessionLocal, async_engine
+from prospectplusagent.core.embeddings import Embedder, create_embedder, prospect_text
+from prospectplusagent.core.metrics import multiprocess_enabled
+from prospectplusagent.models.database import ProspectDB
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "prospects.npz"
+
+# Rows embedded and written per step when syncing with the database
+SYNC_BATCH_SIZE = 1000
+
+# Look this far behind the watermark when syncing, so rows committed slightly
+# out of timestamp order (or within one second on SQLite) are not missed
+SYNC_OVERLAP = timedelta(seconds=2)
+
+# Syncs between row counts; deletions only show up as a count mismatch
+SYNC_COUNT_EVERY = 12
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 50
+
+# Rows of each inverted list as (vectors, ids), as read by ``build_lists``
+ListRows = List[Tuple[np.ndarray, List[str]]]
+
+
+class _InvertedList:
+    """A growable block of vectors and the IDs of its rows."""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        """Initialize the list."""
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.ids: List[str] = []
+
+    @property
+    def view(self) -> np.ndarray:
+        """The filled rows."""
+        return self.vectors[:len(self.ids)]
+
+    def append(self, item_id: str, vector: np.ndarray) -> int:
+        """Add a row and return its position."""
+        position = len(self.ids)
+        if position == len(self.vectors):
+            grown = np.empty((position * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:position] = self.vectors
+            self.vectors = grown
+        self.vectors[position] = vector
+        self.ids.append(item_id)
+        return position
+
+    def remove(self, position: int) -> Optional[str]:
+        """Remove a row by moving the last row into its place.
+
+        Returns the ID of the moved row, if any.
+        """
+        last = len(self.ids) - 1
+        moved = None
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = self.ids[last]
+            moved = self.ids[position]
+        self.ids.pop()
+        return moved
+
+
+class VectorIndex:
+    """Inverted-file (IVF) index over normalized vectors with exact re-ranking.
+
+    Small indexes are a single flat list. Once the index reaches
+    ``ivf_min_vectors`` it is clustered with spherical k-means into about
+    sqrt(N) lists, and a query only scans the ``nprobe`` lists closest to it,
+    which keeps lookups in the low milliseconds at millions of vectors.
+    """
+
+    def __init__(self, dim: int, nprobe: Optional[int] = None, ivf_min_vectors: Optional[int] = None):
+        """Initialize the index."""
+        self.dim = dim
+        self.nprobe = nprobe or settings.search_nprobe
+        self.ivf_min_vectors = ivf_min_vectors or settings.search_ivf_min_vectors
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_InvertedList] = [_InvertedList(dim)]
+        self.locations: Dict[str, Tuple[int, int]] = {}
+        self.trained_size = 0
+        # IDs whose rows were written since ``snapshot``; None when not tracking
+        self._changed: Optional[set] = None
+
+    def __len__(self) -> int:
+        """Number of indexed vectors."""
+        return len(self.locations)
+
+    def __contains__(self, item_id: str) -> bool:
+        """Whether an ID is indexed."""
+        return item_id in self.locations
+
+    def upsert(self, ids: List[str], vectors: np.ndarray) -> None:
+        """Add or replace vectors."""
+        for item_id in ids:
+            self.remove(item_id)
+        if self._changed is not None:
+            self._changed.update(ids)
+        if self.centroids is None:
+            assignments = np.zeros(len(ids), dtype=np.int64)
+        else:
+            assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        for item_id, vector, list_no in zip(ids, vectors, assignments):
+            position = self.lists[list_no].append(item_id, vector)
+            self.locations[item_id] = (int(list_no), position)
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a vector; returns False if it was not indexed."""
+        location = self.locations.pop(item_id, None)
+        if location is None:
+            return False
+        list_no, position = location
+        moved = self.lists[list_no].remove(position)
+        if moved is not None:
+            self.locations[moved] = (list_no, position)
+        if self._changed is not None:
+            self._changed.add(item_id)
+            if moved is not None:
+                self._changed.add(moved)
+        return True
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (id, cosine similarity) pairs, best first."""
+        if not self.locations:
+            return []
+        if self.centroids is None:
+            probed = [self.lists[0]]
+        else:
+            nprobe = min(self.nprobe, len(self.lists))
+            closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            probed = [self.lists[list_no] for list_no in closest if self.lists[list_no].ids]
+
+        # Keep each list's local top k, then merge the small candidate set
+        candidates: List[Tuple[float, str]] = []
+        for block in probed:
+            scores = block.view @ query
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else range(len(scores))
+            candidates.extend((float(scores[i]), block.ids[i]) for i in top)
+        candidates.sort(reverse=True)
+        return [(item_id, score) for score, item_id in candidates[:k]]
+
+    def needs_training(self) -> bool:
+        """Whether the index has grown enough to (re)build its clusters."""
+        size = len(self)
+        if size < self.ivf_min_vectors:
+            return False
+        return self.centroids is None or size >= 4 * self.trained_size
+
+    def snapshot(self) -> ListRows:
+        """Capture the current rows for ``build_lists`` without copying them.
+
+        Writes may continue while the build runs on another thread. Rows
+        they touch can be stale or torn in the snapshot, so their IDs are
+        tracked and ``apply_lists`` re-adds them from the live lists.
+        """
+        self._changed = set()
+        return [(block.view, list(block.ids)) for block in self.lists if block.ids]
+
+    def release_snapshot(self) -> None:
+        """Stop tracking writes for a build that will not be applied."""
+        self._changed = None
+
+    def build_lists(
+        self,
+        rows: Optional[ListRows] = None,
+        seed: int = 0
+    ) -> Tuple[np.ndarray, List[_InvertedList], Dict[str, Tuple[int, int]]]:
+        """Cluster vectors into new inverted lists.
+
+        Reads ``rows`` from ``snapshot``, or the index itself when no writes
+        can happen meanwhile, so it can run on a worker thread while searches
+        continue; apply the result with ``apply_lists``.
+        """
+        if rows is None:
+            rows = [(block.view, block.ids) for block in self.lists if block.ids]
+        rng = np.random.default_rng(seed)
+        size = sum(len(ids) for _, ids in rows)
+        nlist = max(1, int(math.sqrt(size)))
+
+        # Sample training rows from each list in proportion to its size
+        sample_size = min(size, nlist * KMEANS_SAMPLES_PER_LIST)
+        sample = np.concatenate([
+            vectors[rng.choice(len(ids), size=math.ceil(sample_size * len(ids) / size), replace=False)]
+            for vectors, ids in rows
+        ])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=nlist)
+            empty = counts == 0
+            # Reseed empty clusters from random sample rows
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        lists = [_InvertedList(self.dim) for _ in range(nlist)]
+        locations: Dict[str, Tuple[int, int]] = {}
+        for block_vectors, block_ids in rows:
+            for start in range(0, len(block_ids), 65536):
+                vectors = block_vectors[start:start + 65536]
+                assignments = np.argmax(vectors @ centroids.T, axis=1)
+                for item_id, vector, list_no in zip(block_ids[start:start + 65536], vectors, assignments):
+                    locations[item_id] = (int(list_no), lists[list_no].append(item_id, vector))
+        return centroids.astype(np.float32), lists, locations
+
+    def apply_lists(self, built: Tuple[np.ndarray, List[_InvertedList], Dict[str, Tuple[int, int]]]) -> None:
+        """Swap in lists produced by ``build_lists``.
+
+        Rows written since ``snapshot`` are re-added from the live lists.
+        """
+        changed, self._changed = self._changed or set(), None
+        live_lists, live_locations = self.lists, self.locations
+        self.centroids, self.lists, self.locations = built
+        for item_id in changed:
+            self.remove(item_id)
+        current = [item_id for item_id in changed if item_id in live_locations]
+        if current:
+            self.upsert(current, np.stack([
+                live_lists[live_locations[item_id][0]].vectors[live_locations[item_id][1]]
+                for item_id in current
+            ]))
+        self.trained_size = len(self.locations)
+
+    def save(self, path: Path, meta: Dict[str, Any]) -> None:
+        """Write the index to ``path`` atomically."""
+        filled = [(list_no, block) for list_no, block in enumerate(self.lists) if block.ids]
+        vectors = np.empty((len(self), self.dim), dtype=np.float32)
+        assignments = np.empty(len(self), dtype=np.int64)
+        ids: List[str] = []
+        for list_no, block in filled:
+            vectors[len(ids):len(ids) + len(block.ids)] = block.view
+            assignments[len(ids):len(ids) + len(block.ids)] = list_no
+            ids.extend(block.ids)
+        centroids = self.centroids if self.centroids is not None else np.empty((0, self.dim), np.float32)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-process name: every server worker saves its own copy
+        temporary = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        with open(temporary, "wb") as handle:
+            np.savez(
+                handle,
+                ids=np.array(ids, dtype=str),
+                vectors=vectors,
+                assignments=assignments,
+                centroids=centroids,
+                trained_size=np.array(self.trained_size),
+                meta=np.array(json.dumps(meta))
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["VectorIndex", Dict[str, Any]]:
+        """Read an index written by ``save``."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            vectors = data["vectors"]
+            index = cls(vectors.shape[1])
+            if len(data["centroids"]):
+                index.centroids = data["centroids"]
+                index.lists = [_InvertedList(index.dim) for _ in range(len(index.centroids))]
+            index.trained_size = int(data["trained_size"])
+            for item_id, vector, list_no in zip(data["ids"].tolist(), vectors, data["assignments"]):
+                index.locations[item_id] = (int(list_no), index.lists[list_no].append(item_id, vector))
+        return index, meta
+
+
+class ProspectSearchIndex:
+    """Semantic search over prospect text, kept in sync with the database.
+
+    The index is loaded from ``vector_store_path`` and reconciled with the
+    prospects table on first use, then updated incrementally by the prospect
+    handlers. Writes that arrive while the index is loading are replayed
+    once it is ready.
+
+    When the server runs several workers, each has its own index, so every
+    ``search_sync_interval`` seconds it also picks up prospects that other
+    processes created, changed or deleted.
+    """
+
+    def __init__(self, path: Optional[str] = None, embedder: Optional[Embedder] = None):
+        """Initialize the search index."""
+        self.path = Path(path or settings.vector_store_path) / INDEX_FILENAME
+        self._embedder = embedder
+        self.index: Optional[VectorIndex] = None
+        self._watermark: Optional[datetime] = None
+        self._loading = False
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._retrain_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        # Update times of rows indexed within SYNC_OVERLAP of the watermark
+        self._recent: Dict[str, datetime] = {}
+        self._syncs = 0
+
+    @property
+    def embedder(self) -> Embedder:
+        """The configured embedding backend, created on first use."""
+        if self._embedder is None:
+            self._embedder = create_embedder()
+        return self._embedder
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has been loaded and reconciled."""
+        return self.index is not None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Return the index lock for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _meta(self) -> Dict[str, Any]:
+        """Metadata that must match for a saved index to be reused."""
+        return {"embedder": self.embedder.name, "dim": self.embedder.dim}
+
+    async def start(self) -> None:
+        """Load the index in the background and keep it in sync."""
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self.ensure_loaded())
+        if self._sync_task is None and settings.search_sync_interval > 0 and multiprocess_enabled():
+            self._sync_task = asyncio.create_task(self._syncer())
+
+    async def stop(self) -> None:
+        """Persist the index and release the embedder."""
+        for task in (self._load_task, self._sync_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._load_task = self._sync_task = None
+        if self._retrain_task is not None:
+            await asyncio.gather(self._retrain_task, return_exceptions=True)
+        if self.index is not None:
+            await self.save()
+        if self._embedder is not None:
+            await self._embedder.aclose()
+
+    async def ensure_loaded(self) -> None:
+        """Load the saved index and bring it up to date with the database."""
+        if self.index is not None:
+            return
+        async with self._get_lock():
+            if self.index is not None:
+                return
+            self._loading = True
+            try:
+                index, self._watermark = await asyncio.to_thread(self._load_saved)
+                index = index or VectorIndex(self.embedder.dim)
+                await self._reconcile(index)
+
+                # Replay writes that happened during the load
+                while self._pending:
+                    pending, self._pending = self._pending, {}
+                    removed = [item_id for item_id, data in pending.items() if data is None]
+                    for item_id in removed:
+                        index.remove(item_id)
+                    await self._embed_into(index, [data for data in pending.values() if data])
+
+                if index.needs_training():
+                    index.apply_lists(await asyncio.to_thread(index.build_lists))
+                self.index = index
+            finally:
+                self._loading = False
+            logger.info(f"Prospect search index ready with {len(self.index)} vectors")
+
+    def _load_saved(self) -> Tuple[Optional[VectorIndex], Optional[datetime]]:
+        """Read the saved index and its watermark if built with the current embedder."""
+        if not self.path.exists():
+            return None, None
+        try:
+            index, meta = VectorIndex.load(self.path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable search index at {self.path}: {e}")
+            return None, None
+        if {key: meta.get(key) for key in ("embedder", "dim")} != self._meta():
+            logger.info("Embedding backend changed, rebuilding the search index")
+            return None, None
+        watermark = meta.get("watermark")
+        return index, datetime.fromisoformat(watermark) if watermark else None
+
+    async def _reconcile(self, index: VectorIndex) -> None:
+        """Index prospects added or changed since the save and drop deleted ones."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(ProspectDB.id, ProspectDB.updated_at))
+            rows = result.all()
+            current = {prospect_id for prospect_id, _ in rows}
+            stale = [
+                prospect_id for prospect_id, updated_at in rows
+                if prospect_id not in index
+                or (self._watermark and updated_at and updated_at > self._watermark)
+            ]
+            for item_id in [item_id for item_id in index.locations if item_id not in current]:
+                index.remove(item_id)
+
+            for start in range(0, len(stale), SYNC_BATCH_SIZE):
+                result = await db.execute(
+                    select(ProspectDB).where(ProspectDB.id.in_(stale[start:start + SYNC_BATCH_SIZE]))
+                )
+                await self._embed_into(index, [prospect.to_dict() for prospect in result.scalars()])
+            self._watermark = max(
+                (updated_at for _, updated_at in rows if updated_at),
+                default=self._watermark
+            )
+            # Every row is indexed at its current version now
+            self._recent = {}
+            if self._watermark is not None:
+                horizon = self._watermark - SYNC_OVERLAP
+                self._recent = {
+                    prospect_id: updated_at for prospect_id, updated_at in rows
+                    if updated_at and updated_at >= horizon
+                }
+
+    async def _embed_into(self, index: VectorIndex, prospects: List[Dict[str, Any]]) -> None:
+        """Embed prospects and upsert them into ``index``."""
+        for start in range(0, len(prospects), SYNC_BATCH_SIZE):
+            batch = prospects[start:start + SYNC_BATCH_SIZE]
+            vectors = await self.embedder.embed([prospect_text(prospect) for prospect in batch])
+            index.upsert([prospect["id"] for prospect in batch], vectors)
+
+    async def upsert(self, prospects: List[Dict[str, Any]]) -> None:
+        """Index new or changed prospects, embedding ``SYNC_BATCH_SIZE`` at a time.
+
+        Failures are logged rather than raised so search never blocks a write;
+        missed rows are picked up by the next reconcile.
+        """
+        if self._loading:
+            self._pending.update((prospect["id"], prospect) for prospect in prospects)
+            return
+        if self.index is None:
+            return
+        try:
+            for start in range(0, len(prospects), SYNC_BATCH_SIZE):
+                batch = prospects[start:start + SYNC_BATCH_SIZE]
+                vectors = await self.embedder.embed([prospect_text(prospect) for prospect in batch])
+                async with self._get_lock():
+                    self.index.upsert([prospect["id"] for prospect in batch], vectors)
+                    self._advance_watermark(batch)
+            async with self._get_lock():
+                if self.index.needs_training() and self._retrain_task is None:
+                    self._retrain_task = asyncio.create_task(self._retrain(self.index))
+        except Exception as e:
+            logger.error(f"Failed to index prospects: {e}")
+
+    async def _retrain(self, index: VectorIndex) -> None:
+        """Recluster the index in the background, off the write path.
+
+        The k-means build takes seconds at millions of vectors, so it runs
+        on a thread without the lock; writes meanwhile go to the current
+        lists and are carried over when the new ones are applied.
+        """
+        started = time.perf_counter()
+        try:
+            async with self._get_lock():
+                rows = index.snapshot()
+            built = await asyncio.to_thread(index.build_lists, rows)
+            async with self._get_lock():
+                index.apply_lists(built)
+            logger.info(
+                f"Retrained search index into {len(index.lists)} lists "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        except Exception as e:
+            logger.error(f"Failed to retrain search index: {e}")
+        finally:
+            index.release_snapshot()
+            self._retrain_task = None
+
+    async def remove(self, prospect_id: str) -> None:
+        """Drop a deleted prospect from the index."""
+        if self._loading:
+            self._pending[prospect_id] = None
+            return
+        if self.index is None:
+            return
+        async with self._get_lock():
+            self.index.remove(prospect_id)
+
+    def _advance_watermark(self, prospects: List[Dict[str, Any]]) -> None:
+        """Track the newest indexed update time."""
+        for prospect in prospects:
+            updated_at = prospect.get("updated_at")
+            if not isinstance(updated_at, datetime):
+                continue
+            self._recent[prospect["id"]] = updated_at
+            if self._watermark is None or updated_at > self._watermark:
+                self._watermark = updated_at
+        if self._watermark is not None:
+            horizon = self._watermark - SYNC_OVERLAP
+            self._recent = {item_id: seen for item_id, seen in self._recent.items() if seen >= horizon}
+
+    async def sync(self) -> int:
+        """Index prospects written by other processes since the last sync.
+
+        Rows updated after the watermark (less ``SYNC_OVERLAP``) are paged
+        through in ``(updated_at, id)`` order, ``SYNC_BATCH_SIZE`` at a
+        time, and re-embedded unless this process already indexed that
+        version. The watermark advances with each page, so a failure does
+        not repeat the pages before it. Deletions leave no row behind, so
+        every ``SYNC_COUNT_EVERY`` syncs the table is counted and a size
+        mismatch triggers a full reconcile. Returns the number of rows
+        indexed.
+        """
+        if self.index is None:
+            return 0
+        key = ProspectDB.updated_at
+        if async_engine.dialect.name == "sqlite":
+            # Timestamps are stored as text in mixed precisions; page on the
+            # stored text so the cursor agrees with ORDER BY
+            key = type_coerce(ProspectDB.updated_at, String)
+        query = (
+            select(ProspectDB, key.label("sync_key"))
+            .where(ProspectDB.updated_at.is_not(None))
+            .order_by(key, ProspectDB.id)
+            .limit(SYNC_BATCH_SIZE)
+        )
+        if self._watermark is not None:
+            query = query.where(ProspectDB.updated_at >= self._watermark - SYNC_OVERLAP)
+
+        indexed = 0
+        after = None
+        while True:
+            page_query = query if after is None else query.where(tuple_(key, ProspectDB.id) > tuple_(*after))
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(page_query)).all()
+            if not rows:
+                break
+            after = (rows[-1][1], rows[-1][0].id)
+            page = [prospect for prospect, _ in rows]
+            changed = [
+                prospect.to_dict() for prospect in page
+                if self._recent.get(prospect.id) != prospect.updated_at
+            ]
+            if changed:
+                vectors = await self.embedder.embed([prospect_text(prospect) for prospect in changed])
+                async with self._get_lock():
+                    # Skip rows a local write replaced while they were embedded
+                    fresh = [
+                        position for position, prospect in enumerate(changed)
+                        if not (prospect["id"] in self._recent
+                                and self._recent[prospect["id"]] > prospect["updated_at"])
+                    ]
+                    self.index.upsert([changed[position]["id"] for position in fresh], vectors[fresh])
+                    self._advance_watermark([changed[position] for position in fresh])
+                indexed += len(changed)
+            if len(rows) < SYNC_BATCH_SIZE:
+                break
+
+        self._syncs += 1
+        if self._syncs % SYNC_COUNT_EVERY == 0:
+            async with AsyncSessionLocal() as db:
+                count = await db.scalar(select(func.count()).select_from(ProspectDB))
+            if count != len(self.index):
+                async with self._get_lock():
+                    await self._reconcile(self.index)
+        return indexed
+
+    async def _syncer(self) -> None:
+        """Run ``sync`` on an interval once the index is loaded."""
+        while True:
+            await asyncio.sleep(settings.search_sync_interval)
+            try:
+                indexed = await self.sync()
+                if indexed:
+                    logger.debug(f"Synced {indexed} prospects into the search index")
+            except Exception as e:
+                logger.error(f"Failed to sync search index: {e}")
+
+    async def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Return the IDs of the ``k`` prospects most similar to ``query``."""
+        await self.ensure_loaded()
+        vectors = await self.embedder.embed([query])
+        return self.index.search(vectors[0], k)
+
+    async def save(self) -> None:
+        """Persist the index under ``vector_store_path``."""
+        meta = {**self._meta(), "watermark": self._watermark.isoformat() if self._watermark else None}
+        async with self._get_lock():
+            await asyncio.to_thread(self.index.save, self.path, meta)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index counters."""
+        return {
+            "ready": self.ready,
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "vectors": len(self.index) if self.index is not None else 0,
+            "lists": len(self.index.lists) if self.index is not None else 0,
+            "retraining": self._retrain_task is not None
+        }
+
+
+# Global search index instance
+prospect_index = ProspectSearchIndex()
@@ -4,12 +4,25 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 import logging
 from pathlib import Path
 
+from prometheus_client import CONTENT_TYPE_LATEST
+
 from prospectplusagent.config import settings
-from prospectplusagent.api import prospects, analytics, agent, auth
+from prospectplusagent.api import prospects, analytics, agent, auth, jobs, admin, interactions
+from prospectplusagent.core.agent import agent as prospect_agent
+from prospectplusagent.core.auth import token_cache
+from prospectplusagent.core.cache import analysis_cache
+from prospectplusagent.core.database import ReadYourWritesMiddleware, close_db, pool_stats, read_engine
+from prospectplusagent.core.engagement import engagement_compactor
+from prospectplusagent.core.interactions import interaction_buffer
+from prospectplusagent.core.jobs import analysis_pool
+from prospectplusagent.core.metrics import MetricsMiddleware, render_metrics, stats_collector
+from prospectplusagent.core.profiling import ProfilingMiddleware
+from prospectplusagent.core.serialization import FastJSONResponse
+from prospectplusagent.core.vector_store import prospect_index
 
 # Configure logging
 logging.basicConfig(
@@ -24,7 +37,8 @@ app = FastAPI(
     version=settings.app_version,
     description="Enterprise-grade AI agent for prospect and lead management",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -36,6 +50,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Send clients that just wrote to the primary while the replica catches up
+if read_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Per-request profiling, triggered by admins or sampled at a fixed rate
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.profile_dir,
+        authorize=auth.is_authorized,
+        sample_rate=settings.profile_sample_rate,
+        interval=settings.profile_interval,
+        max_profiles=settings.profile_max_count
+    )
+
+# Request metrics; outermost so CORS handling is timed too
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    stats_collector.add("analysis_cache", analysis_cache.stats)
+    stats_collector.add("analysis_pool", analysis_pool.stats)
+    stats_collector.add("interaction_buffer", interaction_buffer.stats)
+    stats_collector.add("engagement_compaction", engagement_compactor.stats)
+    stats_collector.add("search_index", prospect_index.stats)
+    stats_collector.add("db_pool", pool_stats)
+    stats_collector.add("token_cache", token_cache.stats)
+    stats_collector.add("llm", prospect_agent.llm_stats)
+
 # Mount static files
 static_path = Path(__file__).parent / "static"
 static_path.mkdir(parents=True, exist_ok=True)
@@ -50,6 +91,9 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(prospects.router, prefix="/api/prospects", tags=["Prospects"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(agent.router, prefix="/api/agent", tags=["Agent"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(interactions.router, prefix="/api/interactions", tags=["Interactions"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -75,6 +119,14 @@ async def health():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/info")
 async def info():
     """API information endpoint."""
@@ -84,10 +136,13 @@ async def info():
         "environment": settings.environment,
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/api/docs",
             "prospects": "/api/prospects",
             "analytics": "/api/analytics",
-            "agent": "/api/agent"
+            "agent": "/api/agent",
+            "jobs": "/api/jobs",
+            "admin": "/api/admin"
         }
     }
 
@@ -102,12 +157,26 @@ async def startup_event():
     Path(settings.vector_store_path).mkdir(parents=True, exist_ok=True)
     Path("./data").mkdir(parents=True, exist_ok=True)
     Path("./logs").mkdir(parents=True, exist_ok=True)
+    
+    await analysis_pool.start()
+    await interaction_buffer.start()
+    await engagement_compactor.start()
+    await prospect_index.start()
+    if settings.metrics_enabled:
+        await stats_collector.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info(f"Shutting down {settings.app_name}")
+    await stats_collector.stop()
+    await analysis_pool.stop()
+    await interaction_buffer.stop()
+    await engagement_compactor.stop()
+    await prospect_index.stop()
+    await prospect_agent.aclose()
+    await close_db()
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -25,6 +25,26 @@ class ProspectPriority(str, Enum):
     CRITICAL = "critical"
 
 
+class ProspectSort(str, Enum):
+    """Keyset sort keys for prospect listings."""
+    CREATED_AT = "created_at"
+    SCORE = "score"
+
+
+class SortOrder(str, Enum):
+    """Sort direction."""
+    ASC = "asc"
+    DESC = "desc"
+
+
+class TrendGranularity(str, Enum):
+    """Time bucket size for trend series."""
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
 class ProspectBase(BaseModel):
     """Base prospect model."""
     company_name: str = Field(..., min_length=1, max_length=200)
@@ -72,6 +92,45 @@ class Prospect(ProspectBase):
         from_attributes = True
 
 
+class JobStatus(str, Enum):
+    """Background job status enumeration."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AnalysisJob(BaseModel):
+    """Background prospect analysis job."""
+    id: str
+    prospect_id: str
+    status: JobStatus
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Model for batch prospect analysis requests."""
+    prospect_ids: List[str] = Field(..., min_length=1)
+    refresh: bool = False
+
+
+class ProspectAnalysis(BaseModel):
+    """Analysis of a single prospect."""
+    prospect_id: str
+    analysis: Dict[str, Any]
+
+
+class BatchAnalysisResult(BaseModel):
+    """Model for batch prospect analysis results."""
+    results: List[ProspectAnalysis]
+    not_found: List[str] = Field(default_factory=list)
+
+
 class AgentQuery(BaseModel):
     """Model for agent queries."""
     query: str = Field(..., min_length=1, max_length=2000)
@@ -105,6 +164,74 @@ class AnalyticsResponse(BaseModel):
     trends: Optional[Dict[str, Any]] = None
 
 
+class ImportFormat(str, Enum):
+    """Supported bulk import formats."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    """A row rejected during bulk import."""
+    row: int
+    email: Optional[str] = None
+    error: str
+
+
+class ImportResult(BaseModel):
+    """Summary of a bulk import run."""
+    total_rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+
+class ProspectMatch(BaseModel):
+    """A prospect returned by search with its relevance score."""
+    score: float
+    prospect: Prospect
+
+
+class InteractionCreate(BaseModel):
+    """Model for an ingested interaction event (email open, call, meeting...)."""
+    prospect_id: str = Field(..., min_length=1, max_length=64)
+    interaction_type: str = Field(..., min_length=1, max_length=50)
+    content: Optional[str] = Field(None, max_length=10000)
+    metadata: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = Field(None, description="When it happened; defaults to receipt time")
+
+
+class Interaction(InteractionCreate):
+    """Model for a stored interaction."""
+    id: str
+    created_at: datetime
+
+
+class InteractionIngestResult(BaseModel):
+    """Interactions accepted for write-behind insertion."""
+    accepted: int
+    ids: List[str]
+
+
+class EngagementWindow(str, Enum):
+    """Rolling windows tracked by the engagement features."""
+    DAYS_7 = "7d"
+    DAYS_30 = "30d"
+    DAYS_90 = "90d"
+
+
+class EngagementFeatures(BaseModel):
+    """Per-prospect interaction counts over rolling UTC-day windows."""
+    prospect_id: str
+    interactions_7d: int = 0
+    interactions_30d: int = 0
+    interactions_90d: int = 0
+    total_interactions: int = 0
+    last_touch_at: Optional[datetime] = None
+    as_of: Optional[date] = Field(None, description="Last day covered by the windows")
+
+
 class Token(BaseModel):
     """Authentication token model."""
     access_token: str
@@ -1,6 +1,6 @@
 """Database models using SQLAlchemy."""
 
-from sqlalchemy import Column, String, DateTime, Float, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Float, Integer, JSON, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -13,6 +13,16 @@ class ProspectDB(Base):
     """Database model for prospects."""
     
     __tablename__ = "prospects"
+    __table_args__ = (
+        # Covers the grouped analytics overview as an index-only scan
+        Index("ix_prospects_status_priority_score", "status", "priority", "score"),
+        # Keyset pagination on (created_at, id)
+        Index("ix_prospects_created_at_id", "created_at", "id"),
+        # Search index sync pages through rows changed since its watermark
+        Index("ix_prospects_updated_at_id", "updated_at", "id"),
+    )
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     company_name = Column(String(200), nullable=False, index=True)
@@ -53,14 +63,135 @@ class ProspectDB(Base):
         }
 
 
+# Unscored prospects sort as -1 when paginating by score
+UNSCORED_SORT_VALUE = -1.0
+prospect_score_key = func.coalesce(ProspectDB.score, UNSCORED_SORT_VALUE)
+Index("ix_prospects_score_key_id", prospect_score_key, ProspectDB.id)
+
+
 class InteractionDB(Base):
     """Database model for prospect interactions."""
     
     __tablename__ = "interactions"
+    __table_args__ = (
+        # Per-prospect timeline, keyset-paginated on (created_at, id)
+        Index("ix_interactions_prospect_created_id", "prospect_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    prospect_id = Column(String, nullable=False, index=True)
+    prospect_id = Column(String, nullable=False)
     interaction_type = Column(String(50), nullable=False)
     content = Column(String)
     interaction_metadata = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "prospect_id": self.prospect_id,
+            "interaction_type": self.interaction_type,
+            "content": self.content,
+            "metadata": self.interaction_metadata,
+            "created_at": self.created_at
+        }
+
+
+class ProspectEngagementDB(Base):
+    """Database model for per-prospect engagement features.
+    
+    Maintained incrementally as interactions are ingested; a periodic
+    compaction moves the windows forward. See ``core.engagement``.
+    """
+    
+    __tablename__ = "prospect_engagement"
+    
+    prospect_id = Column(String, primary_key=True)
+    interactions_7d = Column(Integer, nullable=False, default=0)
+    interactions_30d = Column(Integer, nullable=False, default=0)
+    interactions_90d = Column(Integer, nullable=False, default=0)
+    total_interactions = Column(Integer, nullable=False, default=0)
+    # Naive UTC, like interaction timestamps
+    last_touch_at = Column(DateTime)
+    # UTC day (days since the Unix epoch) the windows end on
+    window_end = Column(Integer, nullable=False)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "prospect_id": self.prospect_id,
+            "interactions_7d": self.interactions_7d,
+            "interactions_30d": self.interactions_30d,
+            "interactions_90d": self.interactions_90d,
+            "total_interactions": self.total_interactions,
+            "last_touch_at": self.last_touch_at,
+            "window_end": self.window_end
+        }
+
+
+class EngagementDailyDB(Base):
+    """Database model for interaction counts per prospect and UTC day.
+    
+    Kept for the longest window so compaction knows how much to subtract
+    as days expire.
+    """
+    
+    __tablename__ = "engagement_daily"
+    
+    prospect_id = Column(String, primary_key=True)
+    day = Column(Integer, primary_key=True, index=True)
+    interactions = Column(Integer, nullable=False, default=0)
+
+
+class AnalysisJobDB(Base):
+    """Database model for queued prospect analysis jobs."""
+    
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    prospect_id = Column(String, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "prospect_id": self.prospect_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "completed_at": self.completed_at
+        }
+
+
+class AnalysisCacheDB(Base):
+    """Database model for cached prospect analysis results."""
+    
+    __tablename__ = "analysis_cache"
+    
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Naive UTC so expiry checks compare the same way on every backend
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class RevokedTokenDB(Base):
+    """Database model for revoked access tokens."""
+    
+    __tablename__ = "revoked_tokens"
+    
+    token_id = Column(String(64), primary_key=True)
+    # Naive UTC; rows can be purged once the token would have expired anyway
+    expires_at = Column(DateTime, nullable=False, index=True)
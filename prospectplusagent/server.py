@@ -0,0 +1,84 @@
+"""Preforking server for running several worker processes on one box."""
+
+from typing import Any, Dict, Tuple
+from pathlib import Path
+import logging
+import os
+import shutil
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+logger = logging.getLogger(__name__)
+
+
+class GunicornApplication(BaseApplication):
+    """Gunicorn master running the app in uvicorn workers.
+
+    The app is imported in each worker after the fork (no ``preload_app``),
+    so every process builds its own engines, pools, caches and background
+    tasks.
+    """
+
+    def __init__(self, options: Dict[str, Any]):
+        """Initialize the application."""
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the options to gunicorn's config."""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Import the ASGI app inside a worker."""
+        from prospectplusagent.main import app
+        return app
+
+
+def prepare_metrics_dir() -> Tuple[str, bool]:
+    """Point prometheus_client at a shared directory for multiprocess mode.
+
+    Uses ``PROMETHEUS_MULTIPROC_DIR`` if set, else a fresh temporary
+    directory, and clears samples left by a previous run. Must run before
+    prometheus_client is imported, which picks its value store on import.
+    Returns the directory and whether it was created here.
+    """
+    configured = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    path = Path(configured or tempfile.mkdtemp(prefix="prospectplus-metrics-"))
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+    return str(path), not configured
+
+
+def child_exit(server, worker) -> None:
+    """Drop a dead worker's live gauges so they stop counting in scrapes."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def run_workers(host: str, port: int, workers: int) -> None:
+    """Serve the app from ``workers`` processes (0 means one per CPU)."""
+    # Before the imports below, which load prometheus_client
+    metrics_dir, temporary = prepare_metrics_dir()
+    from prospectplusagent.core.database import engine, init_db
+
+    workers = workers or os.cpu_count() or 1
+    # Create the schema once here rather than racing DDL in every worker
+    init_db()
+    engine.dispose()
+
+    logger.info(f"Starting {workers} workers on {host}:{port} (metrics in {metrics_dir})")
+    try:
+        GunicornApplication({
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": False,
+            "child_exit": child_exit,
+        }).run()
+    finally:
+        if temporary:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
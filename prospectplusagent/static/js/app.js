@@ -95,7 +95,7 @@ async function loadDashboard() {
     try {
         const [analytics, prospects] = await Promise.all([
             fetch(`${API_BASE}/analytics/overview`).then(r => r.json()),
-            fetch(`${API_BASE}/prospects?limit=5`).then(r => r.json())
+            fetch(`${API_BASE}/prospects?limit=5&order=desc`).then(r => r.json())
         ]);
 
         // Update stats
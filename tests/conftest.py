@@ -1,8 +1,17 @@
 """Test configuration file."""
 
+import asyncio
 import pytest
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dispose_database_pools():
+    """Close pooled async connections so their driver threads exit."""
+    yield
+    from prospectplusagent.core.database import async_engine
+    asyncio.run(async_engine.dispose())
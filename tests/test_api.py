@@ -1,7 +1,13 @@
 """Tests for ProspectPlusAgent."""
 
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
+from prospectplusagent.config import settings
+from prospectplusagent.core.auth import token_cache
 from prospectplusagent.main import app
 
 client = TestClient(app)
@@ -33,6 +39,23 @@ def test_root_endpoint():
     assert "text/html" in response.headers["content-type"]
 
 
+class TestAuth:
+    """Test authentication endpoints."""
+    
+    def test_login_and_logout(self):
+        """Test that a revoked token is rejected even though it is cached."""
+        response = client.post("/api/auth/token", data={"username": "demo", "password": "wrong"})
+        assert response.status_code == 401
+        
+        response = client.post("/api/auth/token", data={"username": "demo", "password": "demo123"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        assert client.get("/api/auth/me", headers=headers).json()["username"] == "demo"
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        
+        assert client.post("/api/auth/logout", headers=headers).status_code == 204
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
 class TestProspects:
     """Test prospect endpoints."""
     
@@ -67,6 +90,86 @@ class TestProspects:
         data = response.json()
         assert isinstance(data, list)
     
+    def test_update_and_get_prospect(self):
+        """Test updating a prospect and reading it back."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Update Corp",
+            "contact_name": "Jane Roe",
+            "email": "jane@updatecorp.com",
+            "tags": []
+        })
+        assert response.status_code == 201
+        prospect_id = response.json()["id"]
+        
+        response = client.put(
+            f"/api/prospects/{prospect_id}",
+            json={"status": "qualified", "notes": "Budget approved"}
+        )
+        assert response.status_code == 200
+        
+        response = client.get(f"/api/prospects/{prospect_id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "qualified"
+        assert data["notes"] == "Budget approved"
+        
+        # Clean up
+        assert client.delete(f"/api/prospects/{prospect_id}").status_code == 204
+        assert client.get(f"/api/prospects/{prospect_id}").status_code == 404
+    
+    def test_cursor_pagination(self):
+        """Test walking a filtered listing with cursors."""
+        created = []
+        for index in range(5):
+            response = client.post("/api/prospects/", json={
+                "company_name": f"Keyset Corp {index}",
+                "contact_name": "Kay",
+                "email": f"kay{index}@keysetcorp.com",
+                "industry": "KeysetTest",
+                "tags": []
+            })
+            created.append(response.json()["id"])
+        
+        for sort, order in [("created_at", "asc"), ("created_at", "desc"), ("score", "desc")]:
+            seen = []
+            cursor = None
+            while True:
+                params = {"industry": "KeysetTest", "limit": 2, "sort": sort, "order": order}
+                if cursor:
+                    params["cursor"] = cursor
+                response = client.get("/api/prospects/", params=params)
+                assert response.status_code == 200
+                seen.extend(p["id"] for p in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+                if len(seen) == 2 and sort == "created_at" and order == "asc":
+                    # Rows inserted mid-walk must not shift or repeat earlier pages
+                    response = client.post("/api/prospects/", json={
+                        "company_name": "Keyset Late",
+                        "contact_name": "Kay",
+                        "email": "late@keysetcorp.com",
+                        "industry": "KeysetTest",
+                        "tags": []
+                    })
+                    created.append(response.json()["id"])
+            # Every pre-existing row appears exactly once
+            assert len(seen) == len(set(seen))
+            assert set(created[:5]) <= set(seen) <= set(created)
+        
+        response = client.get("/api/prospects/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        
+        first = client.get("/api/prospects/", params={"limit": 1})
+        response = client.get("/api/prospects/", params={
+            "cursor": first.headers["X-Next-Cursor"], "skip": 1
+        })
+        assert response.status_code == 400
+        
+        # Clean up
+        for prospect_id in created:
+            client.delete(f"/api/prospects/{prospect_id}")
+    
     def test_create_duplicate_email(self):
         """Test that duplicate emails are rejected."""
         prospect_data = {
@@ -89,6 +192,368 @@ class TestProspects:
         
         # Clean up
         client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_analyze_batch(self):
+        """Test analyzing several prospects in one call."""
+        prospect_ids = []
+        for index, priority in enumerate(["high", "low"]):
+            response = client.post("/api/prospects/", json={
+                "company_name": f"Batch Corp {index}",
+                "contact_name": "Bea",
+                "email": f"bea{index}-{time.time_ns()}@batch.io",
+                "priority": priority
+            })
+            prospect_ids.append(response.json()["id"])
+        
+        response = client.post(
+            "/api/prospects/analyze-batch",
+            json={"prospect_ids": [*prospect_ids, "missing-prospect", prospect_ids[0]]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["prospect_id"] for r in data["results"]] == prospect_ids
+        assert data["not_found"] == ["missing-prospect"]
+        for result in data["results"]:
+            saved = client.get(f"/api/prospects/{result['prospect_id']}").json()
+            assert saved["score"] == result["analysis"]["score"]
+        
+        assert client.post("/api/prospects/analyze-batch", json={"prospect_ids": []}).status_code == 422
+        too_many = [f"p{index}" for index in range(settings.analysis_batch_max_prospects + 1)]
+        assert client.post("/api/prospects/analyze-batch", json={"prospect_ids": too_many}).status_code == 413
+        
+        for prospect_id in prospect_ids:
+            client.delete(f"/api/prospects/{prospect_id}")
+
+
+class TestJobs:
+    """Test background analysis jobs."""
+    
+    def _wait_for_job(self, test_client, job_id, timeout=5.0):
+        """Poll a job until it leaves the queue."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = test_client.get(f"/api/jobs/{job_id}").json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.05)
+        return job
+    
+    def test_create_enqueues_analysis_job(self):
+        """Test that pending jobs survive until a worker pool starts."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Queue Corp",
+            "contact_name": "Quinn",
+            "email": "quinn@queuecorp.com",
+            "industry": "Logistics",
+            "tags": []
+        })
+        assert response.status_code == 201
+        prospect_id = response.json()["id"]
+        job_id = response.headers["X-Analysis-Job"]
+        
+        # No workers run without the app lifespan, so the job stays queued
+        job = client.get(f"/api/jobs/{job_id}").json()
+        assert job["status"] == "pending"
+        assert job["prospect_id"] == prospect_id
+        
+        # Starting the app recovers the pending job from the table
+        with TestClient(app) as live_client:
+            job = self._wait_for_job(live_client, job_id)
+            assert job["status"] == "completed"
+            assert job["attempts"] == 1
+            assert job["result"]["score"] is not None
+            
+            prospect = live_client.get(f"/api/prospects/{prospect_id}").json()
+            assert prospect["score"] == job["result"]["score"]
+            
+            stats = live_client.get("/api/jobs/stats").json()
+            assert stats["pool"]["started"] is True
+            assert stats["by_status"]["completed"] >= 1
+        
+        jobs = client.get(f"/api/jobs/?prospect_id={prospect_id}").json()
+        assert [j["id"] for j in jobs] == [job_id]
+        
+        # Clean up
+        client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_get_missing_job(self):
+        """Test that unknown jobs return 404."""
+        response = client.get("/api/jobs/does-not-exist")
+        assert response.status_code == 404
+
+
+class TestSearch:
+    """Test semantic prospect search."""
+    
+    def test_search_prospects(self):
+        """Test that search ranks by meaning and tracks writes."""
+        created = []
+        for company, industry, notes in [
+            ("Nimbus Cloud", "Software", "Cloud infrastructure and SaaS monitoring"),
+            ("Golden Crust", "Food", "Artisan bakery chain"),
+        ]:
+            response = client.post("/api/prospects/", json={
+                "company_name": company,
+                "contact_name": "Sam",
+                "email": f"sam@{company.split()[0].lower()}search.io",
+                "industry": industry,
+                "notes": notes
+            })
+            created.append(response.json()["id"])
+        
+        response = client.get("/api/prospects/search?q=cloud%20saas%20software&limit=5")
+        assert response.status_code == 200
+        results = response.json()
+        assert results[0]["prospect"]["id"] == created[0]
+        assert results[0]["score"] > 0
+        
+        # Updates and deletes are reflected immediately
+        client.put(f"/api/prospects/{created[1]}", json={"notes": "Cloud SaaS for bakeries"})
+        response = client.get("/api/prospects/search?q=bakeries&limit=5")
+        assert response.json()[0]["prospect"]["id"] == created[1]
+        
+        client.delete(f"/api/prospects/{created[0]}")
+        response = client.get("/api/prospects/search?q=cloud%20infrastructure&limit=50")
+        assert created[0] not in [match["prospect"]["id"] for match in response.json()]
+        
+        client.delete(f"/api/prospects/{created[1]}")
+    
+    def test_text_search(self):
+        """Test ranked full-text search with filters and write sync."""
+        created = []
+        for index, (company, notes, prospect_status) in enumerate([
+            ("Ledger Works", "Mentioned budget approval for next quarter", "qualified"),
+            ("Approval Budget Partners", "Follow up in spring", "new"),
+            ("Quiet Fields", "No budget this year", "qualified"),
+        ]):
+            response = client.post("/api/prospects/", json={
+                "company_name": company,
+                "contact_name": "Tess",
+                "email": f"tess{index}@textsearch.io",
+                "notes": notes,
+                "status": prospect_status
+            })
+            created.append(response.json()["id"])
+        
+        # Every word must match; stemming matches "approved" to "approval"
+        response = client.get("/api/prospects/text-search?q=budget%20approved")
+        assert response.status_code == 200
+        ids = [match["prospect"]["id"] for match in response.json()]
+        assert set(ids) == {created[0], created[1]}
+        # Company name matches outrank notes matches
+        assert ids[0] == created[1]
+        
+        response = client.get("/api/prospects/text-search?q=budget&status=qualified")
+        assert {match["prospect"]["id"] for match in response.json()} == {created[0], created[2]}
+        
+        client.put(f"/api/prospects/{created[2]}", json={"notes": "Budget approval pending"})
+        response = client.get("/api/prospects/text-search?q=budget%20approval&status=qualified")
+        assert {match["prospect"]["id"] for match in response.json()} == {created[0], created[2]}
+        
+        for prospect_id in created:
+            client.delete(f"/api/prospects/{prospect_id}")
+        assert client.get("/api/prospects/text-search?q=budget%20approval").json() == []
+        
+        # Punctuation alone is not a query error
+        assert client.get('/api/prospects/text-search?q=%22%3B').json() == []
+    
+    def test_search_requires_query(self):
+        """Test that an empty query is rejected."""
+        response = client.get("/api/prospects/search?q=")
+        assert response.status_code == 422
+
+
+class TestBulkImport:
+    """Test bulk prospect import."""
+    
+    def _cleanup(self, domain: str):
+        """Delete prospects imported under a test domain."""
+        for prospect in client.get("/api/prospects/?limit=1000").json():
+            if prospect["email"].endswith(domain):
+                client.delete(f"/api/prospects/{prospect['id']}")
+    
+    def test_import_csv(self):
+        """Test CSV import with duplicates, bad rows and multi-line fields."""
+        body = (
+            "company_name,contact_name,email,industry,tags,notes\n"
+            "Alpha Inc,Amy,amy@csvimport.io,Technology,a;b,\n"
+            'Beta LLC,Ben,ben@csvimport.io,,,"line one\nline two"\n'
+            "Alpha Dup,Amy,amy@csvimport.io,,,\n"
+            "Gamma Co,Gus,not-an-email,,,\n"
+            "Short,Row\n"
+        )
+        response = client.post(
+            "/api/prospects/import?batch_size=2",
+            content=body,
+            headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_rows"] == 5
+        assert data["inserted"] == 2
+        assert data["duplicates"] == 1
+        assert data["failed"] == 2
+        assert {error["row"] for error in data["errors"]} == {4, 5}
+        
+        prospects = {
+            p["email"]: p for p in client.get("/api/prospects/?limit=1000").json()
+        }
+        assert prospects["amy@csvimport.io"]["tags"] == ["a", "b"]
+        assert prospects["ben@csvimport.io"]["notes"] == "line one\nline two"
+        
+        # Re-importing skips everything already stored
+        response = client.post(
+            "/api/prospects/import", content=body, headers={"Content-Type": "text/csv"}
+        )
+        assert response.json()["inserted"] == 0
+        
+        self._cleanup("@csvimport.io")
+    
+    def test_import_ndjson(self):
+        """Test NDJSON import reports malformed lines."""
+        body = (
+            '{"company_name": "Delta", "contact_name": "Dee", "email": "dee@ndimport.io"}\n'
+            "{not json}\n"
+            '{"company_name": "Echo", "contact_name": "Eve", "email": "eve@ndimport.io",'
+            ' "status": "qualified"}\n'
+        )
+        response = client.post(
+            "/api/prospects/import",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["inserted"] == 2
+        assert data["failed"] == 1
+        assert data["errors"][0]["row"] == 2
+        
+        self._cleanup("@ndimport.io")
+
+
+class TestInteractions:
+    """Test interaction ingestion and timelines."""
+    
+    def test_ingest_and_page_timeline(self):
+        """Test that ingested events come back newest first across cursor pages."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Timeline Corp", "contact_name": "Ann Lee",
+            "email": "ann@timeline.io", "tags": []
+        })
+        prospect_id = response.json()["id"]
+        
+        try:
+            events = [
+                {
+                    "prospect_id": prospect_id,
+                    "interaction_type": "email_open",
+                    "content": f"Opened email {index}",
+                    "metadata": {"campaign": "q3"},
+                    "created_at": f"2024-05-01T10:00:{index:02d}Z"
+                }
+                for index in range(5)
+            ]
+            response = client.post("/api/interactions/", json=events)
+            assert response.status_code == 202
+            assert response.json()["accepted"] == 5
+            
+            response = client.post("/api/interactions/", json={
+                "prospect_id": prospect_id, "interaction_type": "call"
+            })
+            assert response.status_code == 202
+            
+            seen = []
+            cursor = None
+            while True:
+                params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+                response = client.get(f"/api/prospects/{prospect_id}/interactions", params=params)
+                assert response.status_code == 200
+                seen.extend(response.json())
+                cursor = response.headers.get("x-next-cursor")
+                if not cursor:
+                    break
+            
+            assert len(seen) == 6
+            assert seen[0]["interaction_type"] == "call"
+            assert [event["content"] for event in seen[1:]] == [f"Opened email {i}" for i in range(4, -1, -1)]
+            assert seen[1]["metadata"] == {"campaign": "q3"}
+            
+            oldest = client.get(f"/api/prospects/{prospect_id}/interactions", params={"order": "asc", "limit": 1})
+            assert oldest.json()[0]["content"] == "Opened email 0"
+        finally:
+            client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_timeline_unknown_prospect(self):
+        """Test that an unknown prospect's timeline is a 404."""
+        assert client.get("/api/prospects/missing-prospect/interactions").status_code == 404
+    
+    def test_engagement_features_and_filters(self):
+        """Test that ingestion updates engagement features used by the list filters."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Engaged Corp", "contact_name": "Eve Ng",
+            "email": "eve@engaged.io", "tags": []
+        })
+        prospect_id = response.json()["id"]
+        
+        try:
+            features = client.get(f"/api/prospects/{prospect_id}/engagement").json()
+            assert features["interactions_30d"] == 0 and features["last_touch_at"] is None
+            
+            now = datetime.now(timezone.utc)
+            events = [
+                {"prospect_id": prospect_id, "interaction_type": "call", "created_at": (now - timedelta(days=days)).isoformat()}
+                for days in (0, 1, 20, 60, 200)
+            ]
+            assert client.post("/api/interactions/", json=events).status_code == 202
+            
+            features = client.get(f"/api/prospects/{prospect_id}/engagement").json()
+            assert [features[f"interactions_{window}"] for window in ("7d", "30d", "90d")] == [2, 3, 4]
+            assert features["total_interactions"] == 5
+            assert client.get(f"/api/prospects/{prospect_id}").json()["last_contact"] is not None
+            
+            listed = client.get("/api/prospects/", params={"min_interactions": 3, "limit": 1000}).json()
+            assert prospect_id in [prospect["id"] for prospect in listed]
+            listed = client.get("/api/prospects/", params={
+                "min_interactions": 3, "engagement_window": "7d", "limit": 1000
+            }).json()
+            assert prospect_id not in [prospect["id"] for prospect in listed]
+            listed = client.get("/api/prospects/", params={
+                "touched_since": (now - timedelta(hours=1)).isoformat(), "limit": 1000
+            }).json()
+            assert prospect_id in [prospect["id"] for prospect in listed]
+        finally:
+            client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_engagement_unknown_prospect(self):
+        """Test that an unknown prospect's engagement is a 404."""
+        assert client.get("/api/prospects/missing-prospect/engagement").status_code == 404
+    
+    def test_unknown_and_deleted_prospects(self):
+        """Test that unknown prospects get no rows and a delete removes the timeline."""
+        unknown = client.get("/api/interactions/stats").json()["unknown"]
+        response = client.post("/api/interactions/", json={
+            "prospect_id": "missing-prospect", "interaction_type": "call"
+        })
+        assert response.status_code == 202
+        assert client.get("/api/interactions/stats").json()["unknown"] == unknown + 1
+        assert client.get("/api/prospects/missing-prospect/interactions").status_code == 404
+
+        response = client.post("/api/prospects/", json={
+            "company_name": "Departed Corp", "contact_name": "Dee Park",
+            "email": "dee@departed.io", "tags": []
+        })
+        prospect_id = response.json()["id"]
+        client.post("/api/interactions/", json={"prospect_id": prospect_id, "interaction_type": "call"})
+        assert len(client.get(f"/api/prospects/{prospect_id}/interactions").json()) == 1
+
+        assert client.delete(f"/api/prospects/{prospect_id}").status_code == 204
+        assert client.get(f"/api/prospects/{prospect_id}/interactions").status_code == 404
+        assert client.get(f"/api/prospects/{prospect_id}/engagement").status_code == 404
+
+    def test_ingest_rejects_oversized_batch(self):
+        """Test the per-request batch limit."""
+        events = [{"prospect_id": "p", "interaction_type": "call"}] * (settings.interaction_max_batch + 1)
+        assert client.post("/api/interactions/", json=events).status_code == 413
 
 
 class TestAnalytics:
@@ -104,6 +569,38 @@ class TestAnalytics:
         assert "by_priority" in data
         assert "conversion_rate" in data
     
+    def test_analytics_overview_counts(self):
+        """Test that overview counts reflect newly created prospects."""
+        before = client.get("/api/analytics/overview").json()
+        
+        created = []
+        for index, (status, priority) in enumerate([
+            ("closed_won", "high"),
+            ("closed_lost", "high"),
+            ("qualified", "low")
+        ]):
+            response = client.post("/api/prospects/", json={
+                "company_name": f"Overview Corp {index}",
+                "contact_name": "Ann Lee",
+                "email": f"overview{index}@test.com",
+                "status": status,
+                "priority": priority,
+                "tags": []
+            })
+            assert response.status_code == 201
+            created.append(response.json()["id"])
+        
+        after = client.get("/api/analytics/overview").json()
+        assert after["total_prospects"] == before["total_prospects"] + 3
+        assert after["by_status"]["closed_won"] == before["by_status"]["closed_won"] + 1
+        assert after["by_status"]["qualified"] == before["by_status"]["qualified"] + 1
+        assert after["by_priority"]["high"] == before["by_priority"]["high"] + 2
+        assert set(after["by_status"]) >= {"new", "negotiation", "closed_lost"}
+        
+        # Clean up
+        for prospect_id in created:
+            client.delete(f"/api/prospects/{prospect_id}")
+    
     def test_trends_endpoint(self):
         """Test trends endpoint."""
         response = client.get("/api/analytics/trends?days=7")
@@ -111,6 +608,112 @@ class TestAnalytics:
         data = response.json()
         assert "period" in data
         assert "daily_counts" in data
+    
+    def test_trends_granularity(self):
+        """Test that trends are zero-filled and count new prospects."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Trend Corp",
+            "contact_name": "Tim Ray",
+            "email": "tim@trendcorp.com",
+            "tags": []
+        })
+        prospect_id = response.json()["id"]
+        
+        for granularity, days, min_buckets in [
+            ("hour", 1, 24),
+            ("day", 7, 7),
+            ("week", 28, 4),
+            ("month", 90, 3)
+        ]:
+            response = client.get(
+                f"/api/analytics/trends?days={days}&granularity={granularity}"
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["granularity"] == granularity
+            assert len(data["series"]) >= min_buckets
+            assert data["total"] >= 1
+            assert data["total"] == sum(point["count"] for point in data["series"])
+        
+        response = client.get("/api/analytics/trends?granularity=minute")
+        assert response.status_code == 422
+        
+        # Clean up
+        client.delete(f"/api/prospects/{prospect_id}")
+
+
+class TestReadReplica:
+    """Test read/write splitting against a second SQLite file as the replica."""
+    
+    @pytest.fixture
+    def replica(self, tmp_path, monkeypatch):
+        """Point read sessions at a replica that holds one extra prospect."""
+        import asyncio
+        from sqlalchemy import create_engine
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.orm import Session
+        from sqlalchemy.pool import NullPool
+        from prospectplusagent.core import database
+        from prospectplusagent.models.database import Base, ProspectDB
+        
+        path = tmp_path / "replica.db"
+        sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(sync_engine)
+        with Session(sync_engine) as db:
+            db.add(ProspectDB(
+                id="replica-only", company_name="Replica Corp", contact_name="Ann Lee",
+                email="ann@replica.io", tags=[]
+            ))
+            db.commit()
+        sync_engine.dispose()
+        
+        read_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(
+            bind=read_engine, sync_session_class=database.ReadOnlySession, expire_on_commit=False
+        ))
+        yield
+        asyncio.run(read_engine.dispose())
+    
+    def test_reads_use_replica_unless_primary_requested(self, replica):
+        """Test that GETs hit the replica and X-Read-Primary bypasses it."""
+        assert client.get("/api/prospects/replica-only").status_code == 200
+        assert client.get("/api/analytics/overview").json()["total_prospects"] == 1
+        
+        response = client.get("/api/prospects/replica-only", headers={"X-Read-Primary": "1"})
+        assert response.status_code == 404
+    
+    def test_read_your_writes_after_create(self, replica):
+        """Test that a client reads its own write from the primary."""
+        from prospectplusagent.core.database import ReadYourWritesMiddleware
+        
+        writer = TestClient(ReadYourWritesMiddleware(app, window=5))
+        response = writer.post("/api/prospects/", json={
+            "company_name": "Fresh Corp", "contact_name": "Bo Kim",
+            "email": "bo@fresh.io", "tags": []
+        })
+        assert response.status_code == 201
+        prospect_id = response.json()["id"]
+        
+        try:
+            assert writer.get(f"/api/prospects/{prospect_id}").status_code == 200
+            # Without the cookie the replica has not seen the write
+            assert client.get(f"/api/prospects/{prospect_id}").status_code == 404
+        finally:
+            client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_read_sessions_refuse_writes(self):
+        """Test that read-only sessions cannot flush changes."""
+        import asyncio
+        from prospectplusagent.core.database import AsyncPrimaryReadSessionLocal
+        from prospectplusagent.models.database import ProspectDB
+        
+        async def write():
+            async with AsyncPrimaryReadSessionLocal() as db:
+                db.add(ProspectDB(company_name="X", contact_name="Y", email="x@y.io"))
+                await db.commit()
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(write())
 
 
 class TestAgent:
@@ -137,3 +740,130 @@ class TestAgent:
         data = response.json()
         assert "response" in data
         assert "confidence" in data
+    
+    def test_agent_chat_stream(self):
+        """Test that stream=true returns server-sent events."""
+        query_data = {
+            "query": "What is a prospect?",
+            "stream": True
+        }
+        
+        with client.stream("POST", "/api/agent/chat", json=query_data) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+        
+        events = [
+            block.split("\n") for block in body.strip().split("\n\n")
+        ]
+        names = [lines[0].removeprefix("event: ") for lines in events]
+        assert names[-1] == "done"
+        assert set(names[:-1]) == {"token"}
+        text = "".join(
+            json.loads(lines[1].removeprefix("data: "))["token"] for lines in events[:-1]
+        )
+        assert "What is a prospect?" in text
+
+
+class TestAdmin:
+    """Test admin endpoints."""
+    
+    def _token(self) -> str:
+        """Log in as the demo user."""
+        response = client.post(
+            "/api/auth/token", data={"username": "demo", "password": "demo123"}
+        )
+        return response.json()["access_token"]
+    
+    def test_rescore_requires_auth(self):
+        """Test that bulk rescoring is admin-only."""
+        response = client.post("/api/admin/rescore")
+        assert response.status_code == 401
+    
+    def test_rescore(self):
+        """Test that bulk rescoring rewrites stale scores."""
+        response = client.post("/api/prospects/", json={
+            "company_name": "Rescore Corp",
+            "contact_name": "Rita",
+            "email": "rita@rescore.io",
+            "industry": "Technology",
+            "website": "https://rescore.io"
+        })
+        prospect_id = response.json()["id"]
+        
+        headers = {"Authorization": f"Bearer {self._token()}"}
+        response = client.post("/api/admin/rescore?batch_size=2", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scanned"] >= 1
+        assert data["updated"] >= 1
+        assert client.get(f"/api/prospects/{prospect_id}").json()["score"] == pytest.approx(0.7)
+        
+        # A second pass has nothing left to change
+        response = client.post("/api/admin/rescore", headers=headers)
+        assert response.json()["updated"] == 0
+        
+        # Clearing a field lowers the score on the next pass
+        client.put(f"/api/prospects/{prospect_id}", json={"industry": ""})
+        response = client.post("/api/admin/rescore", headers=headers)
+        assert response.json()["updated"] == 1
+        assert client.get(f"/api/prospects/{prospect_id}").json()["score"] == pytest.approx(0.6)
+        
+        client.delete(f"/api/prospects/{prospect_id}")
+    
+    def test_profile_request(self):
+        """Test that admins can profile a single request."""
+        # The flag is ignored without a token
+        response = client.get("/api/analytics/overview", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        
+        headers = {"Authorization": f"Bearer {self._token()}"}
+        response = client.get("/api/analytics/overview?profile=1", headers=headers)
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+        
+        try:
+            profiles = client.get("/api/admin/profiles", headers=headers).json()
+            assert profile_id in [profile["id"] for profile in profiles]
+            tree = client.get(f"/api/admin/profiles/{profile_id}.txt", headers=headers)
+            assert tree.status_code == 200
+            assert "samples every" in tree.text
+            folded = client.get(f"/api/admin/profiles/{profile_id}.folded", headers=headers)
+            assert folded.status_code == 200
+            
+            response = client.get("/api/admin/profiles/..%2F.env", headers=headers)
+            assert response.status_code == 404
+            
+            # A token revoked by another worker is refused once this one's cache is cold
+            token = self._token()
+            assert client.post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 204
+            token_cache._revoked.clear()
+            token_cache.clear()
+            response = client.get("/api/analytics/overview", headers={
+                "Authorization": f"Bearer {token}", "X-Profile": "1"
+            })
+            assert "x-profile-id" not in response.headers
+        finally:
+            for suffix in (".txt", ".folded"):
+                (Path(settings.profile_dir) / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+
+class TestMetrics:
+    """Test the Prometheus metrics endpoint."""
+    
+    def test_metrics_endpoint(self):
+        """Test that requests and queries are recorded by route template."""
+        client.get("/api/prospects/does-not-exist")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert (
+            'http_requests_total{method="GET",route="/api/prospects/{prospect_id}",status="404"}'
+            in body
+        )
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/prospects/{prospect_id}"}' in body
+        assert 'db_queries_total{operation="SELECT"}' in body
+        assert "analysis_pool_queued" in body
+        assert "/metrics" not in body
@@ -1,12 +1,59 @@
 """Tests for core functionality."""
 
+import asyncio
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+import httpx
+import numpy as np
 import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import delete, text
+from sqlalchemy.dialects import postgresql, sqlite
+from prometheus_client import REGISTRY
+from prospectplusagent.api.analytics import date_bucket
+from prospectplusagent.models import Prospect, TrendGranularity
+from prospectplusagent.config import settings
+from prospectplusagent.models.database import ProspectDB, InteractionDB, ProspectEngagementDB, EngagementDailyDB
 from prospectplusagent.core.auth import (
     verify_password,
+    verify_password_async,
     get_password_hash,
     create_access_token,
-    verify_token
+    verify_token,
+    TokenCache,
+    token_id
 )
+from prospectplusagent.core.llm import AnthropicClient, LLMClient
+from prospectplusagent.core.providers import CircuitBreaker, LLMRouter, build_router, error_status
+from prospectplusagent.core.database import get_async_database_url, AsyncSessionLocal
+from prospectplusagent.core.agent import ProspectAgent
+from prospectplusagent.core.cache import analysis_cache
+from prospectplusagent.core.interactions import BufferFull, InteractionBuffer
+from prospectplusagent.core.profiling import ProfilingMiddleware, SamplingProfiler
+from prospectplusagent.core.engagement import (
+    WINDOWS as ENGAGEMENT_WINDOWS,
+    compact_engagement,
+    day_date,
+    epoch_day,
+    get_engagement,
+    record_engagement
+)
+from prospectplusagent.core.embeddings import HashingEmbedder
+from prospectplusagent.core import importer, vector_store
+from prospectplusagent.core.vector_store import ProspectSearchIndex, VectorIndex
+from prospectplusagent.core.retrieval import context_budget, estimate_tokens
+from prospectplusagent.core.scoring import FIELD_WEIGHTS, rescore_prospects, rule_based_score, save_scores, score_arrays
+from prospectplusagent.core import serialization
+from prospectplusagent.core.serialization import FastJSONResponse
+from prospectplusagent.cli import _import_times
 
 
 def test_password_hashing():
@@ -35,3 +82,977 @@ def test_invalid_token():
     """Test that invalid tokens raise exceptions."""
     with pytest.raises(Exception):
         verify_token("invalid.token.here")
+
+
+async def test_password_verification_does_not_block_loop():
+    """Test that bcrypt runs on the hashing pool while the loop keeps ticking."""
+    hashed = get_password_hash("secret")
+    gaps = []
+
+    async def ticker(done):
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    done = asyncio.Event()
+    ticking = asyncio.create_task(ticker(done))
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        verify_password_async("secret", hashed),
+        verify_password_async("wrong", hashed)
+    )
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+
+    assert results == [True, False]
+    assert max(gaps) < elapsed / 2
+
+
+def test_token_cache_expiry_and_revocation():
+    """Test that cached tokens expire with the token and honor revocation."""
+    cache = TokenCache(max_size=2, ttl=60)
+    token = create_access_token({"sub": "demo"})
+    payload = verify_token(token)
+    cache.set(token, payload, "demo-user")
+    assert cache.get(token) == "demo-user"
+
+    cache.revoke(token_id(token, payload), payload["exp"])
+    assert cache.get(token) is None
+    assert cache.is_revoked(token_id(token, payload))
+
+    expired = create_access_token({"sub": "demo"}, expires_delta=timedelta(seconds=-1))
+    cache.set(expired, {"sub": "demo", "exp": time.time() - 1}, "demo-user")
+    assert cache.get(expired) is None
+
+    for name in ("a", "b", "c"):
+        cache.set(name, {"exp": time.time() + 60}, name)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+
+def _completion_transport(delay: float, tracker: dict):
+    """Build a mock OpenAI transport that records peak concurrency."""
+    async def handler(request):
+        tracker["active"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["active"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            tracker["active"] -= 1
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 1, "total_tokens": 13}
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def test_llm_client_limits_concurrency():
+    """Test that the LLM client caps in-flight completions."""
+    tracker = {"active": 0, "peak": 0}
+    client = LLMClient(
+        api_key="test",
+        max_concurrency=2,
+        http_client=httpx.AsyncClient(transport=_completion_transport(0.05, tracker))
+    )
+    messages = [{"role": "user", "content": "hi"}]
+    results = await asyncio.gather(*[client.complete(messages) for _ in range(6)])
+    await client.aclose()
+
+    assert results == ["ok"] * 6
+    assert tracker["peak"] == 2
+
+
+async def test_llm_client_timeout():
+    """Test that slow completions hit the per-call timeout."""
+    tracker = {"active": 0, "peak": 0}
+    client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=_completion_transport(1.0, tracker))
+    )
+    with pytest.raises(asyncio.TimeoutError):
+        await client.complete([{"role": "user", "content": "hi"}], timeout=0.05)
+    await client.aclose()
+
+
+async def test_llm_client_metrics():
+    """Test that LLM latency, tokens and errors are recorded."""
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    tracker = {"active": 0, "peak": 0}
+    client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=_completion_transport(0.05, tracker))
+    )
+    model = "metrics-test-model"
+    await client.complete([{"role": "user", "content": "hi"}], model=model)
+    with pytest.raises(asyncio.TimeoutError):
+        await client.complete([{"role": "user", "content": "hi"}], model=model, timeout=0.01)
+    await client.aclose()
+
+    assert sample("llm_tokens_total", operation="complete", model=model, kind="prompt") == 12
+    assert sample("llm_tokens_total", operation="complete", model=model, kind="completion") == 1
+    assert sample("llm_request_duration_seconds_count", operation="complete", model=model) == 2
+    assert sample("llm_errors_total", operation="complete", model=model, error="TimeoutError") == 1
+    assert sample("llm_requests_in_progress", operation="complete") == 0
+
+
+def _fake_provider(kind: str, script: List[int], seen: list, delay: float = 0.0):
+    """Build a provider client backed by a fake OpenAI or Anthropic endpoint.
+    
+    Requests are answered with the statuses in ``script`` in turn, the last
+    one repeating; successful replies are "from <kind>".
+    """
+    async def handler(request):
+        body = json.loads(request.content)
+        seen.append((kind, body))
+        status = script.pop(0) if len(script) > 1 else script[0]
+        await asyncio.sleep(delay)
+        if status != 200:
+            headers = {"retry-after": "0"} if status == 429 else {}
+            return httpx.Response(status, json={"error": {"type": "error", "message": "fake failure"}}, headers=headers)
+        if kind == "anthropic" and body.get("stream"):
+            events = [
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}
+                for token in ("from ", "anthropic")
+            ] + [{"type": "message_stop"}]
+            sse = "".join(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events)
+            return httpx.Response(200, content=sse.encode(), headers={"content-type": "text/event-stream"})
+        if kind == "anthropic":
+            return httpx.Response(200, json={
+                "id": "msg_test",
+                "type": "message",
+                "role": "assistant",
+                "model": body["model"],
+                "content": [{"type": "text", "text": "from anthropic"}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 12, "output_tokens": 2}
+            })
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "from openai"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 2, "total_tokens": 14}
+        })
+
+    client_class = AnthropicClient if kind == "anthropic" else LLMClient
+    return client_class(
+        api_key="test",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+ROUTER_MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "hi"}]
+
+
+async def test_router_fails_over_and_opens_breaker():
+    """Test that a failing provider is retried, then skipped while its breaker is open."""
+    seen = []
+    router = LLMRouter(
+        [_fake_provider("openai", [500], seen), _fake_provider("anthropic", [200], seen)],
+        retries=1,
+        backoff_base=0,
+        breaker_failures=2,
+        breaker_cooldown=60
+    )
+    try:
+        assert await router.complete(ROUTER_MESSAGES, model="gpt-4") == "from anthropic"
+        assert [kind for kind, _ in seen] == ["openai", "openai", "anthropic"]
+        body = seen[-1][1]
+        assert body["model"] == settings.anthropic_model
+        assert body["system"] == "Be brief."
+        assert body["messages"] == [{"role": "user", "content": "hi"}]
+        
+        # The open breaker fails OpenAI fast, without a request
+        assert await router.complete(ROUTER_MESSAGES) == "from anthropic"
+        assert [kind for kind, _ in seen].count("openai") == 2
+        stats = router.stats()
+        assert stats["openai_open"] and stats["openai_opens"] == 1
+        assert stats["openai_errors"] == 2 and stats["openai_rejected"] == 1
+        assert not stats["anthropic_open"] and stats["anthropic_requests"] == 2
+    finally:
+        await router.aclose()
+
+
+async def test_router_backs_off_on_rate_limits():
+    """Test that rate-limited calls are retried on the same provider with jittered backoff."""
+    seen = []
+    router = LLMRouter([_fake_provider("openai", [429, 429, 200], seen)], retries=2, backoff_base=0.01)
+    try:
+        assert await router.complete(ROUTER_MESSAGES) == "from openai"
+        assert len(seen) == 3
+        assert router.stats()["openai_rate_limited"] == 2
+        assert router.routes[0].breaker.state == "closed"
+    finally:
+        await router.aclose()
+    
+    delays = LLMRouter([router.providers[0]], backoff_base=1, backoff_max=4)
+    error = Exception("rate limited")
+    assert all(0 <= delays._backoff(attempt, error) <= min(4, 2 ** attempt) for attempt in range(6) for _ in range(20))
+    error.response = httpx.Response(429, headers={"retry-after": "3"})
+    assert 3 <= delays._backoff(0, error) <= 4
+
+
+async def test_router_raises_request_errors_without_failover():
+    """Test that bad requests are not retried, failed over or charged to the breaker."""
+    seen = []
+    router = LLMRouter([_fake_provider("openai", [400], seen), _fake_provider("anthropic", [200], seen)])
+    try:
+        with pytest.raises(Exception) as raised:
+            await router.complete(ROUTER_MESSAGES)
+        assert error_status(raised.value) == 400
+        assert [kind for kind, _ in seen] == ["openai"]
+        assert router.routes[0].breaker.consecutive_failures == 0
+    finally:
+        await router.aclose()
+
+
+async def test_router_hedges_slow_provider():
+    """Test that a slow completion is raced against the next provider."""
+    seen = []
+    router = LLMRouter(
+        [_fake_provider("openai", [200], seen, delay=1.0), _fake_provider("anthropic", [200], seen)],
+        hedge_delay=0.05
+    )
+    try:
+        started = time.perf_counter()
+        assert await router.complete(ROUTER_MESSAGES) == "from anthropic"
+        assert time.perf_counter() - started < 0.5
+        stats = router.stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+        # The cancelled primary is not held against OpenAI
+        assert router.routes[0].breaker.consecutive_failures == 0
+        assert stats["openai_errors"] == 0
+    finally:
+        await router.aclose()
+
+
+async def test_router_stream_fails_over_before_first_token():
+    """Test that streams move to the next provider if the first fails to start."""
+    seen = []
+    router = LLMRouter([_fake_provider("openai", [503], seen), _fake_provider("anthropic", [200], seen)])
+    try:
+        tokens = [token async for token in router.stream(ROUTER_MESSAGES)]
+        assert tokens == ["from ", "anthropic"]
+        assert [kind for kind, _ in seen] == ["openai", "anthropic"]
+    finally:
+        await router.aclose()
+
+
+def test_circuit_breaker_half_open_trial():
+    """Test that an open breaker lets one trial call through after its cooldown."""
+    breaker = CircuitBreaker(failures=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opens == 2
+    
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_agent_routes_across_configured_providers(monkeypatch):
+    """Test that the agent builds its router from the providers with keys."""
+    monkeypatch.setattr(settings, "openai_api_key", "")
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    test_agent = ProspectAgent()
+    assert test_agent.llm_stats() == {}
+    assert [provider.name for provider in test_agent.client.providers] == ["anthropic"]
+    assert test_agent.llm_stats()["anthropic_requests"] == 0
+    
+    monkeypatch.setattr(settings, "anthropic_api_key", "")
+    assert build_router() is None
+
+
+def test_async_database_url_translation():
+    """Test that sync URLs map onto their async drivers."""
+    assert get_async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert get_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
+
+
+def test_date_bucket_compiles_per_dialect():
+    """Test that trend buckets compile to native SQL on each dialect."""
+    week = date_bucket(ProspectDB.created_at, TrendGranularity.WEEK)
+    assert "date_trunc('week'" in str(week.compile(dialect=postgresql.dialect()))
+    assert "weekday 0" in str(week.compile(dialect=sqlite.dialect()))
+
+    month = date_bucket(ProspectDB.created_at, TrendGranularity.MONTH)
+    assert "strftime('%Y-%m'" in str(month.compile(dialect=sqlite.dialect()))
+
+
+def test_vectorized_scores_match_rule_based_scores():
+    """Test that bulk rescoring produces the same scores as single analysis."""
+    combos = list(itertools.product([0, 1], repeat=len(FIELD_WEIGHTS)))
+    flags = {
+        field: np.array([combo[index] for combo in combos], dtype=np.int8)
+        for index, field in enumerate(FIELD_WEIGHTS)
+    }
+    expected = [
+        rule_based_score({field: "x" if on else "" for field, on in zip(FIELD_WEIGHTS, combo)})
+        for combo in combos
+    ]
+    assert score_arrays(flags).tolist() == expected
+
+    counts = [0, 3, 10, 25]
+    expected = [rule_based_score({"engagement": {"interactions_30d": count}}) for count in counts]
+    zero = {field: np.zeros(len(counts), dtype=np.int8) for field in FIELD_WEIGHTS}
+    assert score_arrays(zero, np.array(counts, dtype=float)).tolist() == expected
+    assert expected[0] == 0.5 and expected[2] == expected[3] > expected[1]
+    assert ProspectAgent()._generate_fallback_analysis({})["score"] == 0.5
+
+
+async def test_analysis_cache_tiers():
+    """Test that unchanged prospects are served from the analysis cache."""
+    tracker = {"active": 0, "peak": 0, "calls": 0}
+    transport = _completion_transport(0, tracker)
+    
+    async def counting_handler(request):
+        tracker["calls"] += 1
+        return await transport.handle_async_request(request)
+    
+    test_agent = ProspectAgent()
+    test_agent.client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(counting_handler))
+    )
+    prospect = {"company_name": f"Cache Corp {uuid.uuid4()}", "contact_name": "Cy"}
+    
+    first = await test_agent.analyze_prospect(prospect)
+    hits = analysis_cache.stats()["memory_hits"]
+    assert await test_agent.analyze_prospect(prospect) == first
+    assert analysis_cache.stats()["memory_hits"] == hits + 1
+    
+    # The table tier answers after the in-process tier is dropped
+    analysis_cache.clear_memory()
+    persistent_hits = analysis_cache.stats()["persistent_hits"]
+    assert await test_agent.analyze_prospect(prospect) == first
+    assert analysis_cache.stats()["persistent_hits"] == persistent_hits + 1
+    assert tracker["calls"] == 1
+    
+    # Changed inputs and forced refreshes go back to the model
+    await test_agent.analyze_prospect({**prospect, "notes": "Budget approved"})
+    await test_agent.analyze_prospect(prospect, use_cache=False)
+    assert tracker["calls"] == 3
+    await test_agent.aclose()
+
+
+def _batch_analysis_transport(requests: list, skip: set, reply=None):
+    """Mock OpenAI transport answering batch analysis prompts.
+    
+    Records each request's prospect listing and leaves out companies in
+    ``skip`` the first time they are seen; ``reply`` overrides the content.
+    """
+    async def handler(request):
+        body = json.loads(request.content)
+        listing = dict(re.findall(r"^\[(\d+)\] Company: ([^|]+?) \|", body["messages"][1]["content"], re.M))
+        requests.append({"companies": sorted(listing.values()), "body": body})
+        results = []
+        for ref, company in listing.items():
+            if company in skip:
+                skip.discard(company)
+                continue
+            results.append({
+                "id": ref,
+                "score": 0.9,
+                "insights": f"{company} is expanding",
+                "recommendations": ["Book a demo"],
+                "next_steps": ["Send pricing"],
+                "confidence": 0.8
+            })
+        content = reply if reply is not None else "Here you go: " + json.dumps({"results": results})
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 1, "total_tokens": 13}
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def test_batch_analysis_retries_only_missing_prospects(monkeypatch):
+    """Test that batch analysis packs prospects and retries only those left out."""
+    monkeypatch.setattr(settings, "analysis_batch_size", 2)
+    marker = uuid.uuid4().hex[:8]
+    prospects = [{"company_name": f"Batch {marker} {index}", "contact_name": "Bo"} for index in range(5)]
+    requests = []
+    test_agent = ProspectAgent()
+    test_agent.client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(
+            transport=_batch_analysis_transport(requests, {f"Batch {marker} 3"})
+        )
+    )
+    try:
+        results = await test_agent.analyze_batch(prospects)
+        assert [len(r["companies"]) for r in requests] == [2, 2, 1, 1]
+        assert requests[-1]["companies"] == [f"Batch {marker} 3"]
+        assert requests[0]["body"]["response_format"] == {"type": "json_object"}
+        for index, result in enumerate(results):
+            assert result["score"] == 0.9
+            assert result["insights"] == [f"Batch {marker} {index} is expanding"]
+        
+        # Every result is cached, including for the single-prospect path
+        assert await test_agent.analyze_batch(prospects) == results
+        assert await test_agent.analyze_prospect(prospects[3]) == results[3]
+        assert len(requests) == 4
+    finally:
+        await test_agent.aclose()
+
+
+async def test_batch_analysis_falls_back_after_attempts(monkeypatch):
+    """Test that unparseable batch responses end in the rule-based analysis."""
+    monkeypatch.setattr(settings, "analysis_batch_attempts", 2)
+    prospects = [{"company_name": f"Broken Batch {uuid.uuid4()}", "priority": "high"} for _ in range(3)]
+    requests = []
+    test_agent = ProspectAgent()
+    test_agent.client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=_batch_analysis_transport(requests, set(), reply="not json"))
+    )
+    try:
+        results = await test_agent.analyze_batch(prospects)
+        assert len(requests) == 2
+        assert results == [test_agent._generate_fallback_analysis(p) for p in prospects]
+        assert await ProspectAgent().analyze_batch([]) == []
+    finally:
+        await test_agent.aclose()
+
+
+def test_context_budget_per_model():
+    """Test that the chat context budget respects each model's window."""
+    assert context_budget("gpt-4-turbo-preview", 100) == settings.chat_context_tokens
+    assert context_budget("gpt-4-0613", 5500) == 8192 - settings.max_tokens - 5500
+    assert context_budget("gpt-4", 9000) == 0
+
+
+async def test_chat_context_is_retrieved_and_budgeted(monkeypatch):
+    """Test that chat prompts carry retrieved records within the token budget."""
+    monkeypatch.setattr(settings, "chat_context_tokens", 200)
+    marker = f"zephyr{uuid.uuid4().hex[:8]}"
+    prospect_ids = [str(uuid.uuid4()) for _ in range(10)]
+    interaction_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            ProspectDB(
+                id=prospect_id,
+                company_name=f"Rag Corp {index}",
+                contact_name="Ray",
+                email=f"ray{index}-{marker}@rag.io",
+                notes=f"Evaluating {marker} rollout"
+            )
+            for index, prospect_id in enumerate(prospect_ids)
+        ])
+        db.add(InteractionDB(
+            id=interaction_id,
+            prospect_id=prospect_ids[0],
+            interaction_type="email",
+            content="Asked for pricing"
+        ))
+        await db.commit()
+    
+    prompts = []
+    
+    async def handler(request):
+        prompts.append(json.loads(request.content)["messages"])
+        return await _completion_transport(0, {"active": 0, "peak": 0}).handle_async_request(request)
+    
+    test_agent = ProspectAgent()
+    test_agent.client = LLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    try:
+        response = await test_agent.chat(f"Who is evaluating {marker}?")
+        records = prompts[0][1]["content"]
+        assert records.startswith("Relevant records:")
+        assert estimate_tokens(records) <= 200 + 10
+        
+        sources = response["sources"]
+        assert 0 < len([s for s in sources if s.startswith("prospect:")]) < len(prospect_ids)
+        for source in sources:
+            assert f"[{source}]" in records
+        if f"prospect:{prospect_ids[0]}" in sources:
+            assert f"interaction:{interaction_id}" in sources
+    finally:
+        await test_agent.aclose()
+        async with AsyncSessionLocal() as db:
+            for prospect_id in prospect_ids:
+                await db.delete(await db.get(ProspectDB, prospect_id))
+            await db.delete(await db.get(InteractionDB, interaction_id))
+            await db.commit()
+
+
+async def test_engagement_windows_match_recount():
+    """Test that incremental updates and compaction match counting from scratch."""
+    rng = np.random.default_rng(3)
+    prospect_ids = [f"engagement-{uuid.uuid4()}" for _ in range(5)]
+    start = epoch_day(datetime.utcnow())
+    events = []
+    try:
+        for step in range(6):
+            today = start + 20 * step
+            async with AsyncSessionLocal() as db:
+                await compact_engagement(db, today=today)
+                batch = [
+                    {
+                        "prospect_id": str(rng.choice(prospect_ids)),
+                        "created_at": datetime.combine(day_date(today - int(rng.integers(0, 120))), datetime.min.time())
+                    }
+                    for _ in range(40)
+                ]
+                await record_engagement(db, batch, today=today)
+                await db.commit()
+                events.extend(batch)
+
+                for prospect_id in prospect_ids:
+                    days = [epoch_day(event["created_at"]) for event in events if event["prospect_id"] == prospect_id]
+                    features = await get_engagement(db, prospect_id)
+                    for column, length in ENGAGEMENT_WINDOWS.items():
+                        assert features[column] == sum(day > today - length for day in days), (step, column)
+                    assert features["total_interactions"] == len(days)
+                    assert features["last_touch_at"] == max(
+                        event["created_at"] for event in events if event["prospect_id"] == prospect_id
+                    )
+    finally:
+        async with AsyncSessionLocal() as db:
+            for model in (ProspectEngagementDB, EngagementDailyDB):
+                await db.execute(delete(model).where(model.prospect_id.in_(prospect_ids)))
+            await db.commit()
+
+
+async def test_agent_scoring_reads_engagement_features():
+    """Test that fallback scoring picks up a prospect's engagement features."""
+    prospect_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as db:
+        await record_engagement(db, [{"prospect_id": prospect_id, "created_at": datetime.utcnow()}] * 5)
+        await db.commit()
+    try:
+        test_agent = ProspectAgent()
+        test_agent.client = None
+        analysis = await test_agent.analyze_prospect({"id": prospect_id, "company_name": "Engaged Inc"})
+        assert analysis["score"] == rule_based_score({"engagement": {"interactions_30d": 5}}) > 0.5
+    finally:
+        async with AsyncSessionLocal() as db:
+            for model in (ProspectEngagementDB, EngagementDailyDB):
+                await db.execute(delete(model).where(model.prospect_id == prospect_id))
+            await db.commit()
+
+
+def _streaming_transport(tokens):
+    """Build a mock OpenAI transport that streams tokens as SSE chunks."""
+    def handler(request):
+        events = []
+        for token in tokens:
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "test-model",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            events.append(f"data: {json.dumps(chunk)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200,
+            content="".join(events).encode(),
+            headers={"content-type": "text/event-stream"}
+        )
+    
+    return httpx.MockTransport(handler)
+
+
+async def test_llm_client_stream():
+    """Test that streamed tokens arrive in order and free their slot early."""
+    client = LLMClient(
+        api_key="test",
+        max_concurrency=1,
+        http_client=httpx.AsyncClient(transport=_streaming_transport(["Hel", "lo", "!"]))
+    )
+    messages = [{"role": "user", "content": "hi"}]
+    assert [token async for token in client.stream(messages)] == ["Hel", "lo", "!"]
+    
+    # Abandoning a stream must release the single concurrency slot
+    tokens = client.stream(messages)
+    assert await tokens.__anext__() == "Hel"
+    await tokens.aclose()
+    assert [token async for token in client.stream(messages, timeout=1)] == ["Hel", "lo", "!"]
+    await client.aclose()
+
+
+def test_hashing_embedder_similarity():
+    """Test that the offline embedder ranks related text closer."""
+    embedder = HashingEmbedder(256)
+    query, related, unrelated = embedder.embed_sync([
+        "cloud software", "Cloud software startup selling SaaS", "Family-owned bakery"
+    ])
+    assert np.isclose(np.linalg.norm(query), 1.0)
+    assert query @ related > query @ unrelated
+
+
+def test_vector_index_ivf_and_persistence(tmp_path):
+    """Test exact flat search, clustered search, removal and save/load."""
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((3000, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"p{i}" for i in range(len(vectors))]
+
+    index = VectorIndex(32, nprobe=8, ivf_min_vectors=1000)
+    index.upsert(ids, vectors)
+    assert index.search(vectors[42], 1)[0][0] == "p42"
+
+    assert index.needs_training()
+    index.apply_lists(index.build_lists())
+    assert len(index.lists) > 1
+    hits = sum(index.search(vectors[i], 1)[0][0] == ids[i] for i in range(0, 3000, 30))
+    assert hits == 100
+
+    index.remove("p42")
+    assert "p42" not in [item_id for item_id, _ in index.search(vectors[42], 5)]
+    assert len(index) == 2999
+
+    index.save(tmp_path / "index.npz", {"embedder": "test"})
+    loaded, meta = VectorIndex.load(tmp_path / "index.npz")
+    assert meta == {"embedder": "test"}
+    assert len(loaded) == 2999
+    assert loaded.search(vectors[7], 1)[0][0] == "p7"
+
+
+def test_vector_index_rebuild_keeps_concurrent_writes():
+    """Test that writes made while lists are rebuilt survive the swap."""
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((3000, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = VectorIndex(32, nprobe=64, ivf_min_vectors=1000)
+    index.upsert([f"p{i}" for i in range(2000)], vectors[:2000])
+
+    rows = index.snapshot()
+    # Replace, remove (moving other rows into the gaps) and add during the build
+    index.upsert(["p5"], vectors[2500:2501])
+    for i in range(10, 20):
+        index.remove(f"p{i}")
+    index.upsert([f"p{i}" for i in range(2000, 2400)], vectors[2000:2400])
+    index.apply_lists(index.build_lists(rows))
+
+    assert len(index.lists) > 1
+    assert len(index) == 2390
+    assert index.search(vectors[2500], 1)[0][0] == "p5"
+    assert "p12" not in index
+    for i in [0, 1, 2, 3, 4, 6, 7, 8, 9] + list(range(1990, 2400, 7)):
+        assert index.search(vectors[i], 1)[0][0] == f"p{i}"
+
+
+async def test_search_index_retrains_in_background():
+    """Test that an upsert crossing the retrain threshold does not wait for it."""
+    search_index = ProspectSearchIndex(path="/nonexistent", embedder=HashingEmbedder(64))
+    search_index.index = VectorIndex(64, ivf_min_vectors=50)
+    prospects = [{"id": f"p{i}", "company_name": f"Company {i}"} for i in range(60)]
+
+    await search_index.upsert(prospects)
+    assert search_index.stats()["retraining"]
+    assert search_index.index.centroids is None
+
+    await search_index._retrain_task
+    assert search_index.index.centroids is not None
+    assert not search_index.stats()["retraining"]
+    assert search_index.index.search(search_index.embedder.embed_sync(["Company 7"])[0], 1)[0][0] == "p7"
+
+
+async def test_search_index_syncs_writes_from_other_processes(monkeypatch):
+    """Test that rows written outside this index are picked up and deletions dropped."""
+    monkeypatch.setattr(vector_store, "SYNC_BATCH_SIZE", 2)
+    search_index = ProspectSearchIndex(path="/nonexistent", embedder=HashingEmbedder(64))
+    index = VectorIndex(64)
+    await search_index._reconcile(index)
+    search_index.index = index
+    # Rows the reconcile just embedded are not embedded again
+    assert await search_index.sync() == 0
+
+    prospect_ids = [str(uuid.uuid4()) for _ in range(3)]
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            ProspectDB(id=prospect_id, company_name="Quillfeather Sync", contact_name="Q", email=f"q{prospect_id}@sync.io")
+            for prospect_id in prospect_ids
+        ])
+        await db.commit()
+    try:
+        # Paged through SYNC_BATCH_SIZE rows at a time
+        assert await search_index.sync() == 3
+        assert all(prospect_id in search_index.index for prospect_id in prospect_ids)
+        # A second pass does not re-embed what it already indexed
+        assert await search_index.sync() == 0
+        
+        # Score writes are not edits, so they are not re-embedded either
+        async with AsyncSessionLocal() as db:
+            await rescore_prospects(db)
+            await save_scores(db, [(prospect_id, 0.9) for prospect_id in prospect_ids])
+            await db.commit()
+        assert await search_index.sync() == 0
+    finally:
+        async with AsyncSessionLocal() as db:
+            for prospect_id in prospect_ids:
+                await db.delete(await db.get(ProspectDB, prospect_id))
+            await db.commit()
+
+    # Deletions are found by the periodic count
+    search_index._syncs = vector_store.SYNC_COUNT_EVERY - 1
+    await search_index.sync()
+    assert not any(prospect_id in search_index.index for prospect_id in prospect_ids)
+
+
+async def test_import_indexes_stored_versions(monkeypatch):
+    """Test that imported rows are embedded in chunks, once, with their stored timestamps."""
+    monkeypatch.setattr(vector_store, "SYNC_BATCH_SIZE", 2)
+    embedder = HashingEmbedder(64)
+    batch_sizes = []
+    embed = embedder.embed
+
+    async def counting_embed(texts):
+        batch_sizes.append(len(texts))
+        return await embed(texts)
+
+    monkeypatch.setattr(embedder, "embed", counting_embed)
+    search_index = ProspectSearchIndex(path="/nonexistent", embedder=embedder)
+    index = VectorIndex(64)
+    await search_index._reconcile(index)
+    search_index.index = index
+    monkeypatch.setattr(importer, "prospect_index", search_index)
+
+    marker = uuid.uuid4().hex[:8]
+    records = [
+        (row, {"company_name": f"Import Corp {row}", "contact_name": "Ida", "email": f"ida{row}-{marker}@import.io"}, None)
+        for row in range(5)
+    ]
+
+    async def stream():
+        for record in records:
+            yield record
+
+    batch_sizes.clear()
+    async with AsyncSessionLocal() as db:
+        result = await importer.ProspectImporter(db).run(stream())
+    try:
+        assert result.inserted == 5
+        assert batch_sizes == [2, 2, 1]
+        assert await search_index.sync() == 0
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ProspectDB).where(ProspectDB.email.like(f"%-{marker}@import.io")))
+            await db.commit()
+
+
+def test_import_conflicts_include_copy_errors():
+    """Test that unique violations from COPY are treated like IntegrityError."""
+    class UniqueViolationError(Exception):
+        sqlstate = "23505"
+
+    assert importer.is_conflict(UniqueViolationError())
+    assert not importer.is_conflict(ValueError())
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_json_matches_response_model(monkeypatch, use_orjson):
+    """Test that pre-serialized rows match response_model output exactly."""
+    monkeypatch.setattr(serialization, "ORJSON_AVAILABLE", use_orjson and serialization.ORJSON_AVAILABLE)
+    rows = [
+        ProspectDB(
+            id="p1", company_name="Acme", contact_name="Ann", email="ann@acme.io",
+            status="qualified", priority="high", tags=["a"], score=0.7,
+            created_at=datetime(2024, 1, 15, 10, 30, 0, 123456),
+            updated_at=datetime(2024, 1, 15, 10, 30),
+            last_contact=datetime(2024, 2, 1, 9, 0, tzinfo=timezone.utc)
+        ),
+        ProspectDB(
+            id="p2", company_name="Bolt", contact_name="Ben", email="ben@bolt.io",
+            status="new", priority="low", notes="caf\u00e9 \"quoted\"",
+            created_at=datetime(2024, 3, 1), updated_at=datetime(2024, 3, 1)
+        ),
+    ]
+    content = [row.to_dict() for row in rows]
+    adapter = TypeAdapter(List[Prospect])
+    expected = adapter.dump_python(adapter.validate_python(content), mode="json")
+
+    assert json.loads(FastJSONResponse(content).body) == expected
+
+
+def test_cold_imports_stay_lazy():
+    """Test that the CLI skips the server stack and the app skips the LLM SDK."""
+    code = (
+        "import json, sys, prospectplusagent.cli; cli = sorted(sys.modules); "
+        "import prospectplusagent.main; print(json.dumps([cli, sorted(sys.modules)]))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    cli_modules, app_modules = (set(modules) for modules in json.loads(output))
+    assert not {"httpx", "fastapi", "sqlalchemy", "prospectplusagent.config"} & cli_modules
+    assert not {"openai", "httpx"} & app_modules
+
+
+def test_import_times_report():
+    """Test parsing of -X importtime output."""
+    rows = _import_times("json")
+    assert ("json", 0) in {(name, depth) for name, depth, _, _ in rows}
+    assert all(cumulative >= self_us >= 0 for _, _, self_us, cumulative in rows)
+
+
+def test_metrics_merge_across_worker_processes(tmp_path):
+    """Test that multiprocess mode sums counters and keeps per-worker stats."""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from prospectplusagent.core.metrics import http_requests, stats_collector; "
+        "http_requests.labels('GET', '/api/x', '200').inc(); "
+        "stats_collector.add('queue', lambda: {'depth': 3}); stats_collector.publish()"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    scrape = "from prospectplusagent.core.metrics import render_metrics; print(render_metrics().decode())"
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert 'http_requests_total{method="GET",route="/api/x",status="200"} 2.0' in output
+    assert len([line for line in output.splitlines() if line.startswith("queue_depth{")]) == 2
+
+
+async def test_sqlite_connections_use_configured_pragmas():
+    """Test that pooled SQLite connections run in WAL with the configured pragmas."""
+    if not settings.database_url.startswith("sqlite"):
+        pytest.skip("SQLite only")
+    async with AsyncSessionLocal() as db:
+        journal_mode = (await db.execute(text("PRAGMA journal_mode"))).scalar()
+        busy_timeout = (await db.execute(text("PRAGMA busy_timeout"))).scalar()
+        synchronous = (await db.execute(text("PRAGMA synchronous"))).scalar()
+    assert journal_mode == settings.sqlite_journal_mode
+    assert busy_timeout == settings.sqlite_busy_timeout
+    assert synchronous == {"off": 0, "normal": 1, "full": 2, "extra": 3}[settings.sqlite_synchronous]
+
+
+async def test_interaction_buffer_coalesces_and_flushes_on_stop():
+    """Test that buffered rows are written in few transactions and drained on stop."""
+    writes = []
+    buffer = InteractionBuffer(max_size=100, flush_rows=5, flush_interval=60, enqueue_timeout=0.05)
+
+    async def record(rows):
+        writes.append(len(rows))
+
+    buffer._write = record
+    await buffer.start()
+    for _ in range(3):
+        await buffer.add([{"id": str(uuid.uuid4())}, {"id": str(uuid.uuid4())}])
+    await asyncio.sleep(0.05)
+    assert writes == [6]
+
+    await buffer.add([{"id": "last"}])
+    await buffer.stop()
+    assert writes == [6, 1]
+    assert buffer.stats()["flushed"] == 7
+
+
+async def test_interaction_buffer_backpressure():
+    """Test that a full buffer waits for room and then rejects."""
+    release = asyncio.Event()
+    buffer = InteractionBuffer(max_size=10, flush_rows=10, flush_interval=60, enqueue_timeout=0.05)
+
+    async def slow_write(rows):
+        await release.wait()
+
+    buffer._write = slow_write
+    await buffer.start()
+    await buffer.add([{"id": str(index)} for index in range(10)])
+    await asyncio.sleep(0.01)
+    # The flush is stuck, and in-flight rows still count against the buffer
+    assert buffer.stats()["in_flight"] == 10
+    with pytest.raises(BufferFull):
+        await buffer.add([{"id": "overflow"}])
+    assert buffer.rejected == 1
+
+    release.set()
+    await buffer.add([{"id": "fits"}])
+    await buffer.stop()
+    assert buffer.flushed == 11
+
+
+async def test_interaction_buffer_drops_only_failing_rows(monkeypatch):
+    """Test that a batch that keeps failing is split and only bad rows are dropped."""
+    monkeypatch.setattr(settings, "interaction_max_flush_attempts", 2)
+    written = []
+    buffer = InteractionBuffer(max_size=100, flush_rows=100, flush_interval=60)
+
+    async def reject_bad(rows):
+        if any(row["id"] == "bad" for row in rows):
+            raise ValueError("constraint failed")
+        written.extend(row["id"] for row in rows)
+
+    buffer._write = reject_bad
+    await buffer.start()
+    await buffer.add([{"id": str(index)} for index in range(9)] + [{"id": "bad"}])
+    assert await buffer.flush() == 0
+    assert buffer.stats()["pending"] == 10
+
+    assert await buffer.flush() == 9
+    assert sorted(written) == [str(index) for index in range(9)]
+    assert buffer.dropped == 1
+    await buffer.stop()
+
+
+async def test_interaction_buffer_keeps_rows_when_database_is_down(monkeypatch):
+    """Test that rows are not dropped mid-run when every insert fails."""
+    monkeypatch.setattr(settings, "interaction_max_flush_attempts", 1)
+    buffer = InteractionBuffer(max_size=100, flush_rows=100, flush_interval=0.01)
+
+    async def down(rows):
+        raise ConnectionError("database unavailable")
+
+    buffer._write = down
+    await buffer.start()
+    await buffer.add([{"id": str(index)} for index in range(4)])
+    assert await buffer.flush() == 0
+    assert buffer.stats()["pending"] == 4
+    assert buffer.dropped == 0
+
+    await buffer.stop()
+    assert buffer.dropped == 4
+
+
+def test_profiles_are_pruned_to_max_count(tmp_path):
+    """Test that writing a profile deletes the oldest beyond the cap."""
+    middleware = ProfilingMiddleware(None, str(tmp_path), authorize=None, max_profiles=2)
+    profile_ids = [f"20240501T10000{index}-get-api-{index}" for index in range(4)]
+    for profile_id in profile_ids:
+        middleware._write(profile_id, SamplingProfiler())
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{profile_id}{suffix}" for profile_id in profile_ids[2:] for suffix in (".folded", ".txt")
+    ]